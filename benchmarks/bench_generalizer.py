@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+SADNxAI - Generalizer Benchmark
+Compares the per-value lambda path with the Generalizer kernel path (rows/sec)
+
+Usage:
+    python benchmarks/bench_generalizer.py                 # 100k, 1M, 10M rows
+    python benchmarks/bench_generalizer.py --sizes 100000  # custom sizes
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from shared.masking.generalizer import Generalizer
+
+
+def make_data(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate a synthetic frame with age, zipcode and date quasi-identifiers"""
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    return pd.DataFrame({
+        'age': rng.integers(0, 100, rows),
+        'zipcode': rng.integers(10000, 99999, rows).astype(str),
+        'visit_date': days.strftime('%Y-%m-%d'),
+        'shifted_date': days,
+    })
+
+
+def lambda_path(generalizer: Generalizer, df: pd.DataFrame, col: str, col_type: str) -> pd.Series:
+    """Per-value Series.apply path (pre-kernel behaviour)"""
+    if col_type == 'age':
+        return df[col].apply(lambda x: generalizer._generalize_age(x, generalizer.age_level))
+    if col_type == 'zipcode':
+        return df[col].apply(lambda x: generalizer._generalize_zipcode(x, generalizer.location_level))
+    return df[col].apply(lambda x: generalizer._generalize_date(x, generalizer.date_level))
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generalizer kernel benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--level', type=int, default=1, help="Generalization level for all hierarchies")
+    args = parser.parse_args()
+
+    columns = {'age': 'age', 'zipcode': 'zipcode', 'visit_date': 'date', 'shifted_date': 'date'}
+
+    print(f"{'rows':>12} {'column':>14} {'lambda rows/s':>16} {'kernel rows/s':>16} {'speedup':>9}")
+    print("-" * 71)
+
+    for rows in args.sizes:
+        df = make_data(rows)
+        for col, col_type in columns.items():
+            generalizer = Generalizer(
+                quasi_identifiers=[col],
+                age_level=args.level,
+                location_level=args.level,
+                date_level=args.level,
+                column_types={col: col_type}
+            )
+
+            lambda_time = timed(lambda: lambda_path(generalizer, df, col, col_type))
+            kernel_time = timed(lambda: generalizer.apply(df[[col]]))
+
+            print(
+                f"{rows:>12,} {col:>14} {rows / lambda_time:>16,.0f} "
+                f"{rows / kernel_time:>16,.0f} {lambda_time / kernel_time:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
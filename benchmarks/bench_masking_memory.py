@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+SADNxAI - Masking Memory Benchmark
+tracemalloc peak per engine stage, copying apply() vs inplace=True
+
+Builds a synthetic frame shaped like test_data/sample_healthcare.csv plus a
+free-text notes column, then runs the /mask engine chain both ways.
+
+Usage:
+    python benchmarks/bench_masking_memory.py
+    python benchmarks/bench_masking_memory.py --rows 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from shared.masking.suppressor import Suppressor
+from shared.masking.date_shifter import DateShifter
+from shared.masking.generalizer import Generalizer
+from shared.masking.pseudonymizer import Pseudonymizer
+from shared.masking.text_scrubber import TextScrubber
+
+
+CITIES = ['Riyadh', 'Jeddah', 'Dammam', 'Mecca', 'Medina', 'Khobar', 'Tabuk', 'Abha']
+DIAGNOSES = ['Diabetes', 'Hypertension', 'Asthma', 'Migraine', 'Arthritis']
+
+
+def make_data(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate a synthetic healthcare frame"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows)
+    days = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, rows), unit='D')
+    return pd.DataFrame({
+        'national_id': (1_000_000_000 + ids).astype(str),
+        'patient_id': pd.Series(ids).map('MRN{:07d}'.format),
+        'name': pd.Series(ids % 5000).map('Patient{0} Family{0}'.format),
+        'phone': (966_500_000_000 + ids).astype(str),
+        'age': rng.integers(0, 95, rows),
+        'gender': rng.choice(['Male', 'Female'], rows),
+        'city': rng.choice(CITIES, rows),
+        'admission_date': days.strftime('%Y-%m-%d'),
+        'diagnosis': rng.choice(DIAGNOSES, rows),
+        'notes': rng.choice(['Stable, call 0501234567.', 'Reviewed labs.', 'Email a@b.sa for results.'], rows),
+    })
+
+
+def make_stages():
+    """The /mask engine chain in route order"""
+    return [
+        ('scrub', TextScrubber(text_columns=['notes'])),
+        ('suppress', Suppressor(['national_id', 'name', 'phone'])),
+        ('date_shift', DateShifter(['admission_date'], salt='bench')),
+        ('generalize', Generalizer(
+            quasi_identifiers=['age', 'gender', 'city', 'admission_date'],
+            column_types={'age': 'age', 'gender': 'gender', 'city': 'location', 'admission_date': 'date'}
+        )),
+        ('pseudonymize', Pseudonymizer(['patient_id'], salt='bench')),
+    ]
+
+
+def run_chain(df: pd.DataFrame, inplace: bool):
+    """Run every stage, returning (masked frame, [(stage, peak MB, seconds)])"""
+    results = []
+    tracemalloc.start()
+    for stage, engine in make_stages():
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        df = engine.apply(df, inplace=inplace)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        results.append((stage, (peak - baseline) / 1024 / 1024, elapsed))
+    tracemalloc.stop()
+    return df, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Masking memory benchmark")
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    source = make_data(args.rows)
+    frame_mb = source.memory_usage(deep=True).sum() / 1024 / 1024
+
+    copied, copy_stats = run_chain(source.copy(), inplace=False)
+    owned, inplace_stats = run_chain(source.copy(), inplace=True)
+    assert copied.equals(owned), "inplace output differs from copying output"
+
+    print(f"  Rows:        {args.rows:,}")
+    print(f"  Frame size:  {frame_mb:,.1f} MB")
+    print()
+    print(f"  {'stage':<14} {'copy MB':>10} {'inplace MB':>12} {'copy s':>9} {'inplace s':>10}")
+    print("  " + "-" * 58)
+    for (stage, copy_mb, copy_s), (_, inplace_mb, inplace_s) in zip(copy_stats, inplace_stats):
+        print(f"  {stage:<14} {copy_mb:>10.1f} {inplace_mb:>12.1f} {copy_s:>9.2f} {inplace_s:>10.2f}")
+    print("  " + "-" * 58)
+    print(
+        f"  {'max peak':<14} {max(s[1] for s in copy_stats):>10.1f} "
+        f"{max(s[1] for s in inplace_stats):>12.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
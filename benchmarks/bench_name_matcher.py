@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+SADNxAI - Name Matcher Benchmark
+Build time, memory and matching throughput of the TextScrubber name matchers
+
+Simulates a suppressed patient-name column (default 200k patients) whose
+names are extracted with TextScrubber.extract_names_from_column, then scrubs
+a notes column with each backend.
+
+Usage:
+    python benchmarks/bench_name_matcher.py
+    python benchmarks/bench_name_matcher.py --patients 50000 --notes 20000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from shared.masking.text_scrubber import TextScrubber
+from shared.masking.name_matcher import RegexNameMatcher, AhoCorasickNameMatcher
+
+
+LATIN_SYLLABLES = ['ah', 'med', 'fa', 'ti', 'ma', 'kha', 'lid', 'sa', 'ra', 'no', 'ur', 'ya', 'sir', 'om', 'ar', 'hu']
+ARABIC_SYLLABLES = ['مح', 'مد', 'فا', 'طم', 'ة', 'خا', 'لد', 'سا', 'رة', 'نو', 'ر', 'يا', 'سر', 'عم', 'ال', 'شم']
+
+
+def make_names(patients: int, seed: int = 7) -> pd.DataFrame:
+    """Generate 'First Last' patient names, a quarter in Arabic script"""
+    rng = np.random.default_rng(seed)
+    names = []
+    for i in range(patients):
+        syllables = ARABIC_SYLLABLES if i % 4 == 0 else LATIN_SYLLABLES
+        first = ''.join(rng.choice(syllables, 3))
+        last = ''.join(rng.choice(syllables, 4))
+        if syllables is LATIN_SYLLABLES:
+            first, last = first.capitalize(), last.capitalize()
+        names.append(f"{first} {last}")
+    return pd.DataFrame({'name': names})
+
+
+def make_notes(patient_names: pd.Series, rows: int) -> list:
+    """Free-text notes mentioning patients by name"""
+    notes = []
+    for i in range(rows):
+        name = patient_names.iloc[(i * 7919) % len(patient_names)]
+        notes.append(f"Follow-up for {name}: stable, continue current treatment and review labs next visit.")
+    return notes
+
+
+def measure_build(factory, names):
+    """Return (matcher, seconds, peak MB) for building a matcher"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    matcher = factory(names)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return matcher, elapsed, peak / 1024 / 1024
+
+
+def measure_scrub(matcher, notes) -> float:
+    """Return notes/sec for scrubbing all notes"""
+    start = time.perf_counter()
+    for note in notes:
+        matcher.sub("[REDACTED]", note)
+    return len(notes) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Name matcher benchmark")
+    parser.add_argument('--patients', type=int, default=200_000)
+    parser.add_argument('--notes', type=int, default=20_000)
+    parser.add_argument(
+        '--regex-max', type=int, default=5_000,
+        help="Only build the regex alternation up to this many names (it does not scale)"
+    )
+    args = parser.parse_args()
+
+    df = make_names(args.patients)
+    names = sorted(TextScrubber.extract_names_from_column(df, 'name'))
+    notes = make_notes(df['name'], args.notes)
+
+    print(f"  Patients:        {args.patients:,}")
+    print(f"  Names to match:  {len(names):,}")
+    print(f"  Notes:           {args.notes:,}")
+    print()
+    print(f"  {'backend':<14} {'names':>10} {'build s':>9} {'build MB':>10} {'notes/sec':>12}")
+    print("  " + "-" * 59)
+
+    sizes = sorted({min(len(names), args.regex_max), len(names)})
+    for size in sizes:
+        subset = names[:size]
+        for backend, factory in (('regex', RegexNameMatcher), ('aho_corasick', AhoCorasickNameMatcher)):
+            if backend == 'regex' and size > args.regex_max:
+                print(f"  {backend:<14} {size:>10,} {'skipped (see --regex-max)':>34}")
+                continue
+            matcher, build_time, build_mb = measure_build(factory, subset)
+            rate = measure_scrub(matcher, notes)
+            print(f"  {backend:<14} {size:>10,} {build_time:>9.2f} {build_mb:>10.1f} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+SADNxAI - t-Closeness Benchmark
+Contingency-matrix t-closeness vs the per-group value_counts loop
+
+Builds a frame with many small equivalence classes (default ~50k) and
+times calculate_t_closeness and get_high_distance_classes. With
+--reference the previous groupby implementation is timed on the same data
+and the results are compared.
+
+Usage:
+    python benchmarks/bench_t_closeness.py
+    python benchmarks/bench_t_closeness.py --rows 100000 --reference
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'validation-service'))
+
+from metrics.classes import EquivalenceClasses
+from metrics.t_closeness import calculate_t_closeness, earth_movers_distance, get_high_distance_classes
+
+
+QUASI_IDENTIFIERS = ['age', 'zipcode', 'gender']
+SENSITIVE_ATTRIBUTES = ['diagnosis', 'treatment']
+
+
+def make_data(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic frame with roughly rows / 4 equivalence classes"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'age': rng.integers(18, 90, rows).astype(str),
+        'zipcode': rng.integers(0, rows // 8 // 72 + 1, rows).astype(str),
+        'gender': rng.choice(['Male', 'Female'], rows),
+        'diagnosis': rng.choice(['Diabetes', 'Hypertension', 'Asthma', 'Migraine', 'Arthritis', 'Cancer'], rows),
+        'treatment': rng.choice(['Insulin', 'Medication', 'Surgery', 'Chemotherapy'], rows),
+    }).astype('category')
+
+
+def reference_t_value(df: pd.DataFrame) -> float:
+    """Per-group loop, as calculate_t_closeness was implemented before"""
+    t_value = 0.0
+    for sa in SENSITIVE_ATTRIBUTES:
+        global_dist = df[sa].value_counts(normalize=True)
+        all_values = global_dist.index.tolist()
+        for _, group in df.groupby(QUASI_IDENTIFIERS, dropna=False, observed=True):
+            local_dist = group[sa].value_counts(normalize=True)
+            p = np.array([global_dist.get(v, 0) for v in all_values])
+            q = np.array([local_dist.get(v, 0) for v in all_values])
+            t_value = max(t_value, earth_movers_distance(p, q))
+    return round(t_value, 4)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="t-closeness benchmark")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--threshold', type=float, default=0.6)
+    parser.add_argument('--reference', action='store_true', help="Also time the per-group loop (slow)")
+    args = parser.parse_args()
+
+    df = make_data(args.rows)
+    classes, encode_time = timed(lambda: EquivalenceClasses(df, QUASI_IDENTIFIERS))
+    result, t_time = timed(lambda: calculate_t_closeness(df, QUASI_IDENTIFIERS, SENSITIVE_ATTRIBUTES, classes))
+    violations, find_time = timed(
+        lambda: get_high_distance_classes(df, QUASI_IDENTIFIERS, SENSITIVE_ATTRIBUTES, args.threshold, classes)
+    )
+
+    print(f"  Rows:       {args.rows:,}")
+    print(f"  Classes:    {classes.n_classes:,}")
+    print(f"  t-value:    {result['t_value']}")
+    print(f"  Violations: {len(violations):,} (EMD > {args.threshold})")
+    print()
+    print(f"  {'step':<28} {'seconds':>9}")
+    print("  " + "-" * 38)
+    print(f"  {'encode classes':<28} {encode_time:>9.3f}")
+    print(f"  {'calculate_t_closeness':<28} {t_time:>9.3f}")
+    print(f"  {'get_high_distance_classes':<28} {find_time:>9.3f}")
+
+    if args.reference:
+        reference, reference_time = timed(lambda: reference_t_value(df))
+        print(f"  {'per-group loop':<28} {reference_time:>9.3f}")
+        assert reference == result['t_value'], f"reference {reference} != {result['t_value']}"
+
+
+if __name__ == "__main__":
+    main()
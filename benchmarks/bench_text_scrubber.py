@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+SADNxAI - Text Scrubber Benchmark
+Compares per-cell pattern compilation with the precompiled single-pass scrubber
+
+Builds a free-text notes column from test_data/sample_healthcare.csv (names,
+phones, emails and IDs embedded in clinical sentences) and reports rows/sec.
+
+Usage:
+    python benchmarks/bench_text_scrubber.py
+    python benchmarks/bench_text_scrubber.py --rows 200000
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from shared.masking.text_scrubber import TextScrubber
+
+
+NOTE_TEMPLATES = [
+    "Patient {name} admitted with {diagnosis}. Contact {phone} or {email}.",
+    "{name} (ID {national_id}) started {treatment}; follow-up at 12 King Fahd Road.",
+    "Discussed {diagnosis} with family. Callback 0{phone_local}. Policy INS{policy}.",
+    "No PII here: stable vitals, continue {treatment} and review in two weeks.",
+]
+
+
+def make_notes(rows: int):
+    """Build a notes column by filling templates with sample_healthcare rows.
+
+    Returns (source frame, notes frame)."""
+    source = pd.read_csv(os.path.join(BASE_DIR, 'test_data', 'sample_healthcare.csv'))
+    records = source.to_dict('records')
+    notes = []
+    for i in range(rows):
+        rec = records[i % len(records)]
+        template = NOTE_TEMPLATES[i % len(NOTE_TEMPLATES)]
+        notes.append(template.format(
+            name=rec['name'],
+            diagnosis=rec['diagnosis'],
+            treatment=rec['treatment'],
+            phone=rec['phone'],
+            phone_local=str(rec['phone'])[-9:],
+            email=rec['email'],
+            national_id=rec['national_id'],
+            policy=10000 + i % 90000,
+        ))
+    return source, pd.DataFrame({'notes': notes})
+
+
+def legacy_scrub_text(scrubber: TextScrubber, text: str) -> str:
+    """Pre-change behaviour: compile every pattern and the name alternation per cell"""
+    if pd.isna(text) or not isinstance(text, str):
+        return text
+
+    result = text
+    for pattern_list in scrubber.patterns.values():
+        for pattern in pattern_list:
+            result = re.compile(pattern, re.IGNORECASE).sub(scrubber.replacement, result)
+
+    escaped_names = [re.escape(name) for name in scrubber.names_to_scrub if name]
+    if escaped_names:
+        name_pattern = re.compile(r'\b(' + '|'.join(escaped_names) + r')\b', re.IGNORECASE)
+        result = name_pattern.sub(scrubber.replacement, result)
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text scrubber benchmark")
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=4, help="Process pool size for the parallel run")
+    args = parser.parse_args()
+
+    source, df = make_notes(args.rows)
+    names = TextScrubber.extract_names_from_column(source, 'name')
+
+    start = time.perf_counter()
+    scrubber = TextScrubber(text_columns=['notes'], names_to_scrub=names)
+    setup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = df['notes'].apply(lambda t: legacy_scrub_text(scrubber, t))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    current = scrubber.apply(df)['notes']
+    current_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel_scrubber = TextScrubber(
+        text_columns=['notes'], names_to_scrub=names, workers=args.workers, parallel_min_rows=1
+    )
+    parallel = parallel_scrubber.apply(df)['notes']
+    parallel_time = time.perf_counter() - start
+
+    differing = int((legacy != current).sum())
+    assert (parallel == current).all(), "Parallel output differs from in-process output"
+
+    print(f"  Rows:            {args.rows:,}")
+    print(f"  Names in list:   {len(names):,}")
+    print(f"  Setup (compile): {setup_time * 1000:.1f} ms")
+    print(f"  Before:          {args.rows / legacy_time:,.0f} rows/sec")
+    print(f"  After:           {args.rows / current_time:,.0f} rows/sec")
+    print(f"  Speedup:         {legacy_time / current_time:.1f}x")
+    print(f"  Parallel ({args.workers}w):   {args.rows / parallel_time:,.0f} rows/sec (incl. pool start)")
+    print(f"  Differing rows:  {differing:,}")
+
+
+if __name__ == "__main__":
+    main()
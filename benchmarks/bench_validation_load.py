@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+SADNxAI - Validation Load Benchmark
+Full-file read_csv vs column-projected categorical loading for /validate
+
+Writes a wide masked-looking CSV (default 120 columns, 5 quasi-identifiers,
+1 sensitive attribute), then times loading plus k/l/t both ways and checks
+the metrics agree.
+
+Usage:
+    python benchmarks/bench_validation_load.py
+    python benchmarks/bench_validation_load.py --rows 500000 --columns 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'validation-service'))
+
+from shared.tabular import PYARROW_AVAILABLE, read_table
+from metrics.k_anonymity import calculate_k_anonymity
+from metrics.l_diversity import calculate_l_diversity
+from metrics.t_closeness import calculate_t_closeness
+
+
+QUASI_IDENTIFIERS = ['age', 'gender', 'city', 'admission_date', 'zipcode']
+SENSITIVE_ATTRIBUTES = ['diagnosis']
+
+
+def make_csv(path: str, rows: int, columns: int, seed: int = 42) -> None:
+    """Write a wide CSV with generalized QIs, one SA and numeric filler columns"""
+    rng = np.random.default_rng(seed)
+    data = {
+        'age': rng.choice(['20-29', '30-39', '40-49', '50-59', '60+'], rows),
+        'gender': rng.choice(['Male', 'Female'], rows),
+        'city': rng.choice(['Riyadh Province', 'Makkah Province', 'Eastern Province'], rows),
+        'admission_date': rng.choice(['2023-Q1', '2023-Q2', '2023-Q3', '2023-Q4'], rows),
+        'zipcode': rng.choice(['11***', '12***', '21***', '31***'], rows),
+        'diagnosis': rng.choice(['Diabetes', 'Hypertension', 'Asthma', 'Migraine', 'Arthritis'], rows),
+    }
+    for i in range(columns - len(data)):
+        data[f'measure_{i}'] = rng.normal(size=rows).round(4)
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def run_metrics(df: pd.DataFrame) -> tuple:
+    return (
+        calculate_k_anonymity(df, QUASI_IDENTIFIERS)['k_value'],
+        calculate_l_diversity(df, QUASI_IDENTIFIERS, SENSITIVE_ATTRIBUTES)['l_value'],
+        calculate_t_closeness(df, QUASI_IDENTIFIERS, SENSITIVE_ATTRIBUTES)['t_value'],
+    )
+
+
+def timed(load):
+    start = time.perf_counter()
+    df = load()
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    metrics = run_metrics(df)
+    return df, load_time, time.perf_counter() - start, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation load benchmark")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--columns', type=int, default=120)
+    args = parser.parse_args()
+
+    columns = QUASI_IDENTIFIERS + SENSITIVE_ATTRIBUTES
+    dtype = {col: 'category' for col in columns}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'masked.csv')
+        make_csv(path, args.rows, args.columns)
+
+        runs = [('full read_csv', lambda: pd.read_csv(path))]
+        runs.append(('usecols+category (c)', lambda: read_table(path, columns, dtype, engine='c')))
+        if PYARROW_AVAILABLE:
+            runs.append(('usecols+category (pyarrow)', lambda: read_table(path, columns, dtype, engine='pyarrow')))
+
+        print(f"  Rows:     {args.rows:,}")
+        print(f"  Columns:  {args.columns} ({len(columns)} loaded)")
+        print()
+        print(f"  {'load':<28} {'load s':>8} {'metrics s':>10} {'MB':>9}")
+        print("  " + "-" * 58)
+
+        baseline = None
+        for name, load in runs:
+            df, load_time, metric_time, metrics = timed(load)
+            memory_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+            print(f"  {name:<28} {load_time:>8.2f} {metric_time:>10.2f} {memory_mb:>9.1f}")
+            if baseline is None:
+                baseline = metrics
+            assert metrics == baseline, f"{name} metrics {metrics} differ from {baseline}"
+
+
+if __name__ == "__main__":
+    main()
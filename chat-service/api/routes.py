@@ -6,7 +6,7 @@ Main API for frontend communication
 import os
 import json
 import pandas as pd
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, Header, HTTPException, UploadFile, File
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional, AsyncGenerator
@@ -16,15 +16,18 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from shared.models import (
     Session, SessionStatus, Message, MessageRole,
-    ToolCall,
+    ToolCall, GeneralizationConfig,
     ChatRequest, ChatResponse, UploadResponse
 )
+from shared.tabular import MEDIA_TYPES, detect_format
 
 from core.session import SessionManager
 from core.conversation import ConversationManager
+from core.ws_manager import manager
 from llm.adapter import LLMAdapter
 from llm.tools import ToolExecutor
 from pipeline.executor import PipelineExecutor
+from pipeline.queue import PipelineQueue
 
 
 router = APIRouter(prefix="/api")
@@ -33,10 +36,15 @@ router = APIRouter(prefix="/api")
 session_manager = SessionManager()
 llm_adapter = LLMAdapter(mock_mode=os.getenv("LLM_MOCK_MODE", "false").lower() == "true")
 pipeline_executor = PipelineExecutor()
+# Pipelines run on background workers (started in main.py), not in requests
+pipeline_queue = PipelineQueue(pipeline_executor, session_manager, notify=manager.send_to_session)
 
 # Maximum iterations for agentic loop (safety limit)
 MAX_AGENTIC_ITERATIONS = 10
 
+# Seconds between progress events while an SSE stream waits for its pipeline job
+SSE_PIPELINE_PROGRESS_INTERVAL = 15.0
+
 
 def _sse_event(event_type: str, data: Dict[str, Any]) -> str:
     """Format a Server-Sent Event with padding to force flush through proxies."""
@@ -473,9 +481,9 @@ def session_to_response(session: Session) -> SessionResponse:
 # ============================================================
 
 @router.post("/sessions")
-async def create_session():
-    """Create a new chat session"""
-    session = session_manager.create_session()
+async def create_session(x_tenant_id: Optional[str] = Header(default=None)):
+    """Create a new chat session (in the X-Tenant-ID header's tenant, if given)"""
+    session = session_manager.create_session(tenant_id=x_tenant_id or "default")
     return {"session_id": session.id}
 
 
@@ -511,6 +519,8 @@ async def delete_session(session_id: str):
             os.remove(session.output_path)
         if session.report_path and os.path.exists(session.report_path):
             os.remove(session.report_path)
+        if pipeline_executor.checkpoints:
+            pipeline_executor.checkpoints.forget(session_id)
 
     deleted = session_manager.delete_session(session_id)
     if not deleted:
@@ -706,27 +716,16 @@ async def chat(session_id: str, request: ChatRequest):
 
                 session_manager.update_session(session)
 
-                yield _sse_event("pipeline_masking", {"message": "Applying anonymization techniques..."})
-
-                # Execute pipeline
-                pipeline_result = await pipeline_executor.execute(session)
+                # A worker runs the pipeline; the stream relays its progress until it finishes
+                job = pipeline_queue.submit(session)
+                while job is not None and not job.finished:
+                    yield _sse_event("pipeline_masking", {"message": pipeline_queue.status_message(job), "job_id": job.id})
+                    job = await pipeline_queue.wait(job.id, timeout=SSE_PIPELINE_PROGRESS_INTERVAL)
 
-                if pipeline_result.get("error"):
-                    session.status = SessionStatus.FAILED
-                    yield _sse_event("message", {"content": f"Pipeline execution failed: {pipeline_result['error']}"})
-                else:
-                    if pipeline_result.get("validation_result"):
-                        session.validation_result = pipeline_result["validation_result"]
-                        session.output_path = pipeline_result.get("output_path")
-                        session.report_path = pipeline_result.get("report_path")
-
-                        if pipeline_result["validation_result"].passed:
-                            session.status = SessionStatus.COMPLETED
-                            yield _sse_event("message", {"content": "Anonymization complete! Validation passed. You can now download the anonymized CSV and privacy report."})
-                        else:
-                            session.status = SessionStatus.FAILED
-                            failed = pipeline_result["validation_result"].failed_metrics
-                            yield _sse_event("message", {"content": f"Validation failed for metrics: {', '.join(failed)}. You can still download the anonymized CSV and report. Would you like to adjust the generalization levels or thresholds and try again?"})
+                # The worker saved the outcome on the session
+                session = session_manager.get_session(session_id) or session
+                if job is not None and job.message:
+                    yield _sse_event("message", {"content": job.message})
 
         session_manager.update_session(session)
 
@@ -749,23 +748,76 @@ async def chat(session_id: str, request: ChatRequest):
 
 
 def _execute_pipeline(session: Session) -> Dict[str, Any]:
-    """Sync wrapper for pipeline execution (used in tool callback)"""
-    import asyncio
-    try:
-        # Try to get existing event loop (when called from async context)
-        loop = asyncio.get_running_loop()
-        # Create a task and return a placeholder - actual execution happens async
-        asyncio.ensure_future(pipeline_executor.execute(session))
-        # For sync context, we need to wait - but in async context just schedule it
-        return {"status": "pipeline_scheduled", "message": "Pipeline execution started in background"}
-    except RuntimeError:
-        # No running loop - create one (shouldn't happen in FastAPI but handle it)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(pipeline_executor.execute(session))
-        finally:
-            loop.close()
+    """Queue a pipeline run (used in tool callback)"""
+    job = pipeline_queue.submit(session)
+    return {"status": "pipeline_queued", "job_id": job.id, "message": "Pipeline execution queued"}
+
+
+# ============================================================
+# Masking Plan
+# ============================================================
+
+@router.get("/sessions/{session_id}/masking-plan")
+async def get_masking_plan(session_id: str):
+    """Preview the per-column masking plan for the session's classification"""
+    session = session_manager.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.classification is None:
+        raise HTTPException(status_code=400, detail="Session has no classification yet")
+
+    plan = await pipeline_executor.preview_masking_plan(session.classification)
+    if "error" in plan:
+        raise HTTPException(status_code=502, detail=f"Masking service error: {plan['error']}")
+
+    return plan
+
+
+@router.post("/sessions/{session_id}/optimize-generalization")
+async def optimize_generalization(session_id: str, apply: bool = False):
+    """
+    Find the least generalized levels that pass the session's thresholds.
+
+    With apply=true the recommended levels become the classification's
+    generalization_config, ready for the next pipeline run.
+    """
+    session = session_manager.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.classification is None:
+        raise HTTPException(status_code=400, detail="Session has no classification yet")
+
+    result = await pipeline_executor.optimize_generalization(session)
+    if "error" in result:
+        raise HTTPException(status_code=502, detail=f"Validation service error: {result['error']}")
+
+    if apply and result.get("recommended"):
+        session.classification.generalization_config = GeneralizationConfig(**result["recommended"])
+        session_manager.update_session(session)
+
+    return result
+
+
+@router.post("/sessions/{session_id}/revalidate")
+async def revalidate_session(session_id: str, request: GeneralizationConfig):
+    """
+    Preview the metrics of coarser generalization levels without re-running the pipeline.
+
+    Derived from the classes of the session's last validation. Returns 409
+    when the levels cannot be derived (e.g. finer than validated); execute
+    the pipeline with them instead.
+    """
+    session = session_manager.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    result = await pipeline_executor.revalidate(session, request)
+    if "error" in result:
+        raise HTTPException(status_code=result.get("status_code", 502), detail=result["error"])
+
+    return result
 
 
 # ============================================================
@@ -810,7 +862,7 @@ async def update_thresholds(session_id: str, request: ThresholdsRequest):
 
 @router.get("/sessions/{session_id}/download/data")
 async def download_data(session_id: str):
-    """Download anonymized CSV"""
+    """Download anonymized data (CSV, Parquet or Arrow)"""
     session = session_manager.get_session(session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -821,7 +873,7 @@ async def download_data(session_id: str):
     filename = os.path.basename(session.output_path)
     return FileResponse(
         session.output_path,
-        media_type="text/csv",
+        media_type=MEDIA_TYPES[detect_format(session.output_path)],
         filename=filename
     )
 
@@ -852,3 +904,25 @@ async def download_report(session_id: str):
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "chat-service"}
+
+
+@router.get("/pipeline/stats")
+async def pipeline_stats():
+    """Connection pool limits and request counters of the pipeline's service clients"""
+    return pipeline_executor.pool_stats()
+
+
+@router.get("/pipeline/queue")
+async def pipeline_queue_stats():
+    """Pipeline workers, queued jobs and running jobs per tenant"""
+    return pipeline_queue.stats()
+
+
+@router.get("/pipeline/jobs/{job_id}")
+async def get_pipeline_job(job_id: str):
+    """State of a pipeline job, with its place in the queue while pending"""
+    job = pipeline_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {**job.model_dump(), "position": pipeline_queue.position(job_id)}
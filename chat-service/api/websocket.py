@@ -22,7 +22,7 @@ from core.conversation import ConversationManager
 from core.ws_manager import manager
 from llm.adapter import LLMAdapter
 from llm.tools import ToolExecutor
-from pipeline.executor import PipelineExecutor
+from api.routes import pipeline_queue
 
 
 router = APIRouter()
@@ -30,7 +30,7 @@ router = APIRouter()
 # Initialize components (reuse from routes.py pattern)
 session_manager = SessionManager()
 llm_adapter = LLMAdapter(mock_mode=os.getenv("LLM_MOCK_MODE", "false").lower() == "true")
-pipeline_executor = PipelineExecutor()
+# pipeline_queue is shared with routes.py, so both submit to the same workers
 
 # Maximum iterations for agentic loop (safety limit)
 MAX_AGENTIC_ITERATIONS = 10
@@ -309,6 +309,7 @@ async def _handle_chat_message(
             break
 
     # Handle execute_pipeline if called
+    run_pipeline = False
     print(f"[WS Pipeline] terminal_tool_info={terminal_tool_info}")
     if terminal_tool_info and terminal_tool_info["tool_name"] == "execute_pipeline":
         print(f"[WS Pipeline] Executing pipeline...")
@@ -343,40 +344,24 @@ async def _handle_chat_message(
                 os.remove(session.report_path)
                 session.report_path = None
             session.validation_result = None
-
-            session_manager.update_session(session)
-
-            await _send_event(session_id, websocket, "pipeline_progress", {"stage": "masking", "message": "Applying anonymization techniques..."}, msg_id)
-
-            # Execute pipeline
-            pipeline_result = await pipeline_executor.execute(session)
-
-            if pipeline_result.get("error"):
-                session.status = SessionStatus.FAILED
-                await _send_event(session_id, websocket, "message", {"content": f"Pipeline execution failed: {pipeline_result['error']}"}, msg_id)
-            else:
-                if pipeline_result.get("validation_result"):
-                    session.validation_result = pipeline_result["validation_result"]
-                    session.output_path = pipeline_result.get("output_path")
-                    session.report_path = pipeline_result.get("report_path")
-
-                    if pipeline_result["validation_result"].passed:
-                        session.status = SessionStatus.COMPLETED
-                        await _send_event(session_id, websocket, "message", {
-                            "content": "Anonymization complete! Validation passed. You can now download the anonymized CSV and privacy report."
-                        }, msg_id)
-                    else:
-                        session.status = SessionStatus.FAILED
-                        failed = pipeline_result["validation_result"].failed_metrics
-                        await _send_event(session_id, websocket, "message", {
-                            "content": f"Validation failed for metrics: {', '.join(failed)}. You can still download the anonymized CSV and report. Would you like to adjust the generalization levels or thresholds and try again?"
-                        }, msg_id)
+            run_pipeline = True
 
     # Save session
     session_manager.update_session(session)
 
+    # Queue the pipeline only after the last save here, so it cannot overwrite the worker's result
+    job = pipeline_queue.submit(session) if run_pipeline else None
+
     # Send final session state and done event
     await _send_event(session_id, websocket, "session", _session_to_dict(session), msg_id)
+    if job is not None:
+        # The worker sends the outcome message, session state and done event
+        await _send_event(session_id, websocket, "pipeline_progress", {
+            "stage": "queued",
+            "job_id": job.id,
+            "message": pipeline_queue.status_message(pipeline_queue.get(job.id) or job)
+        }, msg_id)
+        return
     await _send_event(session_id, websocket, "done", {
         "status": session.status.value,
         "has_classification": session.classification is not None,
@@ -48,12 +48,13 @@ class SessionManager:
         """Deserialize session from JSON string"""
         return Session.model_validate_json(data)
 
-    def create_session(self, title: str = "New Chat") -> Session:
+    def create_session(self, title: str = "New Chat", tenant_id: str = "default") -> Session:
         """
         Create a new session.
 
         Args:
             title: Session title (default: "New Chat")
+            tenant_id: Tenant the session belongs to (scopes pipeline concurrency caps)
 
         Returns:
             New Session object
@@ -61,6 +62,7 @@ class SessionManager:
         session = Session(
             id=str(uuid.uuid4()),
             title=title,
+            tenant_id=tenant_id,
             status=SessionStatus.IDLE,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
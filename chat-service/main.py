@@ -16,7 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from api.routes import router
+from api.routes import router, pipeline_executor, pipeline_queue
 from api.websocket import router as ws_router
 
 # Create FastAPI app
@@ -56,10 +56,13 @@ async def startup_event():
         os.path.join(storage_path, "staging"),
         os.path.join(storage_path, "output"),
         os.path.join(storage_path, "reports"),
+        os.path.join(storage_path, "checkpoints"),
     ]
     for directory in directories:
         os.makedirs(directory, exist_ok=True)
 
+    await pipeline_queue.start()
+
     print("=" * 60)
     print(f"  Chat Service v{SERVICE_VERSION} (built {BUILD_DATE})")
     print("=" * 60)
@@ -69,9 +72,17 @@ async def startup_event():
     print(f"  Validation Service: {os.getenv('VALIDATION_SERVICE_URL', 'http://localhost:8002')}")
     print(f"  LLM Mock Mode: {os.getenv('LLM_MOCK_MODE', 'false')}")
     print(f"  WebSocket: /api/ws/{{session_id}}")
+    print(f"  Pipeline workers: {pipeline_queue.workers} (per tenant: {pipeline_queue.tenant_limit or 'no cap'})")
     print("=" * 60)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the pipeline workers and close pooled connections to the masking and validation services"""
+    await pipeline_queue.stop()
+    await pipeline_executor.close()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
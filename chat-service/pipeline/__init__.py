@@ -1,5 +1,7 @@
 """Pipeline Module"""
 
 from .executor import PipelineExecutor
+from .checkpoints import StageCheckpoints
+from .queue import PipelineQueue, PipelineJob, InMemoryJobStore, RedisJobStore
 
-__all__ = ["PipelineExecutor"]
+__all__ = ["PipelineExecutor", "StageCheckpoints", "PipelineQueue", "PipelineJob", "InMemoryJobStore", "RedisJobStore"]
@@ -0,0 +1,205 @@
+"""
+Pipeline Stage Checkpoints
+Content-addressed stage results, so a re-run skips stages whose inputs did not change
+"""
+
+import os
+import hmac
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import secrets
+from typing import Any, Dict, Iterable, Optional
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Write atomically, so readers never see a partial record"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class StageCheckpoints:
+    """
+    Stage results keyed by everything the stage's output depends on.
+
+    A key hashes the stage name with its inputs: the input file's content
+    hash, the classification fingerprint and the salt's HMAC for masking, the
+    masking key and thresholds for validation, and so on. Changing an
+    input changes the key of that stage and every stage after it, and
+    nothing before it: new thresholds re-run validation, not masking.
+
+    Files a result refers to are kept in the store, moved (intermediate
+    files nothing else uses) or copied (files other code may delete or
+    overwrite, restored on load). A result whose files are gone is a miss.
+
+    Per job the store also keeps what the job's salt is derived from, so
+    a re-run pseudonymizes exactly like the run it resumes, and the key of
+    the last validation, whose class aggregates the validation service
+    holds for the job.
+
+    The salt itself is never written to the store, which sits next to the
+    masked outputs: it is an HMAC, under a service secret, of the job id
+    and a random nonce kept in the store, and keys cover an HMAC of the
+    salt instead of the salt. Without the secret, the store does not help
+    to brute-force pseudonyms or undo date shifts.
+    """
+
+    def __init__(self, root: str, ttl: float = 7 * 24 * 3600, secret: Optional[bytes] = None):
+        """
+        Args:
+            root: Directory of the store
+            ttl: Seconds an unused checkpoint is kept
+            secret: Service secret salts are derived with (default: random
+                    per process, so salts and keys change on restart and
+                    checkpoints of earlier processes are not reused)
+        """
+        self.root = root
+        self.ttl = ttl
+        self._secret = secret or secrets.token_bytes(32)
+        # (path, size, mtime) -> content hash
+        self._file_hashes: Dict[tuple, str] = {}
+
+    def _path(self, name: str) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        return os.path.join(self.root, name)
+
+    def _job(self, job_id: str) -> Dict[str, Any]:
+        return _read_json(self._path(f"job-{job_id}.json")) or {}
+
+    def _update_job(self, job_id: str, **values) -> None:
+        _write_json(self._path(f"job-{job_id}.json"), {**self._job(job_id), **values})
+
+    def _hmac(self, purpose: str, value: str) -> str:
+        return hmac.new(self._secret, f"{purpose}:{value}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def salt(self, job_id: str) -> str:
+        """The job's pseudonymization salt, the same on every call until forget()"""
+        record = self._job(job_id)
+        nonce = record.get("nonce")
+        if nonce is None:
+            nonce = secrets.token_hex(16)
+            # Drop a plaintext salt left by an older version
+            record.pop("salt", None)
+            _write_json(self._path(f"job-{job_id}.json"), {**record, "nonce": nonce})
+        return self._hmac("salt", f"{job_id}:{nonce}")
+
+    def salt_id(self, salt: str) -> str:
+        """Stand-in for a salt in checkpoint keys (keys are stored in the clear)"""
+        return self._hmac("checkpoint", salt)
+
+    def last_validation(self, job_id: str) -> Optional[str]:
+        """Key of the job's last validation run"""
+        return self._job(job_id).get("validation")
+
+    def set_last_validation(self, job_id: str, key: str) -> None:
+        self._update_job(job_id, validation=key)
+
+    def forget(self, job_id: str) -> None:
+        """Drop a job's salt nonce and validation record (its checkpoints expire with the ttl)"""
+        try:
+            os.remove(self._path(f"job-{job_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def file_hash(self, path: str) -> str:
+        """SHA-256 of a file's content, cached while its size and mtime are unchanged"""
+        stat = os.stat(path)
+        cache_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if cache_key not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self._file_hashes[cache_key] = digest.hexdigest()
+        return self._file_hashes[cache_key]
+
+    @staticmethod
+    def key(stage: str, *inputs: Any) -> str:
+        """Checkpoint key of a stage from its (JSON-serializable) inputs"""
+        payload = json.dumps([stage, *inputs], sort_keys=True, default=str)
+        return f"{stage}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored result of a stage.
+
+        Returns:
+            The result as saved (copied files restored to their paths),
+            or None if there is none or its files are gone
+        """
+        record = _read_json(self._path(f"{key}.json"))
+        if record is None:
+            return None
+
+        result = record["result"]
+        stored = [*record["copies"].values(), *(result[field] for field in record["moved"])]
+        if not all(os.path.exists(path) for path in stored):
+            return None
+
+        for field, path in record["copies"].items():
+            os.makedirs(os.path.dirname(result[field]), exist_ok=True)
+            shutil.copy2(path, result[field])
+
+        # Loading counts as use for the ttl
+        os.utime(self._path(f"{key}.json"))
+        return result
+
+    def save(self, key: str, result: Dict[str, Any], move: Iterable[str] = (), copy: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Store a stage's result.
+
+        Args:
+            key: Checkpoint key
+            result: JSON-serializable stage result
+            move: Result fields naming files to move into the store
+                  (the returned result names the stored file)
+            copy: Result fields naming files to keep a copy of
+
+        Returns:
+            The result, with moved files' new paths
+        """
+        result = dict(result)
+        for field in move:
+            target = self._path(f"{key}{os.path.splitext(result[field])[1]}")
+            shutil.move(result[field], target)
+            result[field] = target
+        copies = {}
+        for field in copy:
+            copies[field] = self._path(f"{key}{os.path.splitext(result[field])[1]}")
+            shutil.copy2(result[field], copies[field])
+
+        _write_json(self._path(f"{key}.json"), {
+            "result": result,
+            "moved": list(move),
+            "copies": copies,
+            "created_at": time.time()
+        })
+        self.prune()
+        return result
+
+    def prune(self) -> None:
+        """Delete checkpoints unused for longer than the ttl"""
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self._path("")):
+            if not entry.name.endswith(".json") or entry.name.startswith("job-") or entry.stat().st_mtime >= cutoff:
+                continue
+            record = _read_json(entry.path) or {}
+            result = record.get("result", {})
+            files = [*record.get("copies", {}).values(), *(result.get(field) for field in record.get("moved", []))]
+            for path in [entry.path, *files]:
+                try:
+                    os.remove(path)
+                except (OSError, TypeError):
+                    pass
@@ -4,16 +4,113 @@ Orchestrates masking and validation services
 """
 
 import os
+import json
 import uuid
 import asyncio
 import httpx
-from typing import Dict, Any
+import pandas as pd
+from typing import Awaitable, Callable, Dict, Any, Optional
 from uuid import UUID
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from shared.models import Session, ValidationResult, MetricResult, RemediationSuggestion
+from shared.models import (
+    Classification, GeneralizationConfig, Session, ValidationResult, MetricResult, RemediationSuggestion
+)
+from shared.progress import NDJSON_MEDIA_TYPE
+from shared.tabular import FORMAT_EXTENSIONS, TableWriter, detect_format, iter_table_chunks, read_columns
+
+from .checkpoints import StageCheckpoints
+
+# Format of the masked file passed from masking to validation (csv, parquet, arrow)
+STAGING_FORMAT = os.getenv("PIPELINE_STAGING_FORMAT", "parquet")
+
+# Format of the anonymized file users download
+OUTPUT_FORMAT = os.getenv("PIPELINE_OUTPUT_FORMAT", "csv")
+
+# Rows per chunk when converting the staged file to the output format
+OUTPUT_CHUNK_ROWS = int(os.getenv("PIPELINE_OUTPUT_CHUNK_ROWS", "200000"))
+
+# Mask and validate in one validation-service call on the in-memory frame,
+# instead of writing a staging file and parsing it back
+FUSED_MASK_VALIDATE = os.getenv("PIPELINE_FUSED_MASK_VALIDATE", "true").lower() == "true"
+
+# /mask-and-validate loads the whole input, while /mask streams inputs above
+# the masking service's MASK_STREAMING_MIN_BYTES in chunks; larger inputs
+# take the two-call path so memory stays bounded
+FUSED_MAX_BYTES = int(os.getenv("MASK_STREAMING_MIN_BYTES", str(256 * 1024 * 1024)))
+
+# Keep stage results, so a re-run only repeats the stages whose inputs changed
+CHECKPOINTS_ENABLED = os.getenv("PIPELINE_CHECKPOINTS", "true").lower() == "true"
+CHECKPOINT_TTL_HOURS = float(os.getenv("PIPELINE_CHECKPOINT_TTL_HOURS", "168"))
+# Secret per-job salts are derived from (see StageCheckpoints). Must be the same
+# on every replica for their checkpoints to be shared; unset, a random one per process
+CHECKPOINT_SECRET = os.getenv("PIPELINE_CHECKPOINT_SECRET")
+
+# Connection pool per downstream service. Requests beyond max connections
+# wait for a free connection (within the call's timeout), which bounds the
+# load concurrent sessions put on each service.
+HTTP_MAX_CONNECTIONS = int(os.getenv("PIPELINE_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("PIPELINE_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("PIPELINE_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("PIPELINE_HTTP_CONNECT_TIMEOUT", "5"))
+
+# Progress callback: receives pipeline_progress payloads (see _progress_payload)
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# User-facing names of the stages the services report
+STAGE_LABELS = {
+    "READ": "Reading input",
+    "TEXT_SCRUB": "Scrubbing free text",
+    "SUPPRESS": "Suppressing direct identifiers",
+    "DATE_SHIFT": "Shifting dates",
+    "GENERALIZE": "Generalizing quasi-identifiers",
+    "PSEUDONYMIZE": "Pseudonymizing linkage identifiers",
+    "WRITE": "Writing anonymized data",
+    "METRICS": "Computing privacy metrics",
+    "ESTIMATE": "Estimating privacy metrics",
+    "REPORT": "Generating privacy report",
+}
+
+# HTTP/2 needs httpx[http2] and TLS service URLs (httpx negotiates it via ALPN
+# only); the services' uvicorn servers speak HTTP/1.1, so it is opt-in
+HTTP2_ENABLED = os.getenv("PIPELINE_HTTP2", "false").lower() == "true"
+
+
+def _convert_table(source: str, target: str) -> None:
+    """Copy a table file into another format chunk by chunk, so memory stays bounded"""
+    writer = TableWriter(target)
+    try:
+        written = False
+        for chunk in iter_table_chunks(source, OUTPUT_CHUNK_ROWS):
+            writer.write(chunk)
+            written = True
+        if not written:
+            # Header-only output
+            writer.write(pd.DataFrame(columns=read_columns(source)))
+    finally:
+        writer.close()
+
+
+def _progress_payload(event: Dict[str, Any]) -> Dict[str, Any]:
+    """pipeline_progress payload of a service progress event (see shared.progress)"""
+    stage = event.get("stage")
+    message = STAGE_LABELS.get(stage, "Processing")
+    if event.get("total_rows") and event.get("rows_processed"):
+        message += f" - {event.get('rows_processed', 0):,}/{event['total_rows']:,} rows"
+    if event.get("eta_seconds") is not None:
+        message += f" - about {max(1, round(event['eta_seconds']))}s left"
+    return {
+        "stage": stage,
+        "service": event.get("service"),
+        "rows_processed": event.get("rows_processed"),
+        "total_rows": event.get("total_rows"),
+        "elapsed_seconds": event.get("elapsed_seconds"),
+        "stage_timings": event.get("stage_timings", {}),
+        "eta_seconds": event.get("eta_seconds"),
+        "message": message + "..."
+    }
 
 
 class PipelineExecutor:
@@ -25,13 +122,23 @@ class PipelineExecutor:
     2. Call validation service to check privacy metrics
     3. Generate PDF report
     4. Move final output to output directory
+
+    Service calls go through one long-lived keep-alive client per
+    downstream service (see pool_stats); close() releases them.
+
+    Stage results are checkpointed (see StageCheckpoints): a retry after
+    a failed validation or report skips masking, and new thresholds only
+    re-run validation.
     """
 
     def __init__(
         self,
         masking_url: str = None,
         validation_url: str = None,
-        storage_path: str = None
+        storage_path: str = None,
+        limits: Optional[httpx.Limits] = None,
+        http2: Optional[bool] = None,
+        checkpoints: Optional[StageCheckpoints] = None
     ):
         """
         Initialize pipeline executor.
@@ -40,33 +147,227 @@ class PipelineExecutor:
             masking_url: URL of masking service
             validation_url: URL of validation service
             storage_path: Base storage path
+            limits: Connection pool limits per service (default from PIPELINE_HTTP_* env)
+            http2: Use HTTP/2 (default from PIPELINE_HTTP2)
+            checkpoints: Stage checkpoint store (default: <storage>/checkpoints,
+                         None if PIPELINE_CHECKPOINTS is off)
         """
         self.masking_url = masking_url or os.getenv("MASKING_SERVICE_URL", "http://localhost:8001")
         self.validation_url = validation_url or os.getenv("VALIDATION_SERVICE_URL", "http://localhost:8002")
         self.storage_path = storage_path or os.getenv("STORAGE_PATH", "/storage")
+        # Masking plans keyed on Classification.fingerprint()
+        self._plan_cache: Dict[str, Dict[str, Any]] = {}
+        if checkpoints is None and CHECKPOINTS_ENABLED:
+            checkpoints = StageCheckpoints(
+                os.path.join(self.storage_path, "checkpoints"),
+                ttl=CHECKPOINT_TTL_HOURS * 3600,
+                secret=CHECKPOINT_SECRET.encode("utf-8") if CHECKPOINT_SECRET else None
+            )
+        self.checkpoints = checkpoints
+
+        self.limits = limits or httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+        self.http2 = HTTP2_ENABLED if http2 is None else http2
+        # Long-lived clients per event loop and service, created on first use
+        self._clients: Dict[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]] = {}
+        self._stats = {
+            service: {"requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+            for service in ("masking", "validation")
+        }
+
+    def _client(self, service: str) -> httpx.AsyncClient:
+        """
+        Shared keep-alive client of a service.
 
-    async def execute(self, session: Session) -> Dict[str, Any]:
+        Clients are bound to the event loop they were created in; a call
+        from another loop gets new ones, and close() closes them all.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            # Clients of loops that have closed can no longer be used or closed
+            self._clients = {
+                client_loop: clients for client_loop, clients in self._clients.items() if not client_loop.is_closed()
+            }
+            self._clients[loop] = {}
+
+        clients = self._clients[loop]
+        if service not in clients:
+            clients[service] = httpx.AsyncClient(
+                base_url=self.masking_url if service == "masking" else self.validation_url,
+                limits=self.limits,
+                http2=self.http2,
+                timeout=httpx.Timeout(300.0, connect=HTTP_CONNECT_TIMEOUT)
+            )
+        return clients[service]
+
+    async def _post(self, service: str, path: str, payload: Dict[str, Any], timeout: float) -> httpx.Response:
+        """
+        POST to a service through its pooled client.
+
+        Args:
+            service: "masking" or "validation"
+            path: Endpoint path
+            payload: JSON body
+            timeout: Seconds allowed for the call (including waiting for a pooled connection)
+
+        Raises:
+            httpx.HTTPStatusError: On a 4xx/5xx response
+            httpx.HTTPError: On connection errors and timeouts
+        """
+        stats = self._stats[service]
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            response = await self._client(service).post(
+                path, json=payload, timeout=httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT)
+            )
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+
+    async def _post_stream(
+        self,
+        service: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        on_progress: ProgressCallback
+    ) -> Dict[str, Any]:
+        """
+        POST asking for the service's NDJSON progress stream (see shared.progress).
+
+        Progress events are passed to on_progress as pipeline_progress
+        payloads as they arrive; timeout bounds the wait for each line.
+
+        Returns:
+            The response body the plain endpoint would have returned
+
+        Raises:
+            httpx.HTTPStatusError: On a 4xx/5xx response or an error event
+            httpx.HTTPError: On connection errors, timeouts and a stream cut short
+        """
+        stats = self._stats[service]
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            async with self._client(service).stream(
+                "POST", path, json=payload, headers={"Accept": NDJSON_MEDIA_TYPE},
+                timeout=httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT)
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event["event"] == "progress":
+                        await on_progress(_progress_payload(event))
+                    elif event["event"] == "result":
+                        return event["result"]
+                    else:
+                        raise httpx.HTTPStatusError(
+                            f"{service} service error {event['status_code']}: {event['detail']}",
+                            request=response.request,
+                            response=response
+                        )
+            raise httpx.RemoteProtocolError(f"{service} service progress stream ended without a result")
+        except httpx.HTTPError:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+
+    async def _call(
+        self,
+        service: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Response body of a service call, streaming progress when on_progress is given"""
+        if on_progress is None:
+            response = await self._post(service, path, payload, timeout=timeout)
+            return response.json()
+        return await self._post_stream(service, path, payload, timeout, on_progress)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool configuration and request counters per service.
+
+        in_flight counts requests sent or waiting for a pooled connection;
+        peak_in_flight near max_connections means callers queue for the pool.
+        """
+        return {
+            "http2": self.http2,
+            "limits": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+            },
+            "services": {
+                service: {
+                    "base_url": self.masking_url if service == "masking" else self.validation_url,
+                    "open": any(
+                        service in clients and not clients[service].is_closed for clients in self._clients.values()
+                    ),
+                    **stats
+                }
+                for service, stats in self._stats.items()
+            }
+        }
+
+    async def close(self) -> None:
+        """Close the pooled clients of every event loop (at shutdown); later calls open new ones"""
+        loop = asyncio.get_running_loop()
+        all_clients, self._clients = self._clients, {}
+        for client_loop, clients in all_clients.items():
+            for client in clients.values():
+                if client_loop is loop:
+                    await client.aclose()
+                elif client_loop.is_running():
+                    # Connections are closed in the loop that owns them
+                    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), client_loop))
+
+    async def execute(self, session: Session, on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """
         Execute the full anonymization pipeline.
 
         Args:
             session: Session with classification and file info
+            on_progress: Awaited with a pipeline_progress payload (stage, rows,
+                         seconds per engine, ETA and a message) as stages advance
 
         Returns:
             Dict with results including:
                 - masked_path: Path to anonymized CSV
                 - validation_result: Validation metrics
                 - report_path: Path to PDF report (if validation passed)
+                - resumed_stages: Stages taken from checkpoints instead of run
         """
         # Use session.id as job_id to maintain consistency with PostgreSQL data
         job_id = session.id
-        salt = str(uuid.uuid4())  # Generate unique salt for this job
+        checkpoints = self.checkpoints
+        # One salt per job when checkpointing, so resumed stages match re-run ones
+        salt = checkpoints.salt(job_id) if checkpoints else str(uuid.uuid4())
 
         result = {
             "job_id": job_id,
             "masked_path": None,
             "validation_result": None,
             "report_path": None,
+            "resumed_stages": [],
             "error": None
         }
 
@@ -74,35 +375,95 @@ class PipelineExecutor:
             # Update job status to masking
             await self._update_job_status(job_id, "masking")
 
-            # Step 1: Masking
-            masking_result = await self._call_masking_service(
-                job_id=job_id,
-                input_path=session.file_path,
-                classification=session.classification,
-                salt=salt
-            )
+            # Each stage's key covers its inputs, including the key of the stage before
+            masking_result = validation_result = report_result = None
 
-            if "error" in masking_result:
-                result["error"] = f"Masking failed: {masking_result['error']}"
-                return result
+            async def report_stage(stage: str, message: str) -> None:
+                if on_progress:
+                    await on_progress({"stage": stage, "service": "pipeline", "message": message})
+            if checkpoints:
+                input_hash = await asyncio.to_thread(checkpoints.file_hash, session.file_path)
+                masking_key = checkpoints.key(
+                    "masking", input_hash, session.classification.fingerprint(), checkpoints.salt_id(salt)
+                )
+                validation_key = checkpoints.key("validation", masking_key, session.thresholds.model_dump(mode="json"))
+                report_key = checkpoints.key("report", validation_key, session.title)
+
+                masking_result = checkpoints.load(masking_key)
+                # The validation service keeps class aggregates (for revalidate) of the
+                # job's last validation only, so only that one may be skipped
+                if masking_result and checkpoints.last_validation(job_id) == validation_key:
+                    validation_result = checkpoints.load(validation_key)
+                if validation_result:
+                    report_result = checkpoints.load(report_key)
+                result["resumed_stages"] = [
+                    stage for stage, stage_result in
+                    [("masking", masking_result), ("validation", validation_result), ("report", report_result)]
+                    if stage_result
+                ]
+                if result["resumed_stages"]:
+                    await report_stage("RESUME", f"Resuming: reusing {', '.join(result['resumed_stages'])} from the last run...")
+
+            fuse = FUSED_MASK_VALIDATE and os.path.getsize(session.file_path) <= FUSED_MAX_BYTES
+            if masking_result is None and fuse:
+                # Steps 1-2 in one call; the masked file is written once, in the output format
+                fused_result = await self._call_mask_and_validate(
+                    job_id=job_id, session=session, salt=salt, on_progress=on_progress
+                )
+
+                if "error" in fused_result:
+                    result["error"] = f"Masking and validation failed: {fused_result['error']}"
+                    return result
+
+                masking_result = fused_result["masking"]
+                validation_result = fused_result["validation"]
+                if checkpoints:
+                    masking_result = checkpoints.save(masking_key, masking_result, move=["output_path"])
+                    checkpoints.save(validation_key, validation_result)
+                    checkpoints.set_last_validation(job_id, validation_key)
+
+            elif masking_result is None:
+                # Step 1: Masking
+                masking_result = await self._call_masking_service(
+                    job_id=job_id,
+                    input_path=session.file_path,
+                    classification=session.classification,
+                    salt=salt,
+                    on_progress=on_progress
+                )
+
+                if "error" in masking_result:
+                    result["error"] = f"Masking failed: {masking_result['error']}"
+                    return result
+
+                if checkpoints:
+                    masking_result = checkpoints.save(masking_key, masking_result, move=["output_path"])
 
             result["masked_path"] = masking_result["output_path"]
 
-            # Update job status to validating
-            await self._update_job_status(job_id, "validating")
+            if validation_result is None:
+                # Update job status to validating
+                await self._update_job_status(job_id, "validating")
+
+                # Step 2: Validation
+                validation_result = await self._call_validation_service(
+                    job_id=job_id,
+                    input_path=masking_result["output_path"],
+                    quasi_identifiers=session.classification.quasi_identifiers,
+                    sensitive_attributes=session.classification.sensitive_attributes,
+                    thresholds=session.thresholds,
+                    generalization_config=session.classification.generalization_config,
+                    column_types=masking_result.get("column_types", {}),
+                    on_progress=on_progress
+                )
 
-            # Step 2: Validation
-            validation_result = await self._call_validation_service(
-                job_id=job_id,
-                input_path=masking_result["output_path"],
-                quasi_identifiers=session.classification.quasi_identifiers,
-                sensitive_attributes=session.classification.sensitive_attributes,
-                thresholds=session.thresholds
-            )
+                if "error" in validation_result:
+                    result["error"] = f"Validation failed: {validation_result['error']}"
+                    return result
 
-            if "error" in validation_result:
-                result["error"] = f"Validation failed: {validation_result['error']}"
-                return result
+                if checkpoints:
+                    checkpoints.save(validation_key, validation_result)
+                    checkpoints.set_last_validation(job_id, validation_key)
 
             # Convert to ValidationResult model
             result["validation_result"] = ValidationResult(
@@ -120,11 +481,15 @@ class PipelineExecutor:
             await self._save_validation_to_db(job_id, validation_result)
 
             # Step 3: Generate report (always, regardless of pass/fail)
-            report_result = await self._call_report_service(
-                job_id=job_id,
-                session=session,
-                validation_result=validation_result
-            )
+            if report_result is None:
+                await report_stage("REPORT", f"{STAGE_LABELS['REPORT']}...")
+                report_result = await self._call_report_service(
+                    job_id=job_id,
+                    session=session,
+                    validation_result=validation_result
+                )
+                if checkpoints and "error" not in report_result:
+                    checkpoints.save(report_key, report_result, copy=["report_path"])
 
             if "error" not in report_result:
                 result["report_path"] = report_result["report_path"]
@@ -183,29 +548,90 @@ class PipelineExecutor:
             # Log but don't fail pipeline if DB save fails
             print(f"Warning: Failed to save validation results to DB: {e}")
 
+    async def preview_masking_plan(self, classification: Classification) -> Dict[str, Any]:
+        """
+        Get the masking plan for a classification without running it.
+
+        Plans are cached per classification fingerprint, so repeated
+        previews of an unchanged classification skip the HTTP call.
+        """
+        key = classification.fingerprint()
+        if key in self._plan_cache:
+            return self._plan_cache[key]
+
+        try:
+            response = await self._post("masking", "/plan", classification.model_dump(mode="json"), timeout=30.0)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+        plan = response.json()
+        self._plan_cache[key] = plan
+        return plan
+
+    async def revalidate(self, session: Session, generalization_config: GeneralizationConfig) -> Dict[str, Any]:
+        """
+        Metrics of the session's last validated job at coarser generalization levels.
+
+        The validation service rolls up the classes it stored for the job
+        instead of masking and scanning the file again. The result has
+        "error" (and "status_code" 409) when the levels cannot be derived
+        from the validated ones; the pipeline must then be executed.
+        """
+        try:
+            response = await self._post("validation", "/revalidate", {
+                "job_id": session.id,
+                "generalization_config": generalization_config.model_dump(),
+                "thresholds": session.thresholds.model_dump()
+            }, timeout=60.0)
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            # Keep the service's reason (e.g. which levels are not derivable)
+            detail = e.response.json().get("detail") if "json" in e.response.headers.get("content-type", "") else None
+            return {"error": detail or str(e), "status_code": e.response.status_code}
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    async def optimize_generalization(self, session: Session) -> Dict[str, Any]:
+        """
+        Search the generalization levels that pass the session's thresholds.
+
+        One call to the validation service replaces guessing levels and
+        re-running the pipeline until failed_metrics is empty. The result
+        lists the minimal passing levels, least information loss first,
+        and the recommended GeneralizationConfig (None if none pass).
+        """
+        classification = session.classification
+        try:
+            response = await self._post("validation", "/optimize", {
+                "job_id": session.id,
+                "input_path": session.file_path,
+                "quasi_identifiers": classification.quasi_identifiers,
+                "sensitive_attributes": classification.sensitive_attributes,
+                "thresholds": session.thresholds.model_dump()
+            }, timeout=300.0)
+            return response.json()
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
     async def _call_masking_service(
         self,
         job_id: str,
         input_path: str,
         classification: Any,
-        salt: str
+        salt: str,
+        on_progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """Call masking service to anonymize data."""
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.masking_url}/mask",
-                    json={
-                        "job_id": job_id,
-                        "input_path": input_path,
-                        "classification": classification.model_dump(),
-                        "salt": salt
-                    }
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                return {"error": str(e)}
+        try:
+            return await self._call("masking", "/mask", {
+                "job_id": job_id,
+                "input_path": input_path,
+                "classification": classification.model_dump(),
+                "salt": salt,
+                "output_format": STAGING_FORMAT
+            }, timeout=300.0, on_progress=on_progress)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
 
     async def _call_validation_service(
         self,
@@ -213,25 +639,54 @@ class PipelineExecutor:
         input_path: str,
         quasi_identifiers: list,
         sensitive_attributes: list,
-        thresholds: Any
+        thresholds: Any,
+        generalization_config: GeneralizationConfig = None,
+        column_types: Dict[str, str] = None,
+        on_progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
-        """Call validation service to check privacy metrics."""
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.validation_url}/validate",
-                    json={
-                        "job_id": job_id,
-                        "input_path": input_path,
-                        "quasi_identifiers": quasi_identifiers,
-                        "sensitive_attributes": sensitive_attributes,
-                        "thresholds": thresholds.model_dump()
-                    }
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                return {"error": str(e)}
+        """
+        Call validation service to check privacy metrics.
+
+        With the generalization levels and column types the file was masked
+        with, the service also keeps the job's classes for revalidate().
+        """
+        try:
+            return await self._call("validation", "/validate", {
+                "job_id": job_id,
+                "input_path": input_path,
+                "quasi_identifiers": quasi_identifiers,
+                "sensitive_attributes": sensitive_attributes,
+                "thresholds": thresholds.model_dump(),
+                "generalization_config": generalization_config.model_dump() if generalization_config else None,
+                "column_types": column_types or {}
+            }, timeout=300.0, on_progress=on_progress)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    async def _call_mask_and_validate(
+        self,
+        job_id: str,
+        session: Session,
+        salt: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Call validation service to mask the input and validate it in memory.
+
+        Returns:
+            Dict with "masking" (as from /mask) and "validation" (as from /validate)
+        """
+        try:
+            return await self._call("validation", "/mask-and-validate", {
+                "job_id": job_id,
+                "input_path": session.file_path,
+                "classification": session.classification.model_dump(),
+                "salt": salt,
+                "thresholds": session.thresholds.model_dump(),
+                "output_format": OUTPUT_FORMAT
+            }, timeout=600.0, on_progress=on_progress)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
 
     async def _call_report_service(
         self,
@@ -240,20 +695,15 @@ class PipelineExecutor:
         validation_result: Dict
     ) -> Dict[str, Any]:
         """Call validation service to generate PDF report."""
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.validation_url}/report",
-                    json={
-                        "job_id": job_id,
-                        "session": session.model_dump(mode="json"),
-                        "validation_result": validation_result
-                    }
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                return {"error": str(e)}
+        try:
+            response = await self._post("validation", "/report", {
+                "job_id": job_id,
+                "session": session.model_dump(mode="json"),
+                "validation_result": validation_result
+            }, timeout=120.0)
+            return response.json()
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
 
     async def _move_to_output(
         self,
@@ -262,12 +712,17 @@ class PipelineExecutor:
         original_filename: str,
         passed: bool = True
     ) -> str:
-        """Move masked file to output directory with proper naming."""
+        """
+        Move masked file to output directory with proper naming.
+
+        The file is copied when the staging format matches OUTPUT_FORMAT
+        and converted otherwise (e.g. Parquet staging to CSV output).
+        """
         import shutil
 
         # Generate output filename (same name regardless of pass/fail for easy retry)
         base_name = os.path.splitext(original_filename)[0]
-        output_filename = f"{base_name}_anonymized.csv"
+        output_filename = f"{base_name}_anonymized{FORMAT_EXTENSIONS[OUTPUT_FORMAT]}"
         output_dir = os.path.join(self.storage_path, "output")
         output_path = os.path.join(output_dir, output_filename)
 
@@ -278,7 +733,10 @@ class PipelineExecutor:
         if os.path.exists(output_path):
             os.remove(output_path)
 
-        # Copy file
-        shutil.copy2(masked_path, output_path)
+        # Copy file, converting if the staging format differs
+        if detect_format(masked_path) == OUTPUT_FORMAT:
+            shutil.copy2(masked_path, output_path)
+        else:
+            await asyncio.to_thread(_convert_table, masked_path, output_path)
 
         return output_path
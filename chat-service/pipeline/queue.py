@@ -0,0 +1,535 @@
+"""
+Pipeline Job Queue
+Runs pipelines on a pool of background workers instead of inside requests
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import bisect
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from shared.models import Session, SessionStatus, Message, MessageRole
+
+# Job store: "redis" (shared by every chat-service replica) or "memory" (this process only)
+QUEUE_BACKEND = os.getenv("PIPELINE_QUEUE_BACKEND", "redis")
+
+# Pipelines run at once by this process
+WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+# Pipelines run at once per tenant, across all workers (0: no cap)
+TENANT_CONCURRENCY = int(os.getenv("PIPELINE_TENANT_CONCURRENCY", "2"))
+
+# Seconds an idle worker waits before looking for jobs again. Jobs
+# submitted in this process wake workers at once; this bounds the delay
+# for jobs submitted by other replicas and tenant slots freed there.
+POLL_INTERVAL = float(os.getenv("PIPELINE_QUEUE_POLL_INTERVAL", "1.0"))
+
+# Job store failures (e.g. Redis unreachable) are retried after
+# poll_interval, doubling per failure up to this many seconds
+STORE_RETRY_MAX_DELAY = float(os.getenv("PIPELINE_QUEUE_RETRY_MAX_DELAY", "30"))
+
+# Attempts to release a finished job before its tenant slot is given up
+RELEASE_ATTEMPTS = 5
+
+# Job priority per tenant, e.g. "acme:10,trial:-5" (unlisted tenants get 0)
+TENANT_PRIORITIES = {
+    tenant.strip(): int(priority)
+    for tenant, _, priority in (
+        entry.partition(":") for entry in os.getenv("PIPELINE_TENANT_PRIORITIES", "").split(",") if entry.strip()
+    )
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class PipelineJob(BaseModel):
+    """
+    A queued pipeline run of a session.
+
+    status is the job's own state: completed means the pipeline ran to the
+    end, whether or not validation passed (see session_status).
+    """
+    id: str
+    session_id: str
+    tenant_id: str = "default"
+    priority: int = 0
+    status: str = QUEUED
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    message: Optional[str] = None
+    session_status: Optional[str] = None
+    # Last pipeline_progress payload of a running job
+    progress: Optional[Dict[str, Any]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+
+def apply_pipeline_result(session: Session, result: Dict[str, Any]) -> Optional[str]:
+    """
+    Copy a PipelineExecutor.execute result onto the session.
+
+    Args:
+        session: Session the pipeline ran for
+        result: Result of PipelineExecutor.execute
+
+    Returns:
+        Message for the user, or None if the result has no validation outcome
+    """
+    if result.get("error"):
+        session.status = SessionStatus.FAILED
+        return f"Pipeline execution failed: {result['error']}"
+
+    validation_result = result.get("validation_result")
+    if not validation_result:
+        return None
+
+    session.validation_result = validation_result
+    session.output_path = result.get("output_path")
+    session.report_path = result.get("report_path")
+
+    if validation_result.passed:
+        session.status = SessionStatus.COMPLETED
+        return "Anonymization complete! Validation passed. You can now download the anonymized CSV and privacy report."
+
+    session.status = SessionStatus.FAILED
+    return (
+        f"Validation failed for metrics: {', '.join(validation_result.failed_metrics)}. "
+        "You can still download the anonymized CSV and report. "
+        "Would you like to adjust the generalization levels or thresholds and try again?"
+    )
+
+
+class InMemoryJobStore:
+    """
+    Job store in process memory.
+
+    Stand-in for RedisJobStore in tests and single-process deployments;
+    jobs are lost on restart and invisible to other processes.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, PipelineJob] = {}
+        # (-priority, submission order, job_id), kept sorted
+        self._pending: List[tuple] = []
+        self._running: Dict[str, int] = {}
+        self._order = itertools.count()
+
+    def push(self, job: PipelineJob) -> None:
+        """Add a queued job"""
+        self._jobs[job.id] = job.model_copy()
+        bisect.insort(self._pending, (-job.priority, next(self._order), job.id))
+
+    def claim(self, tenant_limit: int) -> Optional[PipelineJob]:
+        """
+        Take the highest-priority pending job whose tenant is under its cap.
+
+        Args:
+            tenant_limit: Running jobs allowed per tenant (0: no cap)
+
+        Returns:
+            The job (counted as running for its tenant until release), or None
+        """
+        for i, (_, _, job_id) in enumerate(self._pending):
+            job = self._jobs[job_id]
+            if tenant_limit and self._running.get(job.tenant_id, 0) >= tenant_limit:
+                continue
+            del self._pending[i]
+            self._running[job.tenant_id] = self._running.get(job.tenant_id, 0) + 1
+            return job.model_copy()
+        return None
+
+    def save(self, job: PipelineJob) -> None:
+        """Store a job's current state"""
+        self._jobs[job.id] = job.model_copy()
+
+    def release(self, job: PipelineJob) -> None:
+        """Store a finished job and free its tenant slot"""
+        self.save(job)
+        self._running[job.tenant_id] = max(self._running.get(job.tenant_id, 0) - 1, 0)
+
+    def get(self, job_id: str) -> Optional[PipelineJob]:
+        job = self._jobs.get(job_id)
+        return job.model_copy() if job else None
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Number of pending jobs ahead of a pending job (None if not pending)"""
+        for i, (_, _, pending_id) in enumerate(self._pending):
+            if pending_id == job_id:
+                return i
+        return None
+
+    def counts(self) -> Dict[str, Any]:
+        """Pending jobs and running jobs per tenant"""
+        return {
+            "pending": len(self._pending),
+            "running": {tenant: n for tenant, n in self._running.items() if n}
+        }
+
+
+# Atomically pop the first pending job whose tenant is under the cap.
+# KEYS: pending zset, running-per-tenant hash; ARGV: job key prefix, cap
+_CLAIM_SCRIPT = """
+local limit = tonumber(ARGV[2])
+for _, job_id in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    local data = redis.call('GET', ARGV[1] .. job_id)
+    if not data then
+        redis.call('ZREM', KEYS[1], job_id)
+    else
+        local tenant = cjson.decode(data)['tenant_id']
+        local running = tonumber(redis.call('HGET', KEYS[2], tenant) or '0')
+        if limit == 0 or running < limit then
+            redis.call('ZREM', KEYS[1], job_id)
+            redis.call('HINCRBY', KEYS[2], tenant, 1)
+            return data
+        end
+    end
+end
+return false
+"""
+
+
+class RedisJobStore:
+    """
+    Job store in Redis, shared by every chat-service replica.
+
+    Jobs are JSON strings under pipeline:job:<id>, pending job ids a
+    sorted set ordered by priority then submission time, and running
+    counts a hash per tenant. Claims run as one Lua script, so replicas
+    never take the same job or overrun a tenant's cap. A replica that
+    dies mid-job leaves its tenant slot taken until the count is reset.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "pipeline:", job_ttl: int = 7 * 24 * 3600):
+        """
+        Args:
+            redis_url: Redis connection URL (default from env)
+            prefix: Key prefix
+            job_ttl: Seconds finished jobs are kept
+        """
+        import redis
+
+        redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.redis = redis.from_url(redis_url, decode_responses=True)
+        self.job_prefix = f"{prefix}job:"
+        self.pending_key = f"{prefix}pending"
+        self.running_key = f"{prefix}running"
+        self.job_ttl = job_ttl
+        self._claim = self.redis.register_script(_CLAIM_SCRIPT)
+
+    def push(self, job: PipelineJob) -> None:
+        # Priority dominates; within a priority, earlier submissions first
+        score = -job.priority * 1e10 + job.created_at
+        pipe = self.redis.pipeline()
+        pipe.set(f"{self.job_prefix}{job.id}", job.model_dump_json())
+        pipe.zadd(self.pending_key, {job.id: score})
+        pipe.execute()
+
+    def claim(self, tenant_limit: int) -> Optional[PipelineJob]:
+        data = self._claim(keys=[self.pending_key, self.running_key], args=[self.job_prefix, tenant_limit])
+        return PipelineJob.model_validate_json(data) if data else None
+
+    def save(self, job: PipelineJob) -> None:
+        key = f"{self.job_prefix}{job.id}"
+        if job.finished:
+            self.redis.set(key, job.model_dump_json(), ex=self.job_ttl)
+        else:
+            self.redis.set(key, job.model_dump_json())
+
+    def release(self, job: PipelineJob) -> None:
+        self.save(job)
+        if self.redis.hincrby(self.running_key, job.tenant_id, -1) <= 0:
+            self.redis.hdel(self.running_key, job.tenant_id)
+
+    def get(self, job_id: str) -> Optional[PipelineJob]:
+        data = self.redis.get(f"{self.job_prefix}{job_id}")
+        return PipelineJob.model_validate_json(data) if data else None
+
+    def position(self, job_id: str) -> Optional[int]:
+        return self.redis.zrank(self.pending_key, job_id)
+
+    def counts(self) -> Dict[str, Any]:
+        return {
+            "pending": self.redis.zcard(self.pending_key),
+            "running": {tenant: int(n) for tenant, n in self.redis.hgetall(self.running_key).items() if int(n) > 0}
+        }
+
+
+class PipelineQueue:
+    """
+    Background workers running queued pipelines.
+
+    Requests submit a job and return; a worker claims it (highest
+    priority first, skipping tenants at their concurrency cap), runs
+    PipelineExecutor.execute, stores the outcome on the session and pushes
+    pipeline_progress, message, session and done events to the session's
+    WebSocket connections.
+    """
+
+    def __init__(
+        self,
+        executor,
+        session_manager,
+        store=None,
+        notify: Optional[Callable[[str, Dict[str, Any]], Awaitable[Any]]] = None,
+        workers: int = WORKERS,
+        tenant_limit: int = TENANT_CONCURRENCY,
+        poll_interval: float = POLL_INTERVAL
+    ):
+        """
+        Args:
+            executor: PipelineExecutor whose execute is the worker body
+            session_manager: SessionManager the sessions are loaded from and saved to
+            store: InMemoryJobStore or RedisJobStore (default per PIPELINE_QUEUE_BACKEND)
+            notify: Coroutine sending a message dict to a session's connections
+                    (ConnectionManager.send_to_session)
+            workers: Concurrent pipelines in this process
+            tenant_limit: Concurrent pipelines per tenant (0: no cap)
+            poll_interval: Seconds between checks for jobs when idle
+        """
+        self.executor = executor
+        self.session_manager = session_manager
+        if store is None:
+            store = RedisJobStore() if QUEUE_BACKEND == "redis" else InMemoryJobStore()
+        self.store = store
+        self.notify = notify
+        self.workers = workers
+        self.tenant_limit = tenant_limit
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._active: Dict[str, PipelineJob] = {}
+
+    async def start(self) -> None:
+        """Start the workers in the running event loop"""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; their running jobs are marked failed"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, session: Session, priority: Optional[int] = None) -> PipelineJob:
+        """
+        Queue a pipeline run of a session.
+
+        Args:
+            session: Session to run, as saved by the session manager
+            priority: Higher runs first (default: the tenant's PIPELINE_TENANT_PRIORITIES entry)
+
+        Returns:
+            The queued job
+        """
+        if priority is None:
+            priority = TENANT_PRIORITIES.get(session.tenant_id, 0)
+        job = PipelineJob(
+            id=str(uuid.uuid4()),
+            session_id=session.id,
+            tenant_id=session.tenant_id,
+            priority=priority,
+            created_at=time.time()
+        )
+        self.store.push(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[PipelineJob]:
+        return self.store.get(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Pending jobs ahead of a job (None once it has started)"""
+        return self.store.position(job_id)
+
+    def status_message(self, job: PipelineJob) -> str:
+        """Progress line for a job that has not finished"""
+        if job.status == QUEUED:
+            ahead = self.position(job.id)
+            if ahead:
+                return f"Waiting for a pipeline worker ({ahead} run(s) ahead)..."
+            return "Waiting for a pipeline worker..."
+        if job.progress and job.progress.get("message"):
+            return job.progress["message"]
+        return "Applying anonymization techniques..."
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[PipelineJob]:
+        """
+        Wait for a job to finish.
+
+        Args:
+            job_id: Job to wait for
+            timeout: Seconds to wait at most (None: until it finishes)
+
+        Returns:
+            The job, finished unless the timeout passed first (None if unknown)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job.finished:
+                return job
+            delay = self.poll_interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return job
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker configuration, queue depth and running jobs"""
+        return {
+            "workers": self.workers,
+            "tenant_limit": self.tenant_limit,
+            "active": len(self._active),
+            **self.store.counts()
+        }
+
+    async def _send(self, job: PipelineJob, event_type: str, payload: Dict[str, Any]) -> None:
+        """Push an event to the job's session connections"""
+        if self.notify is None:
+            return
+        try:
+            await self.notify(job.session_id, {
+                "type": event_type,
+                "payload": payload,
+                "id": job.id,
+                "timestamp": time.time()
+            })
+        except Exception as e:
+            print(f"[Pipeline Queue] Failed to notify session {job.session_id}: {e}")
+
+    def _retry_delay(self, failures: int) -> float:
+        return min(self.poll_interval * 2 ** (failures - 1), STORE_RETRY_MAX_DELAY)
+
+    async def _work(self) -> None:
+        """Worker loop: claim a job, run it, repeat; store errors are logged and retried"""
+        failures = 0
+        while True:
+            self._wakeup.clear()
+            try:
+                job = self.store.claim(self.tenant_limit)
+            except Exception as e:
+                failures += 1
+                print(f"[Pipeline Queue] Failed to claim a job (attempt {failures}): {e}")
+                await asyncio.sleep(self._retry_delay(failures))
+                continue
+            failures = 0
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Pipeline errors are handled in _run; this is the job or session store failing
+                print(f"[Pipeline Queue] Worker error on job {job.id}: {e}")
+            finally:
+                # A freed tenant slot may unblock jobs other workers skipped
+                self._wakeup.set()
+
+    async def _release(self, job: PipelineJob) -> None:
+        """Release a finished job, retrying store errors (a lost release keeps its tenant slot taken)"""
+        for attempt in range(1, RELEASE_ATTEMPTS + 1):
+            try:
+                self.store.release(job)
+                return
+            except Exception as e:
+                print(f"[Pipeline Queue] Failed to release job {job.id} (attempt {attempt}): {e}")
+                if attempt < RELEASE_ATTEMPTS:
+                    await asyncio.sleep(self._retry_delay(attempt))
+
+    async def _run(self, job: PipelineJob) -> None:
+        """Run a claimed job and publish its outcome"""
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._active[job.id] = job
+
+        session = None
+        try:
+            self.store.save(job)
+            session = self.session_manager.get_session(job.session_id)
+            if session is None:
+                raise ValueError("Session not found")
+
+            await self._send(job, "pipeline_progress", {
+                "stage": "masking",
+                "job_id": job.id,
+                "message": self.status_message(job)
+            })
+
+            async def on_progress(progress: Dict[str, Any]) -> None:
+                job.progress = progress
+                # Saved for status polls and SSE streams served by other processes
+                try:
+                    self.store.save(job)
+                except Exception as e:
+                    print(f"[Pipeline Queue] Failed to save progress of job {job.id}: {e}")
+                await self._send(job, "pipeline_progress", {**progress, "job_id": job.id})
+
+            result = await self.executor.execute(session, on_progress=on_progress)
+
+            # Apply to the latest saved state, which may have new messages
+            session = self.session_manager.get_session(job.session_id) or session
+            job.message = apply_pipeline_result(session, result)
+            job.status = FAILED if result.get("error") else COMPLETED
+            job.error = result.get("error")
+
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = "Pipeline worker stopped"
+            if session is not None:
+                session.status = SessionStatus.FAILED
+                job.message = f"Pipeline execution failed: {job.error}"
+            raise
+
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            if session is not None:
+                session.status = SessionStatus.FAILED
+                job.message = f"Pipeline execution failed: {e}"
+
+        finally:
+            job.finished_at = time.time()
+            try:
+                if session is not None:
+                    if job.message:
+                        session.messages.append(Message(role=MessageRole.ASSISTANT, content=job.message))
+                    self.session_manager.update_session(session)
+                    job.session_status = session.status.value
+            finally:
+                await self._release(job)
+                self._active.pop(job.id, None)
+
+        if session is None:
+            return
+        if job.message:
+            await self._send(job, "message", {"content": job.message})
+        await self._send(job, "session", session.model_dump(mode="json"))
+        await self._send(job, "done", {
+            "status": session.status.value,
+            "has_classification": session.classification is not None,
+            "has_validation": session.validation_result is not None
+        })
@@ -4,20 +4,22 @@ Masking Service API Routes
 
 import os
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict
+from typing import Callable, Dict, Optional, Set, Tuple
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from shared.models import Classification
-
-from engine.suppressor import Suppressor
-from engine.date_shifter import DateShifter
-from engine.generalizer import Generalizer
-from engine.pseudonymizer import Pseudonymizer
-from engine.text_scrubber import TextScrubber
+from shared.models import Classification, MaskingPlan
+from shared.progress import NDJSON_MEDIA_TYPE, ProgressTracker, ndjson_progress, wants_progress
+from shared.tabular import (
+    FORMAT_EXTENSIONS, TableWriteError, TableWriter, check_format, count_rows, iter_table_chunks, read_columns,
+    read_table, write_table
+)
+from shared.masking.text_scrubber import TextScrubber
+from shared.masking.plan import compile_plan, MaskingPlanExecutor
 
 
 router = APIRouter()
@@ -28,6 +30,20 @@ INPUT_PATH = os.path.join(STORAGE_PATH, "input")
 STAGING_PATH = os.path.join(STORAGE_PATH, "staging")
 OUTPUT_PATH = os.path.join(STORAGE_PATH, "output")
 
+# Text scrubbing process pool (small inputs always scrub in-process)
+TEXT_SCRUB_WORKERS = int(os.getenv("TEXT_SCRUB_WORKERS", str(min(4, os.cpu_count() or 1))))
+TEXT_SCRUB_MIN_ROWS = int(os.getenv("TEXT_SCRUB_MIN_ROWS", "20000"))
+
+# Threads running independent column chains of the masking plan
+MASK_COLUMN_WORKERS = int(os.getenv("MASK_COLUMN_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Format of the masked staging file: csv, parquet or arrow
+MASK_OUTPUT_FORMAT = os.getenv("MASK_OUTPUT_FORMAT", "csv")
+
+# Streaming: files above this size are masked in chunks of MASK_CHUNK_ROWS rows
+MASK_STREAMING_MIN_BYTES = int(os.getenv("MASK_STREAMING_MIN_BYTES", str(256 * 1024 * 1024)))
+MASK_CHUNK_ROWS = int(os.getenv("MASK_CHUNK_ROWS", "200000"))
+
 
 class MaskingRequest(BaseModel):
     """Request model for masking endpoint"""
@@ -35,6 +51,8 @@ class MaskingRequest(BaseModel):
     input_path: str
     classification: Classification
     salt: str
+    chunk_size: Optional[int] = None
+    output_format: Optional[str] = None
 
 
 class MaskingResponse(BaseModel):
@@ -43,173 +61,220 @@ class MaskingResponse(BaseModel):
     techniques_applied: Dict[str, str]
     rows_processed: int
     columns_masked: int
+    stage_timings: Dict[str, float] = {}
+    column_types: Dict[str, str] = {}
+
+
+def _extract_names_to_scrub(df: pd.DataFrame, plan: MaskingPlan) -> Set[str]:
+    """Extract names from columns being suppressed (like 'name' column)"""
+    names_to_scrub = set()
+    for col in plan.columns("SUPPRESS"):
+        if col in df.columns:
+            names_to_scrub.update(TextScrubber.extract_names_from_column(df, col))
+    return names_to_scrub
+
+
+def _build_executor(
+    plan: MaskingPlan,
+    salt: str,
+    names_to_scrub: Set[str],
+    on_stage: Optional[Callable[[str, int, int], None]] = None
+) -> MaskingPlanExecutor:
+    """Executor for one request; reused across chunks when streaming"""
+    return MaskingPlanExecutor(
+        plan,
+        salt=salt,
+        names_to_scrub=names_to_scrub,
+        max_workers=MASK_COLUMN_WORKERS,
+        text_scrub_workers=TEXT_SCRUB_WORKERS,
+        text_scrub_min_rows=TEXT_SCRUB_MIN_ROWS,
+        on_stage=on_stage
+    )
+
+
+def _mask_streaming(
+    request: MaskingRequest,
+    output_path: str,
+    chunk_size: int,
+    progress: Optional[ProgressTracker] = None
+) -> Tuple[int, Dict[str, str], Dict[str, float], Dict[str, str]]:
+    """
+    Mask a table file in fixed-size row chunks, appending each to the output.
+
+    Memory is bounded by the chunk size. Pseudonyms depend only on the
+    value and date offsets on the row index, which continues across
+    chunks, so output matches the in-memory path.
+
+    Returns:
+        Tuple of (rows processed, techniques applied per column, stage timings,
+        hierarchy type per generalized column)
+    """
+    plan = compile_plan(request.classification)
+    if progress:
+        progress.total_rows = count_rows(request.input_path)
+        progress.update(stage="READ")
+
+    # Pass 1: names from suppressed columns, loading only those columns
+    header = read_columns(request.input_path)
+    name_columns = [col for col in plan.columns("SUPPRESS") if col in header]
+    names_to_scrub = set()
+    if name_columns:
+        for chunk in iter_table_chunks(request.input_path, chunk_size, columns=name_columns):
+            names_to_scrub.update(_extract_names_to_scrub(chunk, plan))
+
+    # Pass 2: mask chunk by chunk with one executor
+    rows_processed = 0
+    chunk_rows = 0
+
+    def on_stage(stage: str, done: int, total: int) -> None:
+        # Rows of earlier chunks plus the share of this chunk's operations done
+        fraction = (rows_processed + chunk_rows * done / total) / progress.total_rows if progress.total_rows else None
+        progress.update(stage=stage, fraction=fraction, stage_timings=executor.stage_timings)
+
+    executor = _build_executor(plan, request.salt, names_to_scrub, on_stage=on_stage if progress else None)
+    writer = TableWriter(output_path)
+    techniques_applied = {}
+
+    try:
+        for chunk in iter_table_chunks(request.input_path, chunk_size):
+            chunk_rows = len(chunk)
+            masked, applied = executor.execute(chunk)
+            writer.write(masked)
+
+            rows_processed += len(chunk)
+            techniques_applied.update(applied)
+            if progress:
+                progress.update(stage="WRITE", rows_processed=rows_processed, stage_timings=executor.stage_timings)
+    finally:
+        writer.close()
+
+    return rows_processed, techniques_applied, executor.stage_timings, executor.generalizer.column_types
+
+
+@router.post("/plan", response_model=MaskingPlan)
+async def preview_plan(classification: Classification) -> MaskingPlan:
+    """
+    Compile the masking plan for a classification without running it.
+
+    The plan is keyed on classification.fingerprint(), so callers can
+    cache it per classification.
+    """
+    return compile_plan(classification)
 
 
 @router.post("/mask", response_model=MaskingResponse)
-async def mask_data(request: MaskingRequest) -> MaskingResponse:
+async def mask_data(request: MaskingRequest, accept: Optional[str] = Header(default=None)):
     """
     Apply masking techniques to a CSV file.
 
-    The masking pipeline runs in order:
+    The classification is compiled into a MaskingPlan whose stages run in order:
+    0. Text Scrub - Redact PII from free-text sensitive columns
     1. Suppress - Remove direct identifiers
     2. Date Shift - Apply random offset to dates
     3. Generalize - Apply hierarchies to quasi-identifiers
     4. Pseudonymize - Hash linkage identifiers
 
+    Independent columns run concurrently; stage_timings in the response
+    reports the seconds spent per stage.
+
+    Files larger than MASK_STREAMING_MIN_BYTES (or requests with an explicit
+    chunk_size) are streamed in row chunks so memory stays bounded.
+
+    Input may be CSV, Parquet or Arrow IPC (by extension). The staging
+    output uses request.output_format, defaulting to MASK_OUTPUT_FORMAT.
+
+    With "Accept: application/x-ndjson" the response streams progress
+    events (rows processed, stage, seconds per engine, ETA) and ends with
+    the MaskingResponse as a result event (see shared.progress).
+
     Args:
         request: MaskingRequest with file path and classification
+        accept: Accept header
 
     Returns:
         MaskingResponse with output path and statistics
     """
+    if wants_progress(accept):
+        return StreamingResponse(
+            ndjson_progress(lambda progress: _mask(request, progress), "masking"),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    return _mask(request)
+
+
+def _mask(request: MaskingRequest, progress: Optional[ProgressTracker] = None) -> MaskingResponse:
+    """Mask request's input file (see mask_data), reporting to progress if given"""
     # Validate input file exists
     if not os.path.exists(request.input_path):
         raise HTTPException(status_code=404, detail=f"Input file not found: {request.input_path}")
 
-    # Read CSV
+    # Ensure staging directory exists
+    os.makedirs(STAGING_PATH, exist_ok=True)
+
     try:
-        df = pd.read_csv(request.input_path)
+        output_format = check_format(request.output_format or MASK_OUTPUT_FORMAT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    output_filename = f"{request.job_id}_masked{FORMAT_EXTENSIONS[output_format]}"
+    output_path = os.path.join(STAGING_PATH, output_filename)
+
+    chunk_size = request.chunk_size
+    if chunk_size is None and os.path.getsize(request.input_path) > MASK_STREAMING_MIN_BYTES:
+        chunk_size = MASK_CHUNK_ROWS
+
+    if chunk_size:
+        try:
+            rows_processed, techniques_applied, stage_timings, column_types = _mask_streaming(
+                request, output_path, chunk_size, progress
+            )
+        except TableWriteError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to write output: {str(e)}")
+        except (pd.errors.ParserError, UnicodeDecodeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Failed to read input: {str(e)}")
+        except OSError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to write output: {str(e)}")
+
+        # Header-only files yield no chunks; fall through to the in-memory path
+        if rows_processed:
+            return MaskingResponse(
+                output_path=output_path,
+                techniques_applied=techniques_applied,
+                rows_processed=rows_processed,
+                columns_masked=len(techniques_applied),
+                stage_timings=stage_timings,
+                column_types=column_types
+            )
+
+    # Read input (CSV, Parquet or Arrow, by extension)
+    if progress:
+        progress.update(stage="READ")
+    try:
+        df = read_table(request.input_path)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read CSV: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Failed to read input: {str(e)}")
 
     rows_processed = len(df)
-    techniques_applied = {}
+    plan = compile_plan(request.classification)
 
-    classification = request.classification
+    # Extract names BEFORE suppression for text scrubbing
+    names_to_scrub = _extract_names_to_scrub(df, plan)
 
-    # Step 0: Extract names BEFORE suppression for text scrubbing
-    names_to_scrub = set()
-    if classification.recommended_techniques:
-        for col, technique in classification.recommended_techniques.items():
-            if technique.upper() == "SUPPRESS" and col in df.columns:
-                # Extract names from columns being suppressed (like 'name' column)
-                names_to_scrub.update(TextScrubber.extract_names_from_column(df, col))
-
-    # Step 0.5: Scrub PII from sensitive text columns (before other operations)
-    text_columns_to_scrub = []
-    if classification.sensitive_attributes:
-        for col in classification.sensitive_attributes:
-            # Scrub text columns (likely to contain free text with embedded PII)
-            if col in df.columns and df[col].dtype == 'object':
-                text_columns_to_scrub.append(col)
-
-    if text_columns_to_scrub:
-        text_scrubber = TextScrubber(
-            text_columns=text_columns_to_scrub,
-            names_to_scrub=names_to_scrub,
-            replacement="[REDACTED]"
-        )
-        scrubbed = text_scrubber.get_scrubbed_columns(df)
-        df = text_scrubber.apply(df)
-        for col in scrubbed:
-            techniques_applied[col] = "TEXT_SCRUBBED"
-
-    # Step 1: Suppress columns - USE recommended_techniques as source of truth
-    # This ensures correct behavior even if AI categorizes a column in the wrong array
-    columns_to_suppress = []
-
-    if classification.recommended_techniques:
-        # Primary: Use recommended_techniques to determine what to suppress
-        for col, technique in classification.recommended_techniques.items():
-            if technique.upper() == "SUPPRESS" and col in df.columns:
-                columns_to_suppress.append(col)
-    else:
-        # Fallback: If no recommended_techniques, use direct_identifiers array
-        columns_to_suppress = list(classification.direct_identifiers) if classification.direct_identifiers else []
-
-    if columns_to_suppress:
-        suppressor = Suppressor(columns_to_suppress)
-        suppressed = suppressor.get_suppressed_columns(df)
-        df = suppressor.apply(df)
-        for col in suppressed:
-            techniques_applied[col] = "SUPPRESSED"
-
-    # Step 2: Date shift - USE recommended_techniques as source of truth
-    columns_to_date_shift = []
-
-    if classification.recommended_techniques:
-        # Primary: Use recommended_techniques to determine what to date shift
-        for col, technique in classification.recommended_techniques.items():
-            if technique.upper() == "DATE_SHIFT" and col in df.columns:
-                columns_to_date_shift.append(col)
-    else:
-        # Fallback: If no recommended_techniques, use date_columns array
-        columns_to_date_shift = list(classification.date_columns) if classification.date_columns else []
-
-    if columns_to_date_shift:
-        date_shifter = DateShifter(
-            date_columns=columns_to_date_shift,
-            salt=request.salt,
-            min_days=-365,
-            max_days=365
-        )
-        shifted = date_shifter.get_shifted_columns(df)
-        df = date_shifter.apply(df)
-        for col in shifted:
-            techniques_applied[col] = "DATE_SHIFTED"
-
-    # Step 3: Generalize - USE recommended_techniques as source of truth
-    columns_to_generalize = []
-
-    if classification.recommended_techniques:
-        # Primary: Use recommended_techniques to determine what to generalize
-        for col, technique in classification.recommended_techniques.items():
-            if technique.upper() == "GENERALIZE" and col in df.columns:
-                columns_to_generalize.append(col)
-    else:
-        # Fallback: If no recommended_techniques, use quasi_identifiers array
-        columns_to_generalize = list(classification.quasi_identifiers) if classification.quasi_identifiers else []
-
-    if columns_to_generalize:
-        gen_config = classification.generalization_config
-        generalizer = Generalizer(
-            quasi_identifiers=columns_to_generalize,
-            age_level=gen_config.age_level,
-            location_level=gen_config.location_level,
-            date_level=gen_config.date_level
-        )
-        generalized = generalizer.get_generalized_columns(df)
-        df = generalizer.apply(df)
-        for col in generalized:
-            techniques_applied[col] = "GENERALIZED"
-
-    # Step 4: Pseudonymize - USE recommended_techniques as source of truth
-    columns_to_pseudonymize = []
-
-    if classification.recommended_techniques:
-        # Primary: Use recommended_techniques to determine what to pseudonymize
-        for col, technique in classification.recommended_techniques.items():
-            if technique.upper() == "PSEUDONYMIZE" and col in df.columns:
-                columns_to_pseudonymize.append(col)
-    else:
-        # Fallback: If no recommended_techniques, use linkage_identifiers array
-        columns_to_pseudonymize = list(classification.linkage_identifiers) if classification.linkage_identifiers else []
-
-    if columns_to_pseudonymize:
-        pseudonymizer = Pseudonymizer(
-            linkage_columns=columns_to_pseudonymize,
-            salt=request.salt,
-            hash_length=12
-        )
-        pseudonymized = pseudonymizer.get_pseudonymized_columns(df)
-        df = pseudonymizer.apply(df)
-        for col in pseudonymized:
-            techniques_applied[col] = "PSEUDONYMIZED"
+    on_stage = None
+    if progress:
+        progress.total_rows = rows_processed
 
-    # Mark sensitive attributes as kept
-    for col in classification.sensitive_attributes:
-        if col in df.columns and col not in techniques_applied:
-            techniques_applied[col] = "KEPT"
+        def on_stage(stage: str, done: int, total: int) -> None:
+            progress.update(stage=stage, fraction=done / total, stage_timings=executor.stage_timings)
 
-    # Ensure staging directory exists
-    os.makedirs(STAGING_PATH, exist_ok=True)
+    executor = _build_executor(plan, request.salt, names_to_scrub, on_stage=on_stage)
+    df, techniques_applied = executor.execute(df)
 
     # Write output
-    output_filename = f"{request.job_id}_masked.csv"
-    output_path = os.path.join(STAGING_PATH, output_filename)
-
+    if progress:
+        progress.update(stage="WRITE", rows_processed=rows_processed, stage_timings=executor.stage_timings)
     try:
-        df.to_csv(output_path, index=False)
+        write_table(df, output_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write output: {str(e)}")
 
@@ -219,7 +284,9 @@ async def mask_data(request: MaskingRequest) -> MaskingResponse:
         output_path=output_path,
         techniques_applied=techniques_applied,
         rows_processed=rows_processed,
-        columns_masked=columns_masked
+        columns_masked=columns_masked,
+        stage_timings=executor.stage_timings,
+        column_types=executor.generalizer.column_types
     )
 
 
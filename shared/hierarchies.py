@@ -0,0 +1,470 @@
+"""
+SADNxAI - Generalization Hierarchies
+Value hierarchies for quasi-identifiers, shared by masking and validation
+
+The masking service generalizes raw values to a level (0-3) of these
+hierarchies. Because each hierarchy is monotone, labels at one level can
+often be coarsened to a higher level without the raw values;
+coarsen_labels does that for the validation service, which re-derives
+privacy metrics for a coarser GeneralizationConfig from stored
+equivalence classes.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Saudi Arabia location hierarchies
+SAUDI_CITIES_TO_PROVINCE = {
+    # Eastern Province
+    "dammam": "Eastern Province",
+    "dhahran": "Eastern Province",
+    "khobar": "Eastern Province",
+    "al khobar": "Eastern Province",
+    "jubail": "Eastern Province",
+    "qatif": "Eastern Province",
+    "hofuf": "Eastern Province",
+    "al hofuf": "Eastern Province",
+    "al ahsa": "Eastern Province",
+    "ras tanura": "Eastern Province",
+
+    # Riyadh Province
+    "riyadh": "Riyadh Province",
+    "diriyah": "Riyadh Province",
+    "kharj": "Riyadh Province",
+    "al kharj": "Riyadh Province",
+    "majmaah": "Riyadh Province",
+
+    # Makkah Province
+    "mecca": "Makkah Province",
+    "makkah": "Makkah Province",
+    "jeddah": "Makkah Province",
+    "taif": "Makkah Province",
+    "rabigh": "Makkah Province",
+
+    # Madinah Province
+    "medina": "Madinah Province",
+    "madinah": "Madinah Province",
+    "yanbu": "Madinah Province",
+
+    # Qassim Province
+    "buraidah": "Qassim Province",
+    "unaizah": "Qassim Province",
+
+    # Asir Province
+    "abha": "Asir Province",
+    "khamis mushait": "Asir Province",
+
+    # Tabuk Province
+    "tabuk": "Tabuk Province",
+
+    # Hail Province
+    "hail": "Hail Province",
+
+    # Northern Borders
+    "arar": "Northern Borders Province",
+
+    # Jazan Province
+    "jazan": "Jazan Province",
+    "jizan": "Jazan Province",
+
+    # Najran Province
+    "najran": "Najran Province",
+
+    # Al Bahah Province
+    "al bahah": "Al Bahah Province",
+    "bahah": "Al Bahah Province",
+
+    # Al Jawf Province
+    "sakakah": "Al Jawf Province",
+}
+
+PROVINCE_TO_REGION = {
+    "Eastern Province": "Eastern",
+    "Riyadh Province": "Central",
+    "Makkah Province": "Western",
+    "Madinah Province": "Western",
+    "Qassim Province": "Central",
+    "Asir Province": "Southern",
+    "Tabuk Province": "Northern",
+    "Hail Province": "Northern",
+    "Northern Borders Province": "Northern",
+    "Jazan Province": "Southern",
+    "Najran Province": "Southern",
+    "Al Bahah Province": "Southern",
+    "Al Jawf Province": "Northern",
+}
+
+# Age category boundaries (level 3): <18 Child, <65 Adult, else Senior
+AGE_CATEGORY_BOUNDS = np.array([18, 65])
+AGE_CATEGORY_LABELS = np.array(["Child", "Adult", "Senior"], dtype=object)
+
+# GeneralizationConfig field that sets the level of each column type
+LEVEL_FIELDS = {
+    "age": "age_level",
+    "date": "date_level",
+    "location": "location_level",
+    "zipcode": "location_level",
+    "gender": "location_level",
+    "generic": "location_level",
+}
+
+_AGE_RANGE = re.compile(r"^(-?\d+)-(-?\d+)$")
+_MONTH = re.compile(r"^(\d{4})-(\d{2})$")
+_ZIPCODE = re.compile(r"^(\d*)(\**)$")
+
+
+def generalize_age(age: Any, level: int) -> str:
+    """
+    Generalize age value.
+
+    Level 0: 34
+    Level 1: 30-34 (5-year range)
+    Level 2: 30-39 (10-year range)
+    Level 3: Adult/Child/Senior
+    """
+    if pd.isna(age):
+        return None
+
+    try:
+        age_int = int(float(age))
+    except (ValueError, TypeError):
+        return str(age)
+
+    if level == 0:
+        return str(age_int)
+    elif level == 1:
+        # 5-year range
+        lower = (age_int // 5) * 5
+        upper = lower + 4
+        return f"{lower}-{upper}"
+    elif level == 2:
+        # 10-year range
+        lower = (age_int // 10) * 10
+        upper = lower + 9
+        return f"{lower}-{upper}"
+    else:
+        # Category
+        if age_int < 18:
+            return "Child"
+        elif age_int < 65:
+            return "Adult"
+        else:
+            return "Senior"
+
+
+def generalize_location(location: Any, level: int) -> str:
+    """
+    Generalize location value.
+
+    Level 0: Dammam (city)
+    Level 1: Eastern Province
+    Level 2: Eastern (region)
+    Level 3: Saudi Arabia
+    """
+    if pd.isna(location):
+        return None
+
+    loc_str = str(location).strip().lower()
+
+    if level == 0:
+        return str(location)
+    elif level == 1:
+        # City to Province
+        return SAUDI_CITIES_TO_PROVINCE.get(loc_str, str(location))
+    elif level == 2:
+        # City to Region
+        province = SAUDI_CITIES_TO_PROVINCE.get(loc_str, None)
+        if province:
+            return PROVINCE_TO_REGION.get(province, province)
+        # Maybe it's already a province
+        return PROVINCE_TO_REGION.get(str(location), str(location))
+    else:
+        # Country level
+        return "Saudi Arabia"
+
+
+def generalize_date(date_val: Any, level: int) -> str:
+    """
+    Generalize date value.
+
+    Level 0: 2024-03-15
+    Level 1: 2024-W11 (week)
+    Level 2: 2024-03 (month)
+    Level 3: 2024-Q1 (quarter)
+    """
+    if pd.isna(date_val):
+        return None
+
+    try:
+        if isinstance(date_val, str):
+            dt = pd.to_datetime(date_val)
+        else:
+            dt = pd.Timestamp(date_val)
+    except Exception:
+        return str(date_val)
+
+    if level == 0:
+        return dt.strftime('%Y-%m-%d')
+    elif level == 1:
+        # ISO week
+        return f"{dt.year}-W{dt.isocalendar()[1]:02d}"
+    elif level == 2:
+        # Month
+        return dt.strftime('%Y-%m')
+    else:
+        # Quarter
+        quarter = (dt.month - 1) // 3 + 1
+        return f"{dt.year}-Q{quarter}"
+
+
+def zipcode_stars(digits: int, level: int) -> int:
+    """Number of trailing digits a zipcode with this many digits loses at a level"""
+    if level == 0:
+        return 0
+    if level in (1, 2) and digits > level:
+        return level
+    return max(0, digits - 2)
+
+
+def generalize_zipcode(zipcode: Any, level: int) -> str:
+    """
+    Generalize zipcode by truncating digits.
+
+    Level 0: 12345
+    Level 1: 1234*
+    Level 2: 123**
+    Level 3: 12***
+    """
+    if pd.isna(zipcode):
+        return None
+
+    zip_str = str(zipcode).strip()
+    if level == 0:
+        return zip_str
+
+    # Remove non-digits
+    digits = re.sub(r'\D', '', zip_str)
+    stars = zipcode_stars(len(digits), level)
+    return digits[:len(digits) - stars] + '*' * stars
+
+
+def generalize_gender(gender: Any, level: int) -> str:
+    """
+    Generalize gender.
+
+    Level 0-2: Keep original (M/F or Male/Female)
+    Level 3: * (suppress)
+    """
+    if pd.isna(gender):
+        return None
+
+    if level >= 3:
+        return "*"
+    return str(gender)
+
+
+def generalize_generic(value: Any, level: int) -> str:
+    """
+    Generic generalization by truncation.
+
+    Level 0: Full value
+    Level 1: First 75% of chars
+    Level 2: First 50% of chars
+    Level 3: First char + *
+    """
+    if pd.isna(value):
+        return None
+
+    val_str = str(value)
+
+    if level == 0:
+        return val_str
+    elif level == 1:
+        keep = max(1, int(len(val_str) * 0.75))
+        return val_str[:keep] + '*' * (len(val_str) - keep)
+    elif level == 2:
+        keep = max(1, int(len(val_str) * 0.5))
+        return val_str[:keep] + '*' * (len(val_str) - keep)
+    else:
+        return val_str[0] + '*' * max(0, len(val_str) - 1) if val_str else '*'
+
+
+GENERALIZERS = {
+    "age": generalize_age,
+    "location": generalize_location,
+    "date": generalize_date,
+    "zipcode": generalize_zipcode,
+    "gender": generalize_gender,
+    "generic": generalize_generic,
+}
+
+
+def detect_column_type(col_name: str, sample_values: pd.Series) -> str:
+    """
+    Auto-detect column type based on name and values.
+
+    Args:
+        col_name: Column name
+        sample_values: Sample of column values
+
+    Returns:
+        Detected type: 'age', 'location', 'date', 'gender', 'zipcode', 'generic'
+    """
+    col_lower = col_name.lower()
+
+    # Check by column name patterns
+    if any(x in col_lower for x in ['age', 'عمر']):
+        return 'age'
+    if any(x in col_lower for x in ['city', 'location', 'address', 'مدينة', 'province', 'region']):
+        return 'location'
+    if any(x in col_lower for x in ['gender', 'sex', 'جنس']):
+        return 'gender'
+    if any(x in col_lower for x in ['zip', 'postal', 'رمز']):
+        return 'zipcode'
+    if any(x in col_lower for x in ['date', 'تاريخ']) and not pd.api.types.is_datetime64_any_dtype(sample_values):
+        return 'date'
+
+    # Check by value patterns
+    non_null = sample_values.dropna()
+    if len(non_null) > 0:
+        # Check if numeric (potential age)
+        if pd.api.types.is_numeric_dtype(non_null):
+            if non_null.min() >= 0 and non_null.max() <= 120:
+                return 'age'
+
+        # Check if looks like city names
+        sample_str = str(non_null.iloc[0]).lower() if len(non_null) > 0 else ""
+        if sample_str in SAUDI_CITIES_TO_PROVINCE:
+            return 'location'
+
+    return 'generic'
+
+
+def level_field(column_type: Optional[str]) -> str:
+    """GeneralizationConfig field for a column type (unknown types are generic)"""
+    return LEVEL_FIELDS.get(column_type, LEVEL_FIELDS["generic"])
+
+
+def _coarsen_age(label: str, to_level: int) -> Any:
+    """5- or 10-year range to a wider range or category; False if it spans categories"""
+    match = _AGE_RANGE.match(label)
+    if not match:
+        # Non-numeric ages are kept as they are at every level
+        return label
+    lower, upper = int(match.group(1)), int(match.group(2))
+    if to_level == 2:
+        lower = (lower // 10) * 10
+        return f"{lower}-{lower + 9}"
+    first, last = np.searchsorted(AGE_CATEGORY_BOUNDS, [lower, upper], side='right')
+    return AGE_CATEGORY_LABELS[first] if first == last else False
+
+
+def _coarsen_date(label: str) -> str:
+    """Month to quarter"""
+    match = _MONTH.match(label)
+    if not match:
+        # Unparseable dates are kept as they are at every level
+        return label
+    return f"{match.group(1)}-Q{(int(match.group(2)) - 1) // 3 + 1}"
+
+
+def _coarsen_zipcode(label: str, from_level: int, to_level: int) -> Any:
+    """Truncated zipcode to a shorter prefix; False if the target keeps more digits"""
+    match = _ZIPCODE.match(label)
+    if not match:
+        return False
+    digits = len(label)
+    stars = zipcode_stars(digits, to_level)
+    if stars < zipcode_stars(digits, from_level) or len(match.group(2)) != zipcode_stars(digits, from_level):
+        return False
+    return label[:digits - stars] + '*' * stars
+
+
+def coarsen_labels(column_type: Optional[str], labels: np.ndarray, from_level: int, to_level: int) -> Optional[np.ndarray]:
+    """
+    Map generalized labels to a coarser level of their hierarchy.
+
+    The result equals generalizing the raw values at to_level directly.
+    Coarser labels are taken from the finer labels alone, which is only
+    possible when every finer label lies within one coarser label: a
+    5-year age range straddling 18 or 65 cannot become a category, and
+    weeks cannot become months or quarters.
+
+    Args:
+        column_type: Hierarchy type ('age', 'location', 'date', 'gender', 'zipcode', 'generic')
+        labels: Labels at from_level (None for missing)
+        from_level: Level the labels were generalized to
+        to_level: Target level (0-3)
+
+    Returns:
+        Object array of labels at to_level, or None if they cannot be derived
+    """
+    labels = np.asarray(labels, dtype=object)
+    if to_level == from_level:
+        return labels
+    if to_level < from_level:
+        return None
+
+    column_type = column_type if column_type in GENERALIZERS else "generic"
+    if column_type == "date" and from_level == 1:
+        # ISO weeks cross month and quarter boundaries
+        return None
+
+    if from_level == 0 or column_type not in ("age", "date", "zipcode"):
+        # Raw values, and hierarchies whose labels generalize like raw values
+        generalize = GENERALIZERS[column_type]
+        coarsen = lambda label: generalize(label, to_level)
+    elif column_type == "age":
+        coarsen = lambda label: _coarsen_age(label, to_level)
+    elif column_type == "date":
+        coarsen = _coarsen_date
+    else:
+        coarsen = lambda label: _coarsen_zipcode(label, from_level, to_level)
+
+    result = np.empty(len(labels), dtype=object)
+    for i, label in enumerate(labels):
+        if label is None or (not isinstance(label, str) and pd.isna(label)):
+            result[i] = None
+            continue
+        coarse = coarsen(str(label))
+        if coarse is False:
+            return None
+        result[i] = coarse
+    return result
+
+
+def coarsen_columns(
+    labels: Dict[str, np.ndarray],
+    column_types: Dict[str, str],
+    from_levels: Dict[str, int],
+    to_levels: Dict[str, int]
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Coarsen several generalized columns from one GeneralizationConfig to another.
+
+    Columns without a type were not generalized and keep their labels.
+
+    Args:
+        labels: Labels per column at from_levels
+        column_types: Hierarchy type per generalized column
+        from_levels: GeneralizationConfig the labels were made with (as a dict)
+        to_levels: Target GeneralizationConfig (as a dict)
+
+    Returns:
+        Labels per column at to_levels, or None if any column cannot be derived
+    """
+    result = {}
+    for column, values in labels.items():
+        if column not in column_types:
+            result[column] = values
+            continue
+        field = level_field(column_types[column])
+        coarse = coarsen_labels(column_types[column], values, from_levels[field], to_levels[field])
+        if coarse is None:
+            return None
+        result[column] = coarse
+    return result
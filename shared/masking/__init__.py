@@ -1,8 +1,10 @@
 """Masking Engine Module"""
 
+from .base import MaskingEngine
 from .suppressor import Suppressor
 from .date_shifter import DateShifter
 from .generalizer import Generalizer
+from .mondrian import Mondrian
 from .pseudonymizer import Pseudonymizer
 
-__all__ = ["Suppressor", "DateShifter", "Generalizer", "Pseudonymizer"]
+__all__ = ["MaskingEngine", "Suppressor", "DateShifter", "Generalizer", "Mondrian", "Pseudonymizer"]
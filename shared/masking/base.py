@@ -0,0 +1,24 @@
+"""
+Engine Protocol
+Common apply() contract shared by the masking engines
+"""
+
+from typing import Protocol
+
+import pandas as pd
+
+
+class MaskingEngine(Protocol):
+    """
+    A masking step that transforms a dataframe.
+
+    Ownership contract for apply():
+    - inplace=False (default): df is left untouched and a new dataframe
+      is returned. Callers that keep using df are safe.
+    - inplace=True: the caller hands ownership of df to the engine. Its
+      columns are replaced in place and the same object is returned, so
+      no full copy is made. The caller must not rely on the old values.
+    """
+
+    def apply(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        ...
@@ -0,0 +1,160 @@
+"""
+Date Shifter Engine
+Applies random but consistent date offsets to preserve temporal relationships
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+from .hashing import sha256_digests, digests_to_uint32, factorize
+
+
+class DateShifter:
+    """
+    Shifts date columns by a random but consistent offset per record.
+
+    The offset is determined by hashing a combination of the salt and
+    row index, ensuring:
+    1. Same row always gets same offset (reproducible)
+    2. Different rows get different offsets
+    3. Temporal relationships within a record are preserved
+    """
+
+    def __init__(
+        self,
+        date_columns: List[str],
+        salt: str,
+        min_days: int = -365,
+        max_days: int = 365,
+        preserve_year: bool = False
+    ):
+        """
+        Initialize date shifter.
+
+        Args:
+            date_columns: List of date column names to shift
+            salt: Secret salt for deterministic offset generation
+            min_days: Minimum days to shift (negative = past)
+            max_days: Maximum days to shift (positive = future)
+            preserve_year: If True, only shift within the same year
+        """
+        self.date_columns = date_columns
+        self.salt = salt
+        self.min_days = min_days
+        self.max_days = max_days
+        self.preserve_year = preserve_year
+
+    def _get_offsets(self, index: pd.Index) -> np.ndarray:
+        """
+        Generate deterministic offsets for every row of an index at once.
+
+        Only distinct index labels are hashed; results are broadcast back
+        through the factorized codes.
+
+        Args:
+            index: Row index of the dataframe being shifted
+
+        Returns:
+            int64 array of day offsets aligned with the index
+        """
+        codes, labels = factorize(index, keep_na=True)
+        hash_ints = digests_to_uint32(sha256_digests(f"{self.salt}:", labels))
+
+        # Map to offset range
+        range_size = self.max_days - self.min_days
+        offsets = self.min_days + (hash_ints % (range_size + 1))
+
+        return offsets[codes]
+
+    def _shift_column(self, dates: pd.Series, offset_days: np.ndarray) -> pd.Series:
+        """
+        Shift a datetime column by per-row offsets as one vector add.
+
+        Args:
+            dates: Datetime series to shift
+            offset_days: int64 day offsets aligned with the series
+
+        Returns:
+            Shifted datetime series (NaT stays NaT)
+        """
+        shifted = dates + offset_days.astype('timedelta64[D]')
+
+        if not self.preserve_year:
+            return shifted
+
+        # If preserving year, adjust offset to stay within same year
+        original_year = dates.dt.year
+        crossed = shifted.dt.year != original_year
+        if not crossed.any():
+            return shifted
+
+        # Shift in opposite direction to stay in year
+        abs_offset = np.abs(offset_days).astype('timedelta64[D]')
+        went_forward = shifted.dt.year > original_year
+        retried = (dates - abs_offset).where(went_forward, dates + abs_offset)
+
+        # If still outside year, keep the original date
+        retried = retried.where(retried.dt.year == original_year, dates)
+
+        return shifted.where(~crossed, retried)
+
+    def shift_column(self, values: pd.Series, offset_days: Optional[np.ndarray] = None) -> pd.Series:
+        """
+        Shift one date column.
+
+        Args:
+            values: Column values (parsed to datetime if needed)
+            offset_days: Offsets from _get_offsets for values.index; pass them
+                         in when shifting several columns of the same frame
+
+        Returns:
+            Shifted datetime column
+        """
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(values, errors='coerce')
+        if offset_days is None:
+            offset_days = self._get_offsets(values.index)
+        return self._shift_column(values, offset_days)
+
+    def apply(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Apply date shifting to specified columns.
+
+        Offsets for all rows are derived once as an int64 array and applied
+        to every date column as a timedelta vector add.
+
+        Args:
+            df: Input dataframe
+            inplace: Replace columns of df directly instead of copying it
+                     (the caller gives up df, see shared.masking.base.MaskingEngine)
+
+        Returns:
+            Dataframe with shifted dates
+        """
+        result = df if inplace else df.copy()
+
+        # Find existing date columns
+        existing_columns = [col for col in self.date_columns if col in df.columns]
+
+        if not existing_columns:
+            return result
+
+        # Apply shifts
+        offset_days = self._get_offsets(result.index)
+        for col in existing_columns:
+            result[col] = self.shift_column(result[col], offset_days)
+
+        return result
+
+    def get_shifted_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Get list of columns that were actually shifted.
+
+        Args:
+            df: Input dataframe
+
+        Returns:
+            List of column names that exist and will be shifted
+        """
+        return [col for col in self.date_columns if col in df.columns]
@@ -0,0 +1,369 @@
+"""
+Generalizer Engine
+Applies generalization hierarchies to quasi-identifiers
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional, Any, Callable
+
+from .hashing import factorize_values
+from shared.hierarchies import (
+    SAUDI_CITIES_TO_PROVINCE, PROVINCE_TO_REGION, AGE_CATEGORY_BOUNDS, AGE_CATEGORY_LABELS,
+    generalize_age, generalize_location, generalize_date, generalize_zipcode,
+    generalize_gender, generalize_generic, detect_column_type
+)
+
+
+# Integer bin keys spanning at most this many values are used directly as codes
+_MAX_DIRECT_BINS = 1_000_000
+
+
+class Generalizer:
+    """
+    Generalizes quasi-identifier columns using hierarchies.
+
+    Supports:
+    - Age: exact → 5yr range → 10yr range → category
+    - Location: city → province → region → country
+    - Date: exact → week → month → quarter
+    - Generic: value → first N chars → category
+    """
+
+    def __init__(
+        self,
+        quasi_identifiers: List[str],
+        age_level: int = 1,
+        location_level: int = 1,
+        date_level: int = 1,
+        column_types: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize generalizer.
+
+        Args:
+            quasi_identifiers: List of quasi-identifier column names
+            age_level: Generalization level for age (0-3)
+            location_level: Generalization level for location (0-3)
+            date_level: Generalization level for dates (0-3)
+            column_types: Optional dict mapping column names to types
+                         ('age', 'location', 'date', 'gender', 'zipcode', 'generic')
+        """
+        self.quasi_identifiers = quasi_identifiers
+        self.age_level = age_level
+        self.location_level = location_level
+        self.date_level = date_level
+        self.column_types = column_types or {}
+
+    # Detection and scalar hierarchies, shared with the validation service (shared.hierarchies)
+    _detect_column_type = staticmethod(detect_column_type)
+    _generalize_age = staticmethod(generalize_age)
+    _generalize_location = staticmethod(generalize_location)
+    _generalize_date = staticmethod(generalize_date)
+    _generalize_zipcode = staticmethod(generalize_zipcode)
+    _generalize_gender = staticmethod(generalize_gender)
+    _generalize_generic = staticmethod(generalize_generic)
+
+    def _to_categorical(self, codes: np.ndarray, labels: np.ndarray, values: pd.Series) -> pd.Series:
+        """
+        Build a Categorical column from per-row codes into a label table.
+
+        Labels may repeat (e.g. 31, 32 -> 30-34) or be None; they are
+        deduplicated and sorted so equivalence classes keep a stable order.
+
+        Args:
+            codes: Per-row index into labels (-1 for missing)
+            labels: Label for each code
+            values: Original column (for index and name)
+
+        Returns:
+            Categorical series of generalized labels
+        """
+        label_codes, categories = pd.factorize(
+            np.asarray(labels, dtype=object), sort=True, use_na_sentinel=True
+        )
+        new_codes = np.where(codes >= 0, label_codes[codes], -1) if len(label_codes) else codes
+
+        return pd.Series(
+            pd.Categorical.from_codes(new_codes, categories=categories),
+            index=values.index,
+            name=values.name
+        )
+
+    def _categorical_from_keys(
+        self,
+        keys: np.ndarray,
+        missing: np.ndarray,
+        labeler: Callable[[np.ndarray], np.ndarray],
+        values: pd.Series
+    ) -> pd.Series:
+        """
+        Build a Categorical column from integer bin keys.
+
+        Keys are used directly as codes (offset by the smallest key) when
+        their range is compact, so no hashing or sorting of rows is needed.
+
+        Args:
+            keys: int64 bin key per row
+            missing: Boolean mask of missing rows
+            labeler: Maps an array of distinct keys to their labels
+            values: Original column (for index and name)
+
+        Returns:
+            Categorical series of generalized labels
+        """
+        present = keys[~missing]
+        if len(present) == 0:
+            return self._to_categorical(np.full(len(keys), -1, dtype=np.int64), np.array([], dtype=object), values)
+
+        low, high = int(present.min()), int(present.max())
+        if high - low < _MAX_DIRECT_BINS:
+            bins = np.arange(low, high + 1, dtype=np.int64)
+            codes = keys - low
+        else:
+            bins, inverse = np.unique(present, return_inverse=True)
+            codes = np.empty(len(keys), dtype=np.int64)
+            codes[~missing] = inverse
+        codes = np.where(missing, -1, codes)
+
+        result = self._to_categorical(codes, labeler(bins), values)
+        return result.cat.remove_unused_categories()
+
+    def _generalize_column(self, values: pd.Series, func, level: int) -> pd.Series:
+        """
+        Generalize a column by mapping its distinct values only.
+
+        The column is factorized by str() form (so 1, 1.0 and True stay
+        apart, as on the per-value path), each unique value is generalized
+        once, and the result is rebuilt as a Categorical from the codes.
+
+        Args:
+            values: Column values
+            func: Per-value generalization function (value, level) -> label
+            level: Generalization level
+
+        Returns:
+            Categorical series of generalized labels
+        """
+        codes, uniques = factorize_values(values)
+        generalized = np.array([func(value, level) for value in uniques], dtype=object)
+        return self._to_categorical(codes, generalized, values)
+
+    def _age_kernel(self, values: pd.Series, level: int) -> Optional[pd.Series]:
+        """
+        Generalize a numeric age column with floor-division and a label table.
+
+        Returns None if the column dtype does not allow the kernel path.
+        """
+        if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            return None
+
+        arr = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        missing = np.isnan(arr)
+        present = arr[~missing]
+        if not np.isfinite(present).all() or (len(present) and np.abs(present).max() >= 2 ** 53):
+            return None
+
+        # int(float(x)) truncates toward zero
+        ages = np.zeros(len(arr), dtype=np.int64)
+        ages[~missing] = np.trunc(present).astype(np.int64)
+
+        if level == 0:
+            keys = ages
+            labeler = lambda b: np.array([str(k) for k in b], dtype=object)
+        elif level == 1:
+            # 5-year range
+            keys = ages // 5
+            labeler = lambda b: np.array([f"{k * 5}-{k * 5 + 4}" for k in b], dtype=object)
+        elif level == 2:
+            # 10-year range
+            keys = ages // 10
+            labeler = lambda b: np.array([f"{k * 10}-{k * 10 + 9}" for k in b], dtype=object)
+        else:
+            # Category
+            keys = np.searchsorted(AGE_CATEGORY_BOUNDS, ages, side='right').astype(np.int64)
+            labeler = lambda b: AGE_CATEGORY_LABELS[b]
+
+        return self._categorical_from_keys(keys, missing, labeler, values)
+
+    def _date_labels(self, dates: pd.DatetimeIndex, level: int) -> np.ndarray:
+        """
+        Vectorized date labels matching _generalize_date (NaT -> None).
+        """
+        labels = np.full(len(dates), None, dtype=object)
+        valid = ~dates.isna()
+        if not valid.any():
+            return labels
+        dates = dates[valid]
+
+        if level == 0:
+            formatted = dates.strftime('%Y-%m-%d')
+        elif level == 1:
+            # ISO week
+            weeks = pd.Index(dates.isocalendar().week.to_numpy(dtype=np.int64))
+            formatted = dates.year.astype(str) + '-W' + weeks.astype(str).str.zfill(2)
+        elif level == 2:
+            # Month
+            formatted = dates.strftime('%Y-%m')
+        else:
+            # Quarter
+            formatted = dates.year.astype(str) + '-Q' + dates.quarter.astype(str)
+
+        labels[valid] = np.asarray(formatted, dtype=object)
+        return labels
+
+    def _date_kernel(self, values: pd.Series, level: int) -> Optional[pd.Series]:
+        """
+        Generalize a date column with vectorized calendar arithmetic.
+
+        Naive datetime64 columns are binned by day number; string columns
+        are parsed once per distinct value. Returns None if the column
+        dtype does not allow the kernel path.
+        """
+        if pd.api.types.is_datetime64_dtype(values):
+            days = values.to_numpy(dtype='datetime64[D]')
+            missing = np.isnat(days)
+            keys = days.astype(np.int64)
+            labeler = lambda b: self._date_labels(pd.DatetimeIndex(b.astype('datetime64[D]')), level)
+            return self._categorical_from_keys(keys, missing, labeler, values)
+
+        if values.dtype != object:
+            return None
+
+        codes, uniques = factorize_values(values)
+        if not all(isinstance(u, str) for u in uniques):
+            return None
+
+        try:
+            parsed = pd.to_datetime(pd.Index(uniques, dtype=object), errors='coerce', format='mixed')
+        except (ValueError, TypeError, OverflowError):
+            return None
+        if not isinstance(parsed, pd.DatetimeIndex) or parsed.tz is not None:
+            return None
+
+        labels = self._date_labels(parsed, level)
+
+        # Unparseable values are kept as strings
+        unparsed = np.asarray(parsed.isna())
+        labels[unparsed] = uniques[unparsed]
+
+        return self._to_categorical(codes, labels, values)
+
+    def _zipcode_kernel(self, values: pd.Series, level: int) -> pd.Series:
+        """
+        Generalize a zipcode column with vectorized string slicing.
+
+        Distinct values are sliced in groups of equal digit length.
+        """
+        codes, uniques = factorize_values(values)
+        zips = pd.Series(uniques, dtype=object).astype(str).str.strip()
+
+        if level == 0:
+            return self._to_categorical(codes, zips.to_numpy(dtype=object), values)
+
+        # Remove non-digits
+        digits = zips.str.replace(r'\D', '', regex=True)
+        lengths = digits.str.len().to_numpy(dtype=np.int64)
+
+        stars = np.maximum(lengths - 2, 0)
+        if level in (1, 2):
+            stars = np.where(lengths > level, level, stars)
+        heads = lengths - stars
+
+        labels = np.empty(len(digits), dtype=object)
+        for head, star in set(zip(heads.tolist(), stars.tolist())):
+            group = (heads == head) & (stars == star)
+            labels[group] = (digits[group].str.slice(0, head) + '*' * star).to_numpy(dtype=object)
+
+        return self._to_categorical(codes, labels, values)
+
+    def generalize_column(self, values: pd.Series, column: str) -> pd.Series:
+        """
+        Generalize one quasi-identifier column.
+
+        Args:
+            values: Column values
+            column: Column name (for type lookup and detection)
+
+        Returns:
+            Generalized column as a Categorical
+        """
+        # Determine column type
+        col_type = self.column_types.get(column) or self._detect_column_type(column, values)
+
+        # Apply appropriate generalization
+        generalized = None
+        if col_type == 'age':
+            generalized = self._age_kernel(values, self.age_level)
+            if generalized is None:
+                generalized = self._generalize_column(values, self._generalize_age, self.age_level)
+        elif col_type == 'location':
+            generalized = self._generalize_column(values, self._generalize_location, self.location_level)
+        elif col_type == 'date':
+            generalized = self._date_kernel(values, self.date_level)
+            if generalized is None:
+                generalized = self._generalize_column(values, self._generalize_date, self.date_level)
+        elif col_type == 'zipcode':
+            generalized = self._zipcode_kernel(values, self.location_level)
+        elif col_type == 'gender':
+            generalized = self._generalize_column(values, self._generalize_gender, self.location_level)
+        else:
+            generalized = self._generalize_column(values, self._generalize_generic, self.location_level)
+
+        return generalized
+
+    def apply(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Apply generalization to quasi-identifier columns.
+
+        Age, date and zipcode columns use array kernels when their dtype
+        allows; other columns map their distinct values only. Generalized
+        columns are returned as pandas Categoricals.
+
+        Args:
+            df: Input dataframe
+            inplace: Replace columns of df directly instead of copying it
+                     (the caller gives up df, see shared.masking.base.MaskingEngine)
+
+        Returns:
+            Dataframe with generalized quasi-identifiers
+        """
+        result = df if inplace else df.copy()
+
+        # Find existing columns
+        existing_columns = [col for col in self.quasi_identifiers if col in df.columns]
+
+        for col in existing_columns:
+            result[col] = self.generalize_column(df[col], col)
+
+        return result
+
+    def get_generalized_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Get list of columns that were actually generalized.
+
+        Args:
+            df: Input dataframe
+
+        Returns:
+            List of column names that exist and will be generalized
+        """
+        return [col for col in self.quasi_identifiers if col in df.columns]
+
+    def get_column_types(self, df: pd.DataFrame) -> Dict[str, str]:
+        """
+        Resolve the hierarchy type used for each generalized column.
+
+        Explicit column_types win; other columns are auto-detected. Useful
+        for pinning types across chunks of the same file.
+
+        Args:
+            df: Input dataframe
+
+        Returns:
+            Dict mapping column name to type
+        """
+        return {
+            col: self.column_types.get(col) or self._detect_column_type(col, df[col])
+            for col in self.get_generalized_columns(df)
+        }
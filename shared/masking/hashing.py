@@ -0,0 +1,150 @@
+"""
+Batch Hash Derivation
+Shared SHA-256 / HMAC-SHA256 kernels used by the DateShifter and Pseudonymizer
+"""
+
+import hmac
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Iterable, List, Tuple
+
+
+def sha256_digests(prefix: str, values: Iterable) -> List[bytes]:
+    """
+    Compute SHA-256(prefix + str(value)) for many values.
+
+    The prefix is absorbed into a hash state once and copied for every
+    value, so only the value bytes are hashed per item.
+
+    Args:
+        prefix: String prepended to every value (e.g. "salt:")
+        values: Values to hash
+
+    Returns:
+        List of 32-byte digests aligned with values
+    """
+    base = hashlib.sha256(prefix.encode('utf-8'))
+    digests = []
+    for value in values:
+        h = base.copy()
+        h.update(str(value).encode('utf-8'))
+        digests.append(h.digest())
+    return digests
+
+
+def hmac_sha256_digests(key: bytes, prefix: str, values: Iterable) -> List[bytes]:
+    """
+    Compute HMAC-SHA256(key, prefix + str(value)) for many values.
+
+    The key's inner/outer pad states (and the prefix) are computed once;
+    each value only copies those states instead of rehashing the key.
+
+    Args:
+        key: HMAC key
+        prefix: String prepended to every message (e.g. "column:")
+        values: Values to authenticate
+
+    Returns:
+        List of 32-byte digests aligned with values
+    """
+    base = hmac.new(key, prefix.encode('utf-8'), hashlib.sha256)
+    digests = []
+    for value in values:
+        h = base.copy()
+        h.update(str(value).encode('utf-8'))
+        digests.append(h.digest())
+    return digests
+
+
+def digests_to_uint32(digests: List[bytes]) -> np.ndarray:
+    """
+    Read the first 4 bytes of each digest as a big-endian integer.
+
+    Equivalent to int(hexdigest[:8], 16) per digest.
+
+    Args:
+        digests: List of digests
+
+    Returns:
+        int64 array of values in [0, 2**32)
+    """
+    if not digests:
+        return np.empty(0, dtype=np.int64)
+    packed = b''.join(d[:4] for d in digests)
+    return np.frombuffer(packed, dtype='>u4').astype(np.int64)
+
+
+def digests_to_hex(digests: List[bytes], length: int) -> np.ndarray:
+    """
+    Convert digests to truncated uppercase hex strings.
+
+    Args:
+        digests: List of digests
+        length: Number of hex characters to keep
+
+    Returns:
+        Object array of hex strings
+    """
+    return np.array([d.hex()[:length].upper() for d in digests], dtype=object)
+
+
+def factorize(values: pd.Series, keep_na: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split a column into integer codes and its distinct values.
+
+    Values are distinct by their str() form, which is what gets hashed:
+    object columns are keyed on str(value) so 1, 1.0 and True stay
+    separate, and float columns containing -0.0 are keyed the same way.
+
+    By default missing values get code -1 so callers can keep them untouched.
+
+    Args:
+        values: Column (or index) to encode
+        keep_na: If True, treat missing values as a regular distinct value
+
+    Returns:
+        Tuple of (codes, uniques)
+    """
+    if _needs_str_keys(values):
+        keys = pd.Series(np.asarray(values, dtype=object)).map(str, na_action=None if keep_na else 'ignore')
+        codes, uniques = pd.factorize(keys, use_na_sentinel=not keep_na)
+    else:
+        codes, uniques = pd.factorize(values, use_na_sentinel=not keep_na)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def factorize_values(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Like factorize, but with each code's first original value instead of its str() key.
+
+    For callers that map the distinct values through a function of the
+    value itself (e.g. generalization), object values are also kept apart
+    by type: 1 and '1' print the same but need not generalize the same.
+    Missing values get code -1.
+
+    Returns:
+        Tuple of (codes, first value per code)
+    """
+    if values.dtype == object:
+        keys = pd.Series(np.asarray(values, dtype=object)).map(lambda v: (type(v), str(v)), na_action='ignore')
+        codes, _ = pd.factorize(keys, use_na_sentinel=True)
+    else:
+        codes, uniques = factorize(values)
+        if not _needs_str_keys(values):
+            return codes, uniques
+
+    present = np.flatnonzero(codes >= 0)
+    # Codes are numbered by first appearance
+    _, first = np.unique(codes[present], return_index=True)
+    return codes, np.asarray(values, dtype=object)[present[first]]
+
+
+def _needs_str_keys(values: pd.Series) -> bool:
+    """Whether equal-comparing values in this column can print differently."""
+    if values.dtype == object:
+        return True
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind == 'f':
+        arr = np.asarray(values)
+        return bool(np.any((arr == 0) & np.signbit(arr)))
+    return False
@@ -0,0 +1,387 @@
+"""
+Mondrian Engine
+Multidimensional top-down partitioning of quasi-identifiers, an
+alternative to the fixed hierarchy levels of the Generalizer
+
+Records are split at the median of one quasi-identifier at a time
+(LeFevre et al.) until any further split would leave a part with fewer
+than k records, or fewer than l distinct values of a sensitive
+attribute. Every final part becomes one equivalence class: ordered
+values (age, date, zipcode, numbers) are replaced by the part's range
+and categorical values by their finest common hierarchy label. Dense
+regions therefore keep narrow ranges and only sparse ones widen.
+
+Each quasi-identifier is encoded once as codes into its sorted distinct
+values, and its rows are kept as an index array sorted by code. A part
+is a [start, end) span of these arrays, the same rows in every one of
+them; a split stably moves the left rows of the span to its front, so
+every array stays sorted within each part and nothing is re-sorted or
+copied out of the frame. All parts of a recursion depth are split
+together with array operations.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from shared.hierarchies import detect_column_type, generalize_location
+
+# Label of a part whose values share no hierarchy label (or are partly missing)
+SUPPRESSED = "*"
+
+# Range separator per column type ("-" otherwise); dates use ISO 8601 intervals
+_RANGE_SEPARATORS = {"date": "/"}
+
+
+class _Dimension:
+    """
+    One quasi-identifier encoded for partitioning.
+
+    Attributes:
+        codes: Per-row index into the sorted distinct values (n_values for missing, so missing sorts last)
+        points: Position of each distinct value, to measure the width of a part
+        levels: Per hierarchy level, (code per distinct value, label per code); the first level
+                is the values themselves. Ordered dimensions have only that level and use ranges.
+        separator: Range separator, None for categorical dimensions
+    """
+
+    def __init__(self, codes: np.ndarray, points: np.ndarray, levels: List[Tuple[np.ndarray, np.ndarray]], separator: Optional[str]):
+        self.codes = codes
+        self.points = points
+        self.levels = levels
+        self.separator = separator
+        self.n_values = len(points)
+
+        # Missing values sit one full span past the largest value
+        span = float(points[-1] - points[0]) if self.n_values else 0.0
+        self._positions = np.append(points, (points[-1] if self.n_values else 0.0) + max(span, 1.0))
+        self._span = float(self._positions[-1] - self._positions[0])
+
+    def widths(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """Normalized width (0-1) of parts spanning codes low..high"""
+        return (self._positions[high] - self._positions[low]) / self._span
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _sorted_codes(codes: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Re-code rows by sorted distinct key.
+
+    Args:
+        codes: Per-row index into keys (-1 for missing)
+        keys: Sort key per factorized value, NaN if it cannot be placed
+
+    Returns:
+        Tuple of (per-row codes with missing as the last code, distinct keys, first factorized value per key)
+    """
+    valid = ~pd.isna(keys)
+    distinct, first, inverse = np.unique(keys[valid], return_index=True, return_inverse=True)
+    recode = np.full(len(keys) + 1, len(distinct), dtype=np.int64)
+    recode[np.flatnonzero(valid)] = inverse
+    return recode[codes], distinct, np.flatnonzero(valid)[first]
+
+
+def _ordered_dimension(codes: np.ndarray, points: np.ndarray, display: np.ndarray, separator: str) -> _Dimension:
+    row_codes, points, first = _sorted_codes(codes, points)
+    labels = display[first]
+    return _Dimension(row_codes, points.astype(np.float64), [(np.arange(len(points)), labels)], separator)
+
+
+def _categorical_dimension(codes: np.ndarray, uniques: np.ndarray, column_type: str) -> _Dimension:
+    """Values sorted by their hierarchy path, so parts split along it"""
+    names = np.array([str(value) for value in uniques], dtype=object)
+    coarser = [
+        np.array([generalize_location(value, level) for value in uniques], dtype=object)
+        for level in (1, 2, 3)
+    ] if column_type == "location" else []
+
+    paths = list(zip(*[labels.tolist() for labels in reversed(coarser)], names.tolist()))
+    rank = {path: i for i, path in enumerate(sorted(set(paths)))}
+    keys = np.array([rank[path] for path in paths], dtype=np.float64)
+    row_codes, points, first = _sorted_codes(codes, keys)
+
+    levels = [(np.arange(len(points)), names[first])]
+    for labels in coarser:
+        level_codes, level_labels = pd.factorize(labels[first])
+        levels.append((level_codes, np.asarray(level_labels, dtype=object)))
+    return _Dimension(row_codes, points, levels, None)
+
+
+def _encode(values: pd.Series, column_type: str) -> _Dimension:
+    """Encode a column by its distinct values; unparseable ordered values count as missing"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        column_type = "date"
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+    separator = _RANGE_SEPARATORS.get(column_type, "-")
+
+    if column_type == "date":
+        try:
+            parsed = pd.to_datetime(pd.Index(uniques, dtype=object), errors='coerce', format='mixed')
+        except (ValueError, TypeError, OverflowError):
+            parsed = None
+        if isinstance(parsed, pd.DatetimeIndex):
+            days = np.where(parsed.isna(), np.nan, parsed.asi8 // 86_400_000_000_000)
+            display = np.asarray(parsed.strftime('%Y-%m-%d'), dtype=object)
+            return _ordered_dimension(codes, days, display, separator)
+
+    elif column_type == "zipcode":
+        digits = pd.Series(uniques, dtype=object).astype(str).str.replace(r'\D', '', regex=True)
+        points = pd.to_numeric(digits, errors='coerce').to_numpy(dtype=np.float64)
+        return _ordered_dimension(codes, points, digits.to_numpy(dtype=object), separator)
+
+    elif column_type == "age" or (pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)):
+        points = pd.to_numeric(pd.Series(uniques, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+        points[~np.isfinite(points)] = np.nan
+        display = np.array([None if np.isnan(p) else _format_number(p) for p in points], dtype=object)
+        return _ordered_dimension(codes, points, display, separator)
+
+    return _categorical_dimension(codes, uniques, column_type)
+
+
+class Mondrian:
+    """
+    Generalizes quasi-identifiers by Mondrian multidimensional partitioning.
+
+    Unlike the Generalizer, all quasi-identifiers are generalized
+    together and per equivalence class, so apply() needs the whole table
+    (it cannot run chunk by chunk).
+
+    Labels:
+    - Age, date, zipcode and numeric columns: "30-34", "2024-01-03/2024-02-10", "11564-11599"
+      (a single value when the class holds one)
+    - Location: city → province → region → country, the finest one shared by the class
+    - Gender and other categorical columns: the value if shared, else "*"
+    A class whose values are partly missing gets "*", fully missing stays missing.
+    """
+
+    def __init__(
+        self,
+        quasi_identifiers: List[str],
+        k: int = 5,
+        l: int = 1,
+        sensitive_attributes: Optional[List[str]] = None,
+        column_types: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the partitioner.
+
+        Args:
+            quasi_identifiers: List of quasi-identifier column names
+            k: Minimum records per equivalence class
+            l: Minimum distinct values of each sensitive attribute per class
+            sensitive_attributes: Sensitive attribute column names (for l)
+            column_types: Optional dict mapping column names to types
+                         ('age', 'location', 'date', 'gender', 'zipcode', 'generic')
+        """
+        self.quasi_identifiers = quasi_identifiers
+        self.k = k
+        self.l = l
+        self.sensitive_attributes = sensitive_attributes or []
+        self.column_types = column_types or {}
+
+    def get_column_types(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Hierarchy type of each quasi-identifier in df (explicit types win, others are detected)"""
+        return {
+            col: self.column_types.get(col) or detect_column_type(col, df[col])
+            for col in self.quasi_identifiers if col in df.columns
+        }
+
+    def _partition(self, df: pd.DataFrame, dims: List[_Dimension]) -> np.ndarray:
+        """
+        Split rows into parts.
+
+        Only the parts still being split are kept in the working arrays;
+        a part that cannot be split is numbered and dropped from them.
+
+        Returns:
+            int64 part id per row
+        """
+        n = len(df)
+        orders = [np.argsort(dim.codes, kind='stable') for dim in dims]
+        keys = [dim.codes[order] for dim, order in zip(dims, orders)]
+        bounds = np.array([0, n], dtype=np.int64)
+        row_parts = np.zeros(n, dtype=np.int64)
+        n_done = 0
+
+        diverse = []
+        if self.l > 1:
+            for col in self.sensitive_attributes:
+                if col in df.columns:
+                    codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+                    diverse.append((codes, max(len(uniques), 1)))
+
+        while len(bounds) > 1:
+            starts, sizes = bounds[:-1], np.diff(bounds)
+            n_parts = len(sizes)
+            part_ids = np.arange(n_parts)
+            part = np.repeat(part_ids, sizes)
+            offset = np.arange(len(part)) - starts[part]
+
+            best_width = np.zeros(n_parts)
+            best_dim = np.full(n_parts, -1)
+            best_left = np.zeros(n_parts, dtype=np.int64)
+
+            for j, (dim, order, sorted_keys) in enumerate(zip(dims, orders, keys)):
+                median = sorted_keys[starts + sizes // 2]
+
+                # Keys offset by part are sorted across all parts, so each cut is a binary search
+                stride = dim.n_values + 1
+                ranked = part * stride + sorted_keys
+                below = np.searchsorted(ranked, part_ids * stride + median, side='left') - starts
+                through = np.searchsorted(ranked, part_ids * stride + median, side='right') - starts
+
+                # Cut just below or just above the median value, whichever is allowed and more balanced
+                below_ok = (below >= self.k) & (sizes - below >= self.k)
+                through_ok = (through >= self.k) & (sizes - through >= self.k)
+                use_through = through_ok & (~below_ok | (through - sizes / 2 <= sizes / 2 - below))
+                left = np.where(use_through, through, below)
+                allowed = below_ok | through_ok
+
+                for codes, n_values in diverse:
+                    values = codes[order]
+                    known = values >= 0
+                    side = (part * 2 + (offset < left[part]))[known]
+                    pairs = np.unique(side * n_values + values[known])
+                    distinct = np.bincount(pairs // n_values, minlength=2 * n_parts).reshape(n_parts, 2)
+                    allowed &= distinct.min(axis=1) >= self.l
+
+                # Split the widest allowed dimension
+                widths = dim.widths(sorted_keys[starts], sorted_keys[bounds[1:] - 1])
+                better = allowed & (widths > best_width)
+                best_width = np.where(better, widths, best_width)
+                best_dim = np.where(better, j, best_dim)
+                best_left = np.where(better, left, best_left)
+
+            # Number the parts that cannot be split and drop their rows
+            split = best_dim >= 0
+            done = ~split[part]
+            row_parts[orders[0][done]] = n_done + (np.cumsum(~split) - 1)[part[done]]
+            n_done += int((~split).sum())
+            if not split.any():
+                break
+
+            if done.any():
+                sizes, best_dim, best_left = sizes[split], best_dim[split], best_left[split]
+                starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+                part = np.repeat(np.arange(len(sizes)), sizes)
+                offset = offset[~done]
+                orders = [order[~done] for order in orders]
+                keys = [sorted_keys[~done] for sorted_keys in keys]
+
+            goes_left = np.ones(n, dtype=bool)
+            dim_of_row = best_dim[part]
+            for j, order in enumerate(orders):
+                chosen = dim_of_row == j
+                goes_left[order[chosen]] = offset[chosen] < best_left[part[chosen]]
+
+            # Stable partition of every part: left rows first, each side keeping its order.
+            # A row's position is its start plus the left rows before it in the part (left
+            # side), or the part's left size plus the right rows before it (right side).
+            index = np.arange(len(part))
+            for j, order in enumerate(orders):
+                flag = goes_left[order]
+                before = np.cumsum(flag) - flag
+                left_rows = before[starts]
+                position = np.where(
+                    flag,
+                    before + np.repeat(starts - left_rows, sizes),
+                    index - before + np.repeat(best_left + left_rows, sizes)
+                )
+                orders[j] = np.empty_like(order)
+                orders[j][position] = order
+                moved = np.empty_like(keys[j])
+                moved[position] = keys[j]
+                keys[j] = moved
+
+            bounds = np.concatenate([starts, starts + best_left, [len(part)]])
+            bounds.sort()
+
+        return row_parts
+
+    def partition(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Equivalence class of each row.
+
+        Args:
+            df: Input dataframe
+
+        Returns:
+            int64 class id per row
+        """
+        dims = [_encode(df[col], col_type) for col, col_type in self.get_column_types(df).items()]
+        if not dims:
+            return np.zeros(len(df), dtype=np.int64)
+        return self._partition(df, dims)
+
+    def _part_labels(self, dim: _Dimension, order: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+        """
+        Generalized label of each part for one dimension.
+
+        Args:
+            dim: Encoded quasi-identifier
+            order: Row indices grouped by part
+            bounds: Part boundaries into order
+        """
+        keys = dim.codes[order]
+        low = np.minimum.reduceat(keys, bounds[:-1])
+        high = np.maximum.reduceat(keys, bounds[:-1])
+        labels = np.full(len(low), SUPPRESSED, dtype=object)
+
+        complete = high < dim.n_values
+        labels[low == dim.n_values] = None
+
+        if dim.separator is not None:
+            names = dim.levels[0][1]
+            pairs, inverse = np.unique(low[complete] * (dim.n_values + 1) + high[complete], return_inverse=True)
+            first, last = np.divmod(pairs, dim.n_values + 1)
+            ranges = np.array([
+                names[a] if a == b else f"{names[a]}{dim.separator}{names[b]}"
+                for a, b in zip(first.tolist(), last.tolist())
+            ], dtype=object)
+            labels[complete] = ranges[inverse]
+            return labels
+
+        # Finest hierarchy level at which the whole part shares one label
+        unresolved = complete.copy()
+        for level_codes, level_labels in dim.levels:
+            per_row = np.append(level_codes, -1)[keys]
+            shared = (np.minimum.reduceat(per_row, bounds[:-1]) == np.maximum.reduceat(per_row, bounds[:-1])) & unresolved
+            labels[shared] = level_labels[per_row[bounds[:-1]][shared]]
+            unresolved &= ~shared
+        return labels
+
+    def apply(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Replace quasi-identifiers by their equivalence class labels.
+
+        Args:
+            df: Input dataframe (the whole table)
+            inplace: Replace columns of df directly instead of copying it
+                     (the caller gives up df, see shared.masking.base.MaskingEngine)
+
+        Returns:
+            Dataframe with generalized quasi-identifiers as Categoricals
+        """
+        result = df if inplace else df.copy()
+        column_types = self.get_column_types(df)
+        if not column_types or len(df) == 0:
+            return result
+
+        dims = [_encode(df[col], col_type) for col, col_type in column_types.items()]
+        row_parts = self._partition(df, dims)
+        order = np.argsort(row_parts, kind='stable')
+        bounds = np.append(0, np.cumsum(np.bincount(row_parts)))
+
+        for col, dim in zip(column_types, dims):
+            label_codes, categories = pd.factorize(self._part_labels(dim, order, bounds), sort=True, use_na_sentinel=True)
+            result[col] = pd.Series(
+                pd.Categorical.from_codes(label_codes[row_parts], categories=categories),
+                index=df.index,
+                name=col
+            )
+
+        return result
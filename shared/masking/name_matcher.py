@@ -0,0 +1,218 @@
+"""
+Name Matchers
+Pluggable backends used by the TextScrubber to redact known names from free text
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+
+# Above this many names the "auto" backend switches from regex to Aho-Corasick
+AUTO_AHO_CORASICK_THRESHOLD = 1000
+
+NAME_MATCHER_BACKENDS = ("auto", "regex", "aho_corasick")
+
+
+def _is_word_char(ch: str) -> bool:
+    """Same definition of a word character as Python's Unicode \\w"""
+    return ch.isalnum() or ch == '_'
+
+
+@lru_cache(maxsize=None)
+def _fold_char(ch: str) -> str:
+    """
+    Case-fold a single character to a single character.
+
+    Mirrors the simple case mapping used by re.IGNORECASE: 'ſ' folds to
+    's' and 'İ' folds to 'i', while characters with no single-character
+    fold (e.g. 'ß') are kept.
+    """
+    folded = ch.casefold()
+    if len(folded) == 1:
+        return folded
+    return ch.lower()[0]
+
+
+def _fold(text: str) -> str:
+    """
+    Case-fold text one character at a time, keeping its length.
+
+    Match offsets in the folded text are therefore offsets in the
+    original text.
+    """
+    if text.isascii():
+        return text.lower()
+    return ''.join(map(_fold_char, text))
+
+
+class RegexNameMatcher:
+    """
+    Matches names with a single case-insensitive regex alternation.
+
+    Fast for small name lists; compile time and backtracking grow with
+    the number of names.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        """
+        Initialize regex matcher.
+
+        Args:
+            names: Names to match (whole words, case-insensitive)
+        """
+        # Longest names first so a full name wins over its parts (leftmost-longest,
+        # like the Aho-Corasick backend) and the pattern does not depend on set order
+        ordered = sorted({name for name in names if name}, key=lambda name: (-len(name), name))
+
+        # Escape special regex chars and create alternation
+        escaped_names = [re.escape(name) for name in ordered]
+        self.pattern: Optional[re.Pattern] = None
+        if escaped_names:
+            # Match whole words only
+            self.pattern = re.compile(r'\b(' + '|'.join(escaped_names) + r')\b', re.IGNORECASE)
+
+    def sub(self, replacement: str, text: str) -> str:
+        """Replace every matched name in text with replacement."""
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(replacement, text)
+
+
+class AhoCorasickNameMatcher:
+    """
+    Matches names with an Aho-Corasick automaton over case-folded text.
+
+    Matching is linear in the text length regardless of how many names
+    are loaded. Word boundaries follow the same rule as regex \\b, so
+    Latin and Arabic names behave like the regex backend. Overlapping
+    matches resolve leftmost-longest.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            names: Names to match (whole words, case-insensitive)
+        """
+        # Trie: per-node transitions, failure links and match lengths
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for name in names:
+            if name:
+                self._add(_fold(name))
+        self._build_failure_links()
+
+    def _add(self, word: str) -> None:
+        """Insert a folded name into the trie."""
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if len(word) not in self._out[state]:
+            self._out[state] = self._out[state] + (len(word),)
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first pass computing failure links and merged outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Find non-overlapping whole-word name matches.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of (start, end) spans, leftmost-longest, in text order
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        folded = _fold(text)
+        n = len(text)
+
+        candidates = []
+        state = 0
+        for end, ch in enumerate(folded, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length in out[state]:
+                start = end - length
+                # Same rule as regex \b on both sides of the match
+                before = start > 0 and _is_word_char(text[start - 1])
+                after = end < n and _is_word_char(text[end])
+                if before != _is_word_char(text[start]) and after != _is_word_char(text[end - 1]):
+                    candidates.append((start, end))
+
+        # Leftmost-longest, non-overlapping
+        candidates.sort(key=lambda span: (span[0], -span[1]))
+        spans = []
+        last_end = 0
+        for start, end in candidates:
+            if start >= last_end:
+                spans.append((start, end))
+                last_end = end
+        return spans
+
+    def sub(self, replacement: str, text: str) -> str:
+        """Replace every matched name in text with replacement."""
+        spans = self.find(text)
+        if not spans:
+            return text
+
+        parts = []
+        pos = 0
+        for start, end in spans:
+            parts.append(text[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(text[pos:])
+        return ''.join(parts)
+
+
+def build_name_matcher(names: Iterable[str], backend: str = "auto"):
+    """
+    Build a name matcher for the given names.
+
+    Args:
+        names: Names to match
+        backend: 'regex', 'aho_corasick', or 'auto' (regex for small
+                 lists, Aho-Corasick above AUTO_AHO_CORASICK_THRESHOLD)
+
+    Returns:
+        Matcher with a sub(replacement, text) method, or None if there
+        are no names
+    """
+    if backend not in NAME_MATCHER_BACKENDS:
+        raise ValueError(f"Unknown name matcher backend: {backend}")
+
+    names = [name for name in names if name]
+    if not names:
+        return None
+
+    if backend == "auto":
+        backend = "aho_corasick" if len(names) > AUTO_AHO_CORASICK_THRESHOLD else "regex"
+
+    if backend == "aho_corasick":
+        return AhoCorasickNameMatcher(names)
+    return RegexNameMatcher(names)
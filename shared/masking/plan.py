@@ -0,0 +1,327 @@
+"""
+Masking Plan
+Compiles a Classification into per-column operations and executes them
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from shared.models import Classification, MaskingOperation, MaskingPlan
+
+from .suppressor import Suppressor
+from .date_shifter import DateShifter
+from .generalizer import Generalizer
+from .pseudonymizer import Pseudonymizer
+from .text_scrubber import TextScrubber, DEFAULT_PARALLEL_MIN_ROWS
+
+
+# Execution order of the plan stages
+PLAN_STAGES = ["TEXT_SCRUB", "SUPPRESS", "DATE_SHIFT", "GENERALIZE", "PSEUDONYMIZE"]
+
+# Classification arrays used when recommended_techniques is empty
+_FALLBACK_FIELDS = {
+    "SUPPRESS": "direct_identifiers",
+    "DATE_SHIFT": "date_columns",
+    "GENERALIZE": "quasi_identifiers",
+    "PSEUDONYMIZE": "linkage_identifiers",
+}
+
+# Label reported in techniques_applied per stage
+APPLIED_LABELS = {
+    "TEXT_SCRUB": "TEXT_SCRUBBED",
+    "SUPPRESS": "SUPPRESSED",
+    "DATE_SHIFT": "DATE_SHIFTED",
+    "GENERALIZE": "GENERALIZED",
+    "PSEUDONYMIZE": "PSEUDONYMIZED",
+    "KEEP": "KEPT",
+}
+
+TEXT_SCRUB_REPLACEMENT = "[REDACTED]"
+DATE_SHIFT_MIN_DAYS = -365
+DATE_SHIFT_MAX_DAYS = 365
+PSEUDONYM_HASH_LENGTH = 12
+
+
+def _stage_columns(classification: Classification, stage: str) -> List[str]:
+    """Columns for a stage, from recommended_techniques (source of truth) or the fallback array"""
+    if classification.recommended_techniques:
+        return [
+            col for col, technique in classification.recommended_techniques.items()
+            if technique.upper() == stage
+        ]
+    return list(getattr(classification, _FALLBACK_FIELDS[stage]) or [])
+
+
+def compile_plan(classification: Classification) -> MaskingPlan:
+    """
+    Compile a classification into a masking plan.
+
+    Operations are ordered by stage (PLAN_STAGES), then by column in
+    classification order. Sensitive attributes become TEXT_SCRUB
+    candidates (applied to text columns only) and are otherwise KEEP.
+
+    Args:
+        classification: Column classification
+
+    Returns:
+        MaskingPlan keyed on classification.fingerprint()
+    """
+    gen_config = classification.generalization_config
+    params = {
+        "TEXT_SCRUB": {"replacement": TEXT_SCRUB_REPLACEMENT},
+        "SUPPRESS": {},
+        "DATE_SHIFT": {"min_days": DATE_SHIFT_MIN_DAYS, "max_days": DATE_SHIFT_MAX_DAYS},
+        "GENERALIZE": {
+            "age_level": gen_config.age_level,
+            "location_level": gen_config.location_level,
+            "date_level": gen_config.date_level,
+        },
+        "PSEUDONYMIZE": {"hash_length": PSEUDONYM_HASH_LENGTH},
+    }
+
+    operations = []
+    masked = set()
+    for stage in PLAN_STAGES:
+        if stage == "TEXT_SCRUB":
+            columns = list(classification.sensitive_attributes)
+        else:
+            columns = _stage_columns(classification, stage)
+            masked.update(columns)
+        operations.extend(
+            MaskingOperation(column=col, technique=stage, params=params[stage])
+            for col in columns
+        )
+
+    operations.extend(
+        MaskingOperation(column=col, technique="KEEP")
+        for col in classification.sensitive_attributes
+        if col not in masked
+    )
+
+    return MaskingPlan(
+        classification_hash=classification.fingerprint(),
+        stages=PLAN_STAGES,
+        operations=operations
+    )
+
+
+def _operation_params(plan: MaskingPlan, stage: str) -> dict:
+    """Params of the first operation of a stage (all operations of a stage share them)"""
+    for op in plan.operations:
+        if op.technique == stage:
+            return op.params
+    return {}
+
+
+class MaskingPlanExecutor:
+    """
+    Executes a MaskingPlan over dataframes.
+
+    Each column runs its own chain of operations (date shift, generalize,
+    pseudonymize); chains of different columns are independent and run
+    concurrently in a thread pool. Text scrubbing runs first, in the
+    calling thread; large columns are scrubbed in a process pool whose
+    workers come from a fork server or are spawned (see text_scrubber),
+    so it is safe to call execute() from a worker thread, as the
+    progress-streaming endpoints do. Suppressed columns are dropped at
+    the end.
+
+    Engines are built once, so one executor can process every chunk of a
+    streamed file: generalizer types are pinned on the first frame. Text
+    columns come from the plan, not from a frame's dtypes: a free-text
+    column that is all missing in one chunk parses as float there but may
+    hold strings in the next, and its string values are scrubbed wherever
+    they appear.
+    """
+
+    def __init__(
+        self,
+        plan: MaskingPlan,
+        salt: str,
+        names_to_scrub: Optional[Set[str]] = None,
+        max_workers: Optional[int] = None,
+        text_scrub_workers: int = 1,
+        text_scrub_min_rows: int = DEFAULT_PARALLEL_MIN_ROWS,
+        on_stage: Optional[Callable[[str, int, int], None]] = None
+    ):
+        """
+        Initialize executor.
+
+        Args:
+            plan: Compiled masking plan
+            salt: Salt for date shifting and pseudonymization
+            names_to_scrub: Names to redact from text columns
+            max_workers: Threads running column chains (default: one per column, up to 4)
+            text_scrub_workers: Process pool size for large text columns
+            text_scrub_min_rows: Below this many rows text scrubbing stays in-process
+            on_stage: Called after each operation with (stage, operations done,
+                      operations in the current execute call), possibly from
+                      worker threads; used for progress reporting
+        """
+        self.plan = plan
+        self.max_workers = max_workers
+
+        self.suppressed = plan.columns("SUPPRESS")
+
+        # Per-column chains, in stage order, excluding suppressed columns
+        self.chains: Dict[str, List[str]] = {}
+        for op in plan.operations:
+            if op.technique in ("SUPPRESS", "KEEP") or op.column in self.suppressed:
+                continue
+            self.chains.setdefault(op.column, []).append(op.technique)
+
+        self.text_columns = [col for col in plan.columns("TEXT_SCRUB") if col not in self.suppressed]
+        self.text_scrubber = TextScrubber(
+            text_columns=self.text_columns,
+            names_to_scrub=names_to_scrub or set(),
+            replacement=_operation_params(plan, "TEXT_SCRUB").get("replacement", TEXT_SCRUB_REPLACEMENT),
+            workers=text_scrub_workers,
+            parallel_min_rows=text_scrub_min_rows
+        )
+        # Text columns that held strings in any frame so far, reported as scrubbed
+        self._scrubbed_columns: Set[str] = set()
+
+        shift = _operation_params(plan, "DATE_SHIFT")
+        self.date_shifter = DateShifter(
+            date_columns=plan.columns("DATE_SHIFT"),
+            salt=salt,
+            min_days=shift.get("min_days", DATE_SHIFT_MIN_DAYS),
+            max_days=shift.get("max_days", DATE_SHIFT_MAX_DAYS)
+        )
+
+        levels = _operation_params(plan, "GENERALIZE")
+        self.generalizer = Generalizer(
+            quasi_identifiers=plan.columns("GENERALIZE"),
+            age_level=levels.get("age_level", 1),
+            location_level=levels.get("location_level", 1),
+            date_level=levels.get("date_level", 1)
+        )
+
+        self.pseudonymizer = Pseudonymizer(
+            linkage_columns=plan.columns("PSEUDONYMIZE"),
+            salt=salt,
+            hash_length=_operation_params(plan, "PSEUDONYMIZE").get("hash_length", PSEUDONYM_HASH_LENGTH)
+        )
+
+        self._lock = threading.Lock()
+        self.stage_timings: Dict[str, float] = {stage: 0.0 for stage in PLAN_STAGES}
+        self.on_stage = on_stage
+        # Progress of the current execute call (see on_stage)
+        self._operations_done = 0
+        self._operations_total = 0
+
+    def _record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_timings[stage] += seconds
+            self._operations_done += 1
+            done, total = self._operations_done, self._operations_total
+        if self.on_stage is not None:
+            self.on_stage(stage, done, total)
+
+    def _run_chain(self, column: str, values: pd.Series, stages: List[str], offset_days) -> Tuple[pd.Series, List[str]]:
+        """Run one column through its operations; returns (values, stages applied)"""
+        applied = []
+        for stage in stages:
+            start = time.perf_counter()
+            if stage == "DATE_SHIFT":
+                values = self.date_shifter.shift_column(values, offset_days)
+            elif stage == "GENERALIZE":
+                if column not in self.generalizer.column_types:
+                    with self._lock:
+                        self.generalizer.column_types.update(
+                            self.generalizer.get_column_types(values.to_frame(column))
+                        )
+                values = self.generalizer.generalize_column(values, column)
+            elif stage == "PSEUDONYMIZE":
+                values = self.pseudonymizer.pseudonymize_column(values, column)
+            self._record(stage, time.perf_counter() - start)
+            applied.append(stage)
+        return values, applied
+
+    def execute(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Apply the plan to a dataframe the caller owns.
+
+        df is modified in place (see shared.masking.base.MaskingEngine) and
+        returned. Columns in the plan but missing from df are skipped.
+
+        Args:
+            df: Input dataframe
+
+        Returns:
+            Tuple of (masked dataframe, techniques applied per column)
+        """
+        applied_by_column = {}
+        # Numeric columns hold no strings; scrub_text leaves non-string values untouched
+        text_columns = [
+            col for col in self.text_columns
+            if col in df.columns and (df[col].dtype == object or isinstance(df[col].dtype, pd.StringDtype))
+        ]
+        self._scrubbed_columns.update(text_columns)
+
+        chains = {
+            col: [stage for stage in stages if stage != "TEXT_SCRUB"]
+            for col, stages in self.chains.items() if col in df.columns
+        }
+        chains = {col: stages for col, stages in chains.items() if stages}
+        shifts_dates = any("DATE_SHIFT" in stages for stages in chains.values())
+
+        # Operations of this call, as counted by _record: text columns,
+        # date offsets, column operations and suppression
+        with self._lock:
+            self._operations_done = 0
+            self._operations_total = len(text_columns) + shifts_dates + sum(map(len, chains.values())) + 1
+
+        # Text scrubbing runs first, in this thread
+        for col in text_columns:
+            start = time.perf_counter()
+            df[col] = self.text_scrubber.scrub_column(df[col])
+            self._record("TEXT_SCRUB", time.perf_counter() - start)
+
+        # Scrubbed in this or an earlier frame, so every chunk reports the same label
+        for col in self._scrubbed_columns:
+            if col in df.columns:
+                applied_by_column[col] = ["TEXT_SCRUB"]
+
+        offset_days = None
+        if shifts_dates:
+            start = time.perf_counter()
+            offset_days = self.date_shifter._get_offsets(df.index)
+            self._record("DATE_SHIFT", time.perf_counter() - start)
+
+        results = {}
+        if chains:
+            with ThreadPoolExecutor(max_workers=self.max_workers or min(4, len(chains))) as pool:
+                futures = {
+                    col: pool.submit(self._run_chain, col, df[col], stages, offset_days)
+                    for col, stages in chains.items()
+                }
+                results = {col: future.result() for col, future in futures.items()}
+
+        for col, (values, applied) in results.items():
+            df[col] = values
+            applied_by_column.setdefault(col, []).extend(applied)
+
+        start = time.perf_counter()
+        suppressor = Suppressor(self.suppressed)
+        suppressed = suppressor.get_suppressed_columns(df)
+        df = suppressor.apply(df, inplace=True)
+        self._record("SUPPRESS", time.perf_counter() - start)
+
+        # Report in plan order; a later stage overrides an earlier label
+        techniques_applied = {}
+        for op in self.plan.operations:
+            if op.technique == "SUPPRESS":
+                if op.column in suppressed:
+                    techniques_applied[op.column] = APPLIED_LABELS["SUPPRESS"]
+            elif op.technique == "KEEP":
+                if op.column in df.columns and op.column not in techniques_applied:
+                    techniques_applied[op.column] = APPLIED_LABELS["KEEP"]
+            elif op.technique in applied_by_column.get(op.column, ()):
+                techniques_applied[op.column] = APPLIED_LABELS[op.technique]
+
+        return df, techniques_applied
@@ -3,11 +3,12 @@ Pseudonymizer Engine
 Applies consistent HMAC-SHA256 hashing to linkage identifiers
 """
 
+import numpy as np
 import pandas as pd
-import hmac
-import hashlib
 from typing import List, Dict, Optional
 
+from .hashing import hmac_sha256_digests, digests_to_hex, factorize
+
 
 class Pseudonymizer:
     """
@@ -57,48 +58,62 @@ class Pseudonymizer:
         Returns:
             Pseudonymized value
         """
-        if pd.isna(value) or value == '':
-            return value
+        return self.pseudonymize_column(pd.Series([value], dtype=object), column).iloc[0]
+
+    def pseudonymize_column(self, values: pd.Series, column: str) -> pd.Series:
+        """
+        Pseudonymize a whole column, hashing each distinct value once.
 
-        # Create cache key
-        cache_key = f"{column}:{value}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        Args:
+            values: Column values
+            column: Column name (for prefix lookup and HMAC message)
 
-        # Generate HMAC-SHA256
-        val_str = str(value)
-        message = f"{column}:{val_str}".encode('utf-8')
-        hash_bytes = hmac.new(self.salt, message, hashlib.sha256).hexdigest()
+        Returns:
+            Series of pseudonyms (missing and empty values unchanged)
+        """
+        codes, uniques = factorize(values)
+        if len(uniques) == 0:
+            return values
 
-        # Take first N characters
-        hash_short = hash_bytes[:self.hash_length].upper()
+        digests = hmac_sha256_digests(self.salt, f"{column}:", uniques)
+        pseudonyms = digests_to_hex(digests, self.hash_length)
 
         # Add prefix if configured
         prefix = self.prefixes.get(column, '')
-        result = f"{prefix}{hash_short}"
+        if prefix:
+            pseudonyms = prefix + pseudonyms
+
+        # Empty strings are kept as-is, like missing values
+        empty = np.array([u == '' for u in uniques], dtype=bool)
+        pseudonyms[empty] = uniques[empty]
 
         # Cache result
-        self._cache[cache_key] = result
+        for value, pseudonym in zip(uniques[~empty], pseudonyms[~empty]):
+            self._cache[f"{column}:{value}"] = pseudonym
 
-        return result
+        original = values.to_numpy(dtype=object)
+        mapped = np.where(codes >= 0, pseudonyms[codes], original)
+        return pd.Series(mapped, index=values.index, dtype=object)
 
-    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+    def apply(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         Apply pseudonymization to linkage identifier columns.
 
         Args:
             df: Input dataframe
+            inplace: Replace columns of df directly instead of copying it
+                     (the caller gives up df, see shared.masking.base.MaskingEngine)
 
         Returns:
             Dataframe with pseudonymized linkage identifiers
         """
-        result = df.copy()
+        result = df if inplace else df.copy()
 
         # Find existing columns
         existing_columns = [col for col in self.linkage_columns if col in df.columns]
 
         for col in existing_columns:
-            result[col] = df[col].apply(lambda x: self._pseudonymize_value(x, col))
+            result[col] = self.pseudonymize_column(df[col], col)
 
         return result
 
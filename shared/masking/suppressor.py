@@ -24,12 +24,14 @@ class Suppressor:
         """
         self.columns_to_suppress = columns_to_suppress
 
-    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+    def apply(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         Remove specified columns from the dataframe.
 
         Args:
             df: Input dataframe
+            inplace: Replace columns of df directly instead of copying it
+                     (the caller gives up df, see shared.masking.base.MaskingEngine)
 
         Returns:
             Dataframe with suppressed columns removed
@@ -41,6 +43,10 @@ class Suppressor:
             return df
 
         # Drop the columns
+        if inplace:
+            df.drop(columns=existing_columns, inplace=True)
+            return df
+
         result = df.drop(columns=existing_columns)
 
         return result
@@ -0,0 +1,274 @@
+"""
+Text Scrubber Engine
+Scrubs PII from free-text fields like clinical notes
+"""
+
+import re
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Set, Optional
+
+from .name_matcher import build_name_matcher
+
+
+# Inputs with fewer rows than this are scrubbed in-process
+DEFAULT_PARALLEL_MIN_ROWS = 20_000
+
+# Scrubber instance shipped to each pool worker once, at pool start
+_worker_scrubber: Optional["TextScrubber"] = None
+
+# Pool workers are started from a fork server (or spawned), never forked
+# from the caller: callers run in worker threads (column chains, progress
+# streaming), and forking a multi-threaded process can copy held locks.
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _POOL_CONTEXT = multiprocessing.get_context("forkserver")
+    # Workers fork from a server that has this module (and pandas) imported already
+    _POOL_CONTEXT.set_forkserver_preload([__name__])
+else:
+    _POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _init_worker(scrubber: "TextScrubber") -> None:
+    """Pool initializer: keep the compiled patterns and name automaton per process."""
+    global _worker_scrubber
+    _worker_scrubber = scrubber
+
+
+def _scrub_chunk(values: list) -> list:
+    """Scrub one chunk of cells inside a pool worker."""
+    return [_worker_scrubber.scrub_text(value) for value in values]
+
+
+class TextScrubber:
+    """
+    Scrubs personally identifiable information from free-text columns.
+
+    Detects and redacts:
+    - Saudi phone numbers (international and local formats)
+    - Email addresses
+    - Names (extracted from other columns or provided list)
+    - Street addresses
+    - Insurance/ID numbers
+    """
+
+    def __init__(
+        self,
+        text_columns: List[str],
+        names_to_scrub: Optional[Set[str]] = None,
+        replacement: str = "[REDACTED]",
+        name_matcher: str = "auto",
+        workers: int = 1,
+        parallel_min_rows: int = DEFAULT_PARALLEL_MIN_ROWS,
+        chunk_size: Optional[int] = None
+    ):
+        """
+        Initialize text scrubber.
+
+        Args:
+            text_columns: List of column names containing free text
+            names_to_scrub: Set of names to scrub from text
+            replacement: Replacement string for redacted content
+            name_matcher: Name matching backend ('auto', 'regex', 'aho_corasick').
+                         'auto' uses Aho-Corasick for large name lists.
+            workers: Number of worker processes for apply(); 1 = in-process
+            parallel_min_rows: Below this many rows apply() stays in-process
+            chunk_size: Rows per task sent to a worker (default: split each
+                        column into 4 chunks per worker)
+        """
+        self.text_columns = text_columns
+        self.names_to_scrub = names_to_scrub or set()
+        self.replacement = replacement
+        self.name_matcher = name_matcher
+        self.workers = max(1, int(workers))
+        self.parallel_min_rows = parallel_min_rows
+        self.chunk_size = chunk_size
+
+        # Regex patterns for Saudi Arabia context
+        self.patterns = {
+            # Saudi phone numbers: +966, 00966, 966, 05x, 5x
+            'phone': [
+                r'\+966\s*\d{8,9}',           # +966XXXXXXXX
+                r'00966\s*\d{8,9}',           # 00966XXXXXXXX
+                r'009665\d{8}',               # 009665XXXXXXXX
+                r'\b966\s*5\d{8}\b',          # 9665XXXXXXXX
+                r'\b05\d{8}\b',               # 05XXXXXXXX
+                r'\b5\d{8}\b',                # 5XXXXXXXX (mobile)
+            ],
+            # Email addresses
+            'email': [
+                r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+            ],
+            # Saudi National ID (10 digits starting with 1 or 2)
+            'national_id': [
+                r'\b[12]\d{9}\b',
+            ],
+            # Insurance IDs (INS followed by numbers)
+            'insurance_id': [
+                r'\bINS\d{5,10}\b',
+            ],
+            # Street addresses (common Saudi patterns)
+            'address': [
+                r'\b\d+\s+(?:Prince\s+)?(?:King\s+)?[A-Z][a-z]+\s+(?:Road|Street|St|Ave|Avenue|District|Blvd)\b',
+                r'\bP\.?O\.?\s*Box\s*\d+\b',
+            ],
+        }
+
+        # Compile once; scrub_text reuses these for every cell
+        self._combined_pattern = self._compile_patterns()
+        self._name_matcher = build_name_matcher(self.names_to_scrub, self.name_matcher)
+
+    def _compile_patterns(self) -> re.Pattern:
+        """
+        Compile all regex patterns into a single named-group alternation.
+
+        Each category becomes a named group (e.g. ``phone``), so a text is
+        scanned once for every PII pattern instead of once per pattern.
+        """
+        groups = []
+        for category, pattern_list in self.patterns.items():
+            alternatives = '|'.join(f'(?:{pattern})' for pattern in pattern_list)
+            groups.append(f'(?P<{category}>{alternatives})')
+        return re.compile('|'.join(groups), re.IGNORECASE)
+
+    def scrub_text(self, text: str) -> str:
+        """
+        Scrub PII from a single text string.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Text with PII redacted
+        """
+        if pd.isna(text) or not isinstance(text, str):
+            return text
+
+        # Apply all pattern-based scrubbing in one pass
+        result = self._combined_pattern.sub(self.replacement, text)
+
+        # Apply name scrubbing
+        if self._name_matcher:
+            result = self._name_matcher.sub(self.replacement, result)
+
+        return result
+
+    def _chunks(self, values: list) -> List[list]:
+        """Split column values into ordered chunks for the pool."""
+        size = self.chunk_size or -(-len(values) // (self.workers * 4))
+        size = max(1, size)
+        return [values[i:i + size] for i in range(0, len(values), size)]
+
+    def _scrub_column_parallel(self, pool: ProcessPoolExecutor, column: pd.Series) -> pd.Series:
+        """Scrub a column in chunks across the pool, preserving row order."""
+        scrubbed = []
+        for chunk in pool.map(_scrub_chunk, self._chunks(column.tolist())):
+            scrubbed.extend(chunk)
+        return pd.Series(scrubbed, index=column.index, name=column.name, dtype=object)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """Process pool whose workers hold a copy of this scrubber"""
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=_POOL_CONTEXT,
+            initializer=_init_worker,
+            initargs=(self,)
+        )
+
+    def scrub_column(self, values: pd.Series) -> pd.Series:
+        """
+        Scrub PII from one text column.
+
+        Uses a process pool under the same workers/parallel_min_rows rule
+        as apply().
+
+        Args:
+            values: Column values
+
+        Returns:
+            Scrubbed column
+        """
+        if self.workers > 1 and len(values) >= self.parallel_min_rows:
+            with self._pool() as pool:
+                return self._scrub_column_parallel(pool, values)
+        return values.apply(self.scrub_text)
+
+    def apply(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Scrub PII from specified text columns in dataframe.
+
+        With workers > 1 and at least parallel_min_rows rows, columns are
+        split into row chunks and scrubbed in a process pool; otherwise
+        scrubbing runs in-process.
+
+        Args:
+            df: Input dataframe
+            inplace: Replace columns of df directly instead of copying it
+                     (the caller gives up df, see shared.masking.base.MaskingEngine)
+
+        Returns:
+            Dataframe with scrubbed text columns
+        """
+        result = df if inplace else df.copy()
+
+        columns = [col for col in self.text_columns if col in result.columns]
+        if not columns:
+            return result
+
+        if self.workers > 1 and len(result) >= self.parallel_min_rows:
+            with self._pool() as pool:
+                for col in columns:
+                    result[col] = self._scrub_column_parallel(pool, result[col])
+            return result
+
+        for col in columns:
+            result[col] = self.scrub_column(result[col])
+
+        return result
+
+    def get_scrubbed_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Get list of columns that will be scrubbed.
+
+        Args:
+            df: Input dataframe
+
+        Returns:
+            List of column names that exist and will be scrubbed
+        """
+        return [col for col in self.text_columns if col in df.columns]
+
+    @staticmethod
+    def extract_names_from_column(df: pd.DataFrame, name_column: str) -> Set[str]:
+        """
+        Extract unique names from a name column for scrubbing in other columns.
+
+        Handles full names by splitting into first and last name components.
+
+        Args:
+            df: Input dataframe
+            name_column: Column containing names
+
+        Returns:
+            Set of name components to scrub
+        """
+        names = set()
+
+        if name_column not in df.columns:
+            return names
+
+        for value in df[name_column].dropna().unique():
+            if isinstance(value, str):
+                # Add full name
+                names.add(value.strip())
+
+                # Split and add components (handles "First Last" and "First Al-Last")
+                parts = value.split()
+                for part in parts:
+                    # Skip common prefixes like "Al-"
+                    if part and len(part) > 2 and not part.lower().startswith('al-'):
+                        names.add(part.strip())
+                    elif part.lower().startswith('al-'):
+                        names.add(part.strip())
+
+        return names
@@ -3,6 +3,8 @@ SADNxAI - Shared Data Models
 Pydantic models for all services
 """
 
+import hashlib
+import json
 from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
@@ -40,6 +42,12 @@ class MessageRole(str, Enum):
     TOOL = "tool"
 
 
+class SensitiveDistance(str, Enum):
+    """Ground distance used for t-closeness on a sensitive attribute"""
+    CATEGORICAL = "categorical"
+    ORDINAL = "ordinal"
+
+
 # ============================================================
 # Generalization Config
 # ============================================================
@@ -73,6 +81,11 @@ class Classification(BaseModel):
     regulation_refs: dict[str, list[RegulationRef]] = Field(default_factory=dict, description="Per-column regulation references")
     generalization_config: GeneralizationConfig = Field(default_factory=GeneralizationConfig)
 
+    def fingerprint(self) -> str:
+        """SHA-256 of the fields that drive masking (reasoning and regulation refs excluded)"""
+        payload = self.model_dump(mode="json", exclude={"reasoning", "regulation_refs"})
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
 
 # ============================================================
 # Privacy Thresholds
@@ -101,6 +114,35 @@ class MetricResult(BaseModel):
     value: float
     threshold: float
     passed: bool
+    approximate: bool = False
+    interval: Optional[tuple[float, float]] = Field(default=None, description="(lower, upper) bounds when approximate")
+
+
+class ApproximationStats(BaseModel):
+    """How much of the data an approximate validation looked at"""
+    seconds: float
+    total_rows: int
+    sampled_rows: int
+    total_classes: int
+    sampled_classes: int
+    confidence: float
+    tail_fraction: float = Field(description="Largest share of classes that may be worse than the reported l/t, at this confidence")
+
+
+class RollupStats(BaseModel):
+    """How a revalidation was derived from stored equivalence classes"""
+    seconds: float
+    source_classes: int = Field(description="Classes stored for the job at its validated generalization")
+    classes: int = Field(description="Classes after rolling up to the requested generalization")
+
+
+class LoadStats(BaseModel):
+    """How the validated file was loaded"""
+    seconds: float
+    memory_bytes: int
+    rows: int
+    columns_loaded: list[str]
+    engine: str
 
 
 class RemediationSuggestion(BaseModel):
@@ -145,6 +187,7 @@ class Session(BaseModel):
     """Complete session state"""
     id: str
     title: str = "New Chat"
+    tenant_id: str = "default"
     status: SessionStatus = SessionStatus.IDLE
     file_path: Optional[str] = None
     columns: list[str] = Field(default_factory=list)
@@ -176,6 +219,8 @@ class MaskingRequest(BaseModel):
     input_path: str
     classification: Classification
     salt: str = Field(description="Salt for pseudonymization HMAC")
+    chunk_size: Optional[int] = Field(default=None, description="Rows per chunk for streaming masking")
+    output_format: Optional[str] = Field(default=None, description="Staging file format: csv, parquet or arrow")
 
 
 class MaskingResponse(BaseModel):
@@ -184,6 +229,26 @@ class MaskingResponse(BaseModel):
     techniques_applied: dict[str, str]
     rows_processed: int
     columns_masked: int
+    stage_timings: dict[str, float] = Field(default_factory=dict, description="Seconds spent per plan stage")
+    column_types: dict[str, str] = Field(default_factory=dict, description="Hierarchy type used per generalized column")
+
+
+class MaskingOperation(BaseModel):
+    """One masking step applied to one column"""
+    column: str
+    technique: str = Field(description="TEXT_SCRUB, SUPPRESS, DATE_SHIFT, GENERALIZE, PSEUDONYMIZE or KEEP")
+    params: dict[str, Any] = Field(default_factory=dict)
+
+
+class MaskingPlan(BaseModel):
+    """Per-column masking operations compiled from a Classification, in execution order"""
+    classification_hash: str
+    stages: list[str]
+    operations: list[MaskingOperation] = Field(default_factory=list)
+
+    def columns(self, technique: str) -> list[str]:
+        """Columns that have an operation of the given technique"""
+        return [op.column for op in self.operations if op.technique == technique]
 
 
 # Validation Service
@@ -194,6 +259,59 @@ class ValidationRequest(BaseModel):
     quasi_identifiers: list[str]
     sensitive_attributes: list[str]
     thresholds: PrivacyThresholds
+    t_closeness_distance: dict[str, SensitiveDistance] = Field(
+        default_factory=dict,
+        description="Distance per sensitive attribute; unlisted ones are categorical"
+    )
+    t_closeness_bins: Optional[int] = Field(default=None, ge=2, description="Quantile bins for ordinal attributes")
+    approximate: bool = Field(default=False, description="Fast preview: stream the file and sample classes for l/t")
+    sample_classes: Optional[int] = Field(default=None, ge=1, description="Classes sampled in approximate mode")
+    confidence: float = Field(default=0.95, gt=0, lt=1)
+    generalization_config: Optional[GeneralizationConfig] = Field(
+        default=None,
+        description="Levels the file was masked with; exact validations then store class aggregates for /revalidate"
+    )
+    column_types: dict[str, str] = Field(default_factory=dict, description="Hierarchy type per generalized column (MaskingResponse.column_types)")
+
+
+class RevalidationRequest(BaseModel):
+    """Request to re-derive metrics of a validated job at coarser generalization levels"""
+    job_id: str
+    generalization_config: GeneralizationConfig
+    thresholds: PrivacyThresholds
+    t_closeness_distance: dict[str, SensitiveDistance] = Field(default_factory=dict)
+    t_closeness_bins: Optional[int] = Field(default=None, ge=2)
+
+
+class OptimizeRequest(BaseModel):
+    """Request to search the generalization levels that pass the thresholds"""
+    job_id: str
+    input_path: str = Field(description="Raw (not yet masked) file")
+    quasi_identifiers: list[str]
+    sensitive_attributes: list[str]
+    thresholds: PrivacyThresholds
+    column_types: dict[str, str] = Field(default_factory=dict, description="Hierarchy type per quasi-identifier; others are detected")
+    t_closeness_distance: dict[str, SensitiveDistance] = Field(default_factory=dict)
+    t_closeness_bins: Optional[int] = Field(default=None, ge=2)
+
+
+class GeneralizationCandidate(BaseModel):
+    """Minimal generalization levels that pass every threshold"""
+    generalization_config: GeneralizationConfig
+    metrics: dict[str, MetricResult]
+    precision_loss: float = Field(description="Mean share of hierarchy height used per quasi-identifier, 0-1")
+    discernibility: int = Field(description="Sum of squared equivalence class sizes")
+    equivalence_classes: int
+
+
+class OptimizeResponse(BaseModel):
+    """Frontier of minimal passing generalization levels, least information loss first"""
+    frontier: list[GeneralizationCandidate]
+    recommended: Optional[GeneralizationConfig] = None
+    column_types: dict[str, str]
+    nodes_total: int
+    nodes_evaluated: int
+    seconds: float
 
 
 class ValidationResponse(BaseModel):
@@ -202,6 +320,65 @@ class ValidationResponse(BaseModel):
     metrics: dict[str, MetricResult]
     failed_metrics: list[str]
     remediation_suggestions: list[RemediationSuggestion]
+    load_stats: Optional[LoadStats] = None
+    approximation: Optional[ApproximationStats] = None
+    rollup: Optional[RollupStats] = None
+
+
+class MaskAndValidateRequest(BaseModel):
+    """Request to mask a file and validate the masked frame in one step"""
+    job_id: str
+    input_path: str
+    classification: Classification
+    salt: str = Field(description="Salt for pseudonymization HMAC")
+    thresholds: PrivacyThresholds
+    output_format: Optional[str] = Field(default=None, description="Masked file format: csv, parquet or arrow")
+    t_closeness_distance: dict[str, SensitiveDistance] = Field(default_factory=dict)
+    t_closeness_bins: Optional[int] = Field(default=None, ge=2)
+
+
+class MaskAndValidateResponse(BaseModel):
+    """Masking and validation results of one /mask-and-validate call"""
+    masking: MaskingResponse
+    validation: ValidationResponse
+
+
+class ClassViolation(BaseModel):
+    """One equivalence class that fails a privacy threshold"""
+    class_id: int
+    quasi_identifier_values: dict[str, Any]
+    record_count: int
+    diversity: Optional[int] = None
+    diversity_attribute: Optional[str] = None
+    distance: float
+    distance_attribute: Optional[str] = None
+    failed_metrics: list[str]
+    severity: float = Field(description="Worst normalized shortfall over k/l/t, 0-1")
+
+
+class ViolationsRequest(BaseModel):
+    """Request for the worst violating classes of a dataset"""
+    job_id: str
+    input_path: str
+    quasi_identifiers: list[str]
+    sensitive_attributes: list[str]
+    thresholds: PrivacyThresholds
+    t_closeness_distance: dict[str, SensitiveDistance] = Field(default_factory=dict)
+    t_closeness_bins: Optional[int] = Field(default=None, ge=2)
+    limit: int = Field(default=20, ge=1, le=1000, description="Classes per page")
+    offset: int = Field(default=0, ge=0)
+    dump_records: bool = Field(default=False, description="Write violating rows to a Parquet file")
+
+
+class ViolationsResponse(BaseModel):
+    """Page of violating classes, worst first"""
+    total_classes: int
+    violating_classes: int
+    violating_records: int
+    offset: int
+    limit: int
+    classes: list[ClassViolation]
+    records_path: Optional[str] = None
 
 
 class ReportRequest(BaseModel):
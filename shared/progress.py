@@ -0,0 +1,187 @@
+"""
+SADNxAI - Progress Streaming
+Progress of long-running service calls, streamed to the caller as NDJSON
+
+A caller that sends "Accept: application/x-ndjson" gets one JSON object
+per line instead of a single JSON body:
+
+    {"event": "progress", "service": ..., "stage": ..., "rows_processed": ...,
+     "total_rows": ..., "elapsed_seconds": ..., "stage_timings": {...}, "eta_seconds": ...}
+    ...
+    {"event": "result", "result": {...}}       (the usual response body)
+    {"event": "error", "status_code": ..., "detail": ...}   (instead of result)
+"""
+
+import json
+import time
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Seconds between progress events while the stage does not change
+PROGRESS_MIN_INTERVAL = 0.5
+
+
+def wants_progress(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for the NDJSON progress stream"""
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+class ProgressTracker:
+    """
+    Progress of one request: rows processed, current stage, seconds spent
+    per engine and an ETA.
+
+    update() may be called from worker threads. Events are emitted on a
+    stage change and otherwise at most every min_interval seconds.
+
+    Stages are timed from one stage change to the next; timings passed to
+    update() (e.g. per-engine seconds of concurrent column chains) take
+    precedence for the stages they cover.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        total_rows: Optional[int] = None,
+        emit: Optional[Callable[[Dict[str, Any]], None]] = None,
+        min_interval: float = PROGRESS_MIN_INTERVAL
+    ):
+        """
+        Args:
+            service: Name reported in each event
+            total_rows: Rows the request will process, if known
+            emit: Called with each progress event (None: track only)
+            min_interval: Seconds between events within a stage
+        """
+        self.service = service
+        self.total_rows = total_rows
+        self.emit = emit
+        self.min_interval = min_interval
+
+        self.stage: Optional[str] = None
+        self.rows_processed = 0
+        self.fraction: Optional[float] = None
+        self.stage_timings: Dict[str, float] = {}
+
+        self._start = time.perf_counter()
+        self._stage_start = self._start
+        self._stage_seconds: Dict[str, float] = {}
+        self._last_emit = None
+        self._lock = threading.Lock()
+
+    def update(
+        self,
+        stage: Optional[str] = None,
+        rows_processed: Optional[int] = None,
+        fraction: Optional[float] = None,
+        stage_timings: Optional[Dict[str, float]] = None,
+        force: bool = False
+    ) -> None:
+        """
+        Record progress and emit an event if one is due.
+
+        Args:
+            stage: Current stage
+            rows_processed: Rows done so far
+            fraction: Share of the work done, 0-1 (default: rows_processed / total_rows)
+            stage_timings: Seconds spent per engine so far (see class docstring)
+            force: Emit even if the last event was recent
+        """
+        with self._lock:
+            now = time.perf_counter()
+            stage_changed = stage is not None and stage != self.stage
+            if stage_changed:
+                if self.stage is not None:
+                    self._stage_seconds[self.stage] = self._stage_seconds.get(self.stage, 0.0) + now - self._stage_start
+                self.stage = stage
+                self._stage_start = now
+            if rows_processed is not None:
+                self.rows_processed = rows_processed
+            if fraction is not None:
+                self.fraction = fraction
+            elif rows_processed is not None and self.total_rows:
+                self.fraction = rows_processed / self.total_rows
+            if stage_timings is not None:
+                self.stage_timings = dict(stage_timings)
+
+            due = self._last_emit is None or now - self._last_emit >= self.min_interval
+            if self.emit is None or not (force or stage_changed or due):
+                return
+            self._last_emit = now
+            event = self._event(now)
+
+        self.emit(event)
+
+    def _event(self, now: float) -> Dict[str, Any]:
+        elapsed = now - self._start
+        # Unknown before any work is done, and after the measured part while later stages run
+        eta = None
+        if self.fraction is not None and 0 < self.fraction < 1:
+            eta = round(elapsed * (1 - self.fraction) / self.fraction, 1)
+
+        timings = dict(self._stage_seconds)
+        if self.stage is not None:
+            timings[self.stage] = timings.get(self.stage, 0.0) + now - self._stage_start
+        timings.update(self.stage_timings)
+        return {
+            "event": "progress",
+            "service": self.service,
+            "stage": self.stage,
+            "rows_processed": self.rows_processed,
+            "total_rows": self.total_rows,
+            "elapsed_seconds": round(elapsed, 3),
+            "stage_timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+            "eta_seconds": eta
+        }
+
+
+async def ndjson_progress(
+    work: Callable[[ProgressTracker], Any],
+    service: str,
+    total_rows: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Run work in a thread and stream its progress, then its result, as NDJSON lines.
+
+    Args:
+        work: Does the request's work, reporting to the tracker it is passed;
+              returns the response (a pydantic model or a JSON-serializable value)
+        service: Service name for the progress events
+        total_rows: Rows the work will process, if known up front
+
+    Yields:
+        Progress lines, then one result or error line
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    tracker = ProgressTracker(
+        service, total_rows, emit=lambda event: loop.call_soon_threadsafe(events.put_nowait, event)
+    )
+
+    task = asyncio.ensure_future(asyncio.to_thread(work, tracker))
+    # Queued after every event the thread emitted, so it marks the end
+    task.add_done_callback(lambda _: events.put_nowait(None))
+
+    while True:
+        event = await events.get()
+        if event is None:
+            break
+        yield json.dumps(event) + "\n"
+
+    try:
+        result = task.result()
+    except Exception as e:
+        # HTTPException carries status_code and detail
+        yield json.dumps({
+            "event": "error",
+            "status_code": getattr(e, "status_code", 500),
+            "detail": getattr(e, "detail", str(e))
+        }) + "\n"
+        return
+
+    if hasattr(result, "model_dump"):
+        result = result.model_dump(mode="json")
+    yield json.dumps({"event": "result", "result": result}) + "\n"
@@ -0,0 +1,357 @@
+"""
+SADNxAI - Tabular File I/O
+CSV, Parquet and Arrow IPC reading/writing shared by the services
+
+The format is taken from the file extension. Parquet and Arrow keep
+dtypes between pipeline hops (Parquet also keeps categoricals) and allow
+reading only the columns a service needs; they require pyarrow.
+"""
+
+import os
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Try to import pyarrow (needed for Parquet and Arrow IPC)
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Supported formats and their file extensions
+FORMAT_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
+def detect_format(path: str) -> str:
+    """
+    Get the table format of a path from its extension.
+
+    Unknown extensions are treated as CSV.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "csv"
+
+
+def check_format(fmt: str) -> str:
+    """
+    Validate a format name.
+
+    Raises:
+        ValueError: If the format is unknown or needs pyarrow and it is not installed
+    """
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown table format: {fmt}")
+    if fmt != "csv" and not PYARROW_AVAILABLE:
+        raise ValueError(f"Format '{fmt}' requires pyarrow, which is not installed")
+    return fmt
+
+
+def with_format(path: str, fmt: str) -> str:
+    """Replace the extension of path with the one for fmt"""
+    return os.path.splitext(path)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def read_columns(path: str) -> List[str]:
+    """Column names of a table file, without loading its data"""
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        return list(pq.read_schema(path).names)
+    if fmt == "arrow":
+        with pa.memory_map(path) as source:
+            return list(pa_ipc.open_file(source).schema.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def count_rows(path: str) -> int:
+    """
+    Number of data rows of a table file, without parsing it.
+
+    Parquet and Arrow read the count from metadata. CSV counts line
+    breaks after the header, so quoted multi-line values make it an upper
+    bound; it is meant for progress estimates.
+    """
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+    if fmt == "arrow":
+        with pa.memory_map(path) as source:
+            return pa_ipc.open_file(source).read_all().num_rows
+
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    # A last line without a trailing break still counts; the header does not
+    return max(lines + (last != b"\n") - 1, 0)
+
+
+def read_table(
+    path: str,
+    columns: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, str]] = None,
+    engine: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Read a table file into a dataframe.
+
+    Args:
+        path: CSV, Parquet or Arrow IPC file
+        columns: Only load these columns; names missing from the file are
+                 ignored. None loads every column.
+        dtype: Dtypes per column (e.g. 'category'), applied while parsing
+               CSV and after loading Parquet/Arrow
+        engine: pd.read_csv engine for CSV ('c', 'python', 'pyarrow');
+                None uses the pandas default
+
+    Returns:
+        Dataframe (Parquet dictionary columns come back as categoricals)
+    """
+    fmt = check_format(detect_format(path))
+
+    if columns is not None:
+        available = set(read_columns(path))
+        columns = [col for col in dict.fromkeys(columns) if col in available]
+
+    if dtype:
+        loaded = set(columns) if columns is not None else set(read_columns(path))
+        dtype = {col: kind for col, kind in dtype.items() if col in loaded}
+
+    if fmt == "csv":
+        kwargs = {"engine": engine} if engine else {}
+        return pd.read_csv(path, usecols=columns, dtype=dtype or None, **kwargs)
+
+    if fmt == "parquet":
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        with pa.memory_map(path) as source:
+            table = pa_ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        df = table.to_pandas()
+    return df.astype(dtype) if dtype else df
+
+
+def iter_table_chunks(
+    path: str,
+    chunk_size: int,
+    columns: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a table file in chunks of at most chunk_size rows.
+
+    The row index continues across chunks (0..n-1 over the whole file),
+    as with pd.read_csv(chunksize=...), for every format.
+
+    Args:
+        path: CSV, Parquet or Arrow IPC file
+        chunk_size: Rows per chunk
+        columns: Only load these columns (missing names are ignored)
+        dtype: Dtypes per column, as in read_table
+
+    Yields:
+        Dataframe chunks
+    """
+    fmt = check_format(detect_format(path))
+
+    if columns is not None:
+        available = set(read_columns(path))
+        columns = [col for col in dict.fromkeys(columns) if col in available]
+
+    if dtype:
+        loaded = set(columns) if columns is not None else set(read_columns(path))
+        dtype = {col: kind for col, kind in dtype.items() if col in loaded}
+
+    if fmt == "csv":
+        yield from pd.read_csv(path, usecols=columns, dtype=dtype or None, chunksize=chunk_size)
+        return
+
+    start = 0
+    if fmt == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+        for batch in batches:
+            chunk = batch.to_pandas()
+            if dtype:
+                chunk = chunk.astype(dtype)
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+        return
+
+    with pa.memory_map(path) as source:
+        table = pa_ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        for offset in range(0, table.num_rows, chunk_size):
+            chunk = table.slice(offset, chunk_size).to_pandas()
+            if dtype:
+                chunk = chunk.astype(dtype)
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            yield chunk
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    """Write a dataframe to a CSV, Parquet or Arrow IPC file (by extension)"""
+    writer = TableWriter(path)
+    try:
+        writer.write(df)
+    finally:
+        writer.close()
+
+
+class TableWriteError(OSError):
+    """Writing a table chunk failed (as opposed to reading the input)"""
+
+
+def _common_type(written: "pa.DataType", chunk: "pa.DataType") -> "pa.DataType":
+    """Type holding values of both types: numbers widen to double, anything else to string"""
+    if written == chunk or pa.types.is_null(chunk):
+        return written
+    if pa.types.is_null(written):
+        return chunk
+    numeric = (pa.types.is_integer, pa.types.is_floating)
+    if any(check(written) for check in numeric) and any(check(chunk) for check in numeric):
+        return pa.float64()
+    return pa.string()
+
+
+class TableWriter:
+    """
+    Writes a table file chunk by chunk.
+
+    CSV chunks are appended with a single header. Parquet and Arrow
+    chunks are cast to the schema of the first chunk, with all-missing
+    columns typed as strings. Parquet dictionary (categorical) columns
+    are widened to int32 indices so chunks with different categories
+    share one schema; Arrow IPC files only allow a single dictionary
+    per field, so categoricals are written as plain values there.
+
+    A later chunk whose column type disagrees (a column all-missing, so
+    float64, in the first chunk and text later) widens the schema: the
+    rows written so far are rewritten with numbers widened to double or
+    to string. This is rare and costs one pass over the file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize writer.
+
+        Args:
+            path: Output file; its extension selects the format
+        """
+        self.path = path
+        self.format = check_format(detect_format(path))
+        self._writer = None
+        self._schema = None
+        self._rows = 0
+
+    def _unified_schema(self, schema: "pa.Schema") -> "pa.Schema":
+        fields = []
+        for field in schema:
+            if pa.types.is_dictionary(field.type):
+                # Arrow IPC files allow one dictionary per field for the whole file
+                if self.format == "arrow":
+                    field = field.with_type(field.type.value_type)
+                else:
+                    field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+            elif pa.types.is_null(field.type):
+                # All-missing object column in the first chunk; later chunks hold text
+                field = field.with_type(pa.string())
+            fields.append(field)
+        return pa.schema(fields)
+
+    def _open(self, schema: "pa.Schema") -> None:
+        self._schema = schema
+        if self.format == "parquet":
+            self._writer = pq.ParquetWriter(self.path, schema)
+        else:
+            self._writer = pa_ipc.new_file(self.path, schema)
+
+    def _widened_schema(self, schema: "pa.Schema") -> Optional["pa.Schema"]:
+        """Schema also holding a chunk's types, or None if the current one does"""
+        chunk_types = dict(zip(schema.names, schema.types))
+        fields = []
+        for field in self._schema:
+            written = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+            chunk = chunk_types.get(field.name, written)
+            if pa.types.is_dictionary(chunk):
+                chunk = chunk.value_type
+            common = _common_type(written, chunk)
+            if common != written:
+                field = field.with_type(pa.dictionary(pa.int32(), common) if pa.types.is_dictionary(field.type) else common)
+            fields.append(field)
+        widened = pa.schema(fields)
+        return None if widened.equals(self._schema) else widened
+
+    def _rewrite(self, schema: "pa.Schema") -> None:
+        """Rewrite the rows written so far with a wider schema"""
+        self._writer.close()
+        old_path = f"{self.path}.widen"
+        os.replace(self.path, old_path)
+        try:
+            self._open(schema)
+            if self.format == "parquet":
+                batches = pq.ParquetFile(old_path).iter_batches()
+                for batch in batches:
+                    self._writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+            else:
+                with pa.memory_map(old_path) as source:
+                    reader = pa_ipc.open_file(source)
+                    for i in range(reader.num_record_batches):
+                        self._writer.write_table(pa.Table.from_batches([reader.get_batch(i)]).cast(schema))
+        finally:
+            os.remove(old_path)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Append one chunk.
+
+        Raises:
+            TableWriteError: If the chunk cannot be converted or written
+        """
+        if self.format == "csv":
+            first = self._rows == 0
+            try:
+                df.to_csv(self.path, mode='w' if first else 'a', header=first, index=False)
+            except OSError as e:
+                raise TableWriteError(str(e)) from e
+            self._rows += len(df)
+            return
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+            if self._writer is None:
+                self._open(self._unified_schema(table.schema).remove_metadata())
+            else:
+                widened = self._widened_schema(table.schema)
+                if widened is not None:
+                    self._rewrite(widened)
+            self._writer.write_table(table.cast(self._schema))
+        except (pa.ArrowException, ValueError, OSError) as e:
+            raise TableWriteError(f"Failed to write {self.path}: {e}") from e
+        self._rows += len(df)
+
+    def close(self) -> None:
+        """Finish the file"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
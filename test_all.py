@@ -68,7 +68,7 @@ print_header("MASKING ENGINE TESTS")
 
 @test("Suppressor removes direct identifier columns")
 def test_suppressor():
-    from engine.suppressor import Suppressor
+    from shared.masking.suppressor import Suppressor
 
     df = load_test_data()
     original_cols = list(df.columns)
@@ -88,7 +88,7 @@ def test_suppressor():
 
 @test("DateShifter applies consistent random offset")
 def test_date_shifter():
-    from engine.date_shifter import DateShifter
+    from shared.masking.date_shifter import DateShifter
 
     df = load_test_data()
 
@@ -118,7 +118,7 @@ def test_date_shifter():
 
 @test("Generalizer generalizes age to 5-year ranges")
 def test_generalizer_age():
-    from engine.generalizer import Generalizer
+    from shared.masking.generalizer import Generalizer
 
     df = load_test_data()
 
@@ -140,7 +140,7 @@ def test_generalizer_age():
 
 @test("Generalizer generalizes cities to provinces")
 def test_generalizer_location():
-    from engine.generalizer import Generalizer
+    from shared.masking.generalizer import Generalizer
 
     df = load_test_data()
 
@@ -162,7 +162,7 @@ def test_generalizer_location():
 
 @test("Pseudonymizer creates consistent hashes")
 def test_pseudonymizer():
-    from engine.pseudonymizer import Pseudonymizer
+    from shared.masking.pseudonymizer import Pseudonymizer
 
     df = load_test_data()
 
@@ -191,8 +191,295 @@ test_suppressor()
 test_date_shifter()
 test_generalizer_age()
 test_generalizer_location()
+
+@test("Generalizer kernels match the scalar functions at every level")
+def test_generalizer_kernel_parity():
+    from shared.masking.generalizer import Generalizer
+
+    days = pd.to_datetime(['2024-03-15', '2024-12-30', '2021-01-01', None, '1999-07-04'])
+    df = pd.DataFrame({
+        'age': [34.7, -4.5, np.nan, 0, 17, 18, 64, 65, 120.0, -3.0],
+        'age_int': pd.array([34, None, 5, 17, 18, 64, 65, 99, 0, 7], dtype='Int64'),
+        'visit': ['2024-03-15', None, 'garbage', '03/15/2024', '2024-12-30',
+                  '2024-12-30 13:45', '1999-07-04', '2021-01-01', '2024-02-29', 'not a date'],
+        'shifted': list(days) * 2,
+        'zip': [12345, '12-345', '7', ' 1 ', 'abc', None, 31952, '98765', '', 4.0],
+        # Equal but str()-distinct values must not share a label
+        'zip_mixed': [12345, 12345.0, '12345', True, 1, 1.0, None, 12345, '1', 98765.0],
+        'visit_mixed': ['2024-03-15', 1, 1.0, True, None, '2024-03-15', 20240315, 20240315.0, '1', 1],
+    })
+    column_types = {
+        'age': 'age', 'age_int': 'age', 'visit': 'date', 'shifted': 'date', 'zip': 'zipcode',
+        'zip_mixed': 'zipcode', 'visit_mixed': 'date'
+    }
+
+    for level in range(4):
+        generalizer = Generalizer(
+            quasi_identifiers=list(column_types),
+            age_level=level,
+            location_level=level,
+            date_level=level,
+            column_types=column_types
+        )
+        result = generalizer.apply(df)
+
+        scalar = {
+            'age': generalizer._generalize_age,
+            'age_int': generalizer._generalize_age,
+            'visit': generalizer._generalize_date,
+            'shifted': generalizer._generalize_date,
+            'zip': generalizer._generalize_zipcode,
+            'zip_mixed': generalizer._generalize_zipcode,
+            'visit_mixed': generalizer._generalize_date,
+        }
+        for col, func in scalar.items():
+            expected = [func(v, level) for v in df[col]]
+            actual = [None if pd.isna(v) else v for v in result[col].astype(object)]
+            assert actual == expected, f"{col} level {level}: {actual} != {expected}"
+            assert isinstance(result[col].dtype, pd.CategoricalDtype)
+
+@test("Generalizer kernels handle empty and all-missing columns")
+def test_generalizer_kernel_empty():
+    from shared.masking.generalizer import Generalizer
+
+    column_types = {'age': 'age', 'visit': 'date', 'shifted': 'date', 'zip': 'zipcode'}
+    empty = pd.DataFrame({
+        'age': pd.Series([], dtype=float),
+        'visit': pd.Series([], dtype=object),
+        'shifted': pd.Series([], dtype='datetime64[ns]'),
+        'zip': pd.Series([], dtype=object),
+    })
+    missing = pd.DataFrame({
+        'age': [np.nan] * 3,
+        'visit': [None] * 3,
+        'shifted': pd.Series([pd.NaT] * 3),
+        'zip': [None] * 3,
+    })
+
+    for level in range(4):
+        generalizer = Generalizer(list(column_types), level, level, level, column_types)
+        assert len(generalizer.apply(empty)) == 0
+        assert generalizer.apply(missing).isna().all().all()
+
+test_generalizer_kernel_parity()
+test_generalizer_kernel_empty()
+
+@test("Generalizer keeps str()-distinct values of object columns apart")
+def test_generalizer_mixed_object():
+    from shared.masking.generalizer import Generalizer
+
+    df = pd.DataFrame({'code': [1, 1.0, True, '1', None, 1]})
+    for level in range(4):
+        generalizer = Generalizer(['code'], level, level, level, {'code': 'generic'})
+        result = generalizer.apply(df)
+        expected = [generalizer._generalize_generic(v, level) for v in df['code']]
+        actual = [None if pd.isna(v) else v for v in result['code'].astype(object)]
+        assert actual == expected, f"level {level}: {actual} != {expected}"
+
+test_generalizer_mixed_object()
 test_pseudonymizer()
 
+@test("Batch hash kernels match per-value hashlib/hmac")
+def test_hash_kernels():
+    import hmac
+    import hashlib
+    from shared.masking.hashing import sha256_digests, hmac_sha256_digests, digests_to_uint32, digests_to_hex
+
+    values = ['MRN001', 42, 1.5, 'محمد', '']
+
+    expected_sha = [hashlib.sha256(f"salt:{v}".encode('utf-8')).digest() for v in values]
+    expected_hmac = [hmac.new(b'key', f"col:{v}".encode('utf-8'), hashlib.sha256).digest() for v in values]
+
+    assert sha256_digests("salt:", values) == expected_sha
+    assert hmac_sha256_digests(b'key', "col:", values) == expected_hmac
+    assert digests_to_uint32(expected_sha).tolist() == [int(d.hex()[:8], 16) for d in expected_sha]
+    assert digests_to_hex(expected_hmac, 12).tolist() == [d.hex()[:12].upper() for d in expected_hmac]
+    assert len(digests_to_uint32([])) == 0
+
+@test("Pseudonymizer keeps values with different str() forms distinct")
+def test_pseudonymizer_str_forms():
+    import hmac
+    import hashlib
+    from shared.masking.pseudonymizer import Pseudonymizer
+
+    df = pd.DataFrame({
+        'c': [1, 1.0, True, '1', None, ''],
+        'f': [0.0, -0.0, 1.5, np.nan, 0.0, -0.0],
+        'empty': [np.nan] * 6,
+    })
+    pseudonymizer = Pseudonymizer(['c', 'f', 'empty'], salt='s', hash_length=12)
+    result = pseudonymizer.apply(df)
+
+    def expected(col, value):
+        return hmac.new(b's', f"{col}:{value}".encode('utf-8'), hashlib.sha256).hexdigest()[:12].upper()
+
+    assert result['c'].tolist()[:4] == [expected('c', v) for v in [1, 1.0, True, '1']]
+    assert result['c'].iloc[4] is None and result['c'].iloc[5] == ''
+    assert result['f'].iloc[0] != result['f'].iloc[1]
+    assert result['f'].iloc[1] == expected('f', -0.0)
+    assert pd.isna(result['f'].iloc[3])
+    assert result['empty'].dtype == np.float64
+
+    mapping = pseudonymizer.get_mapping()
+    for key in ['c:1', 'c:1.0', 'c:True', 'f:0.0', 'f:-0.0']:
+        assert key in mapping, f"Missing mapping key: {key}"
+
+@test("DateShifter offsets match the per-row formula")
+def test_date_shifter_offsets():
+    import hashlib
+    from shared.masking.date_shifter import DateShifter
+
+    df = pd.DataFrame(
+        {'d': ['2024-01-03', None, '2024-12-30', 'garbage']},
+        index=pd.Index(['a', 7, -0.0, None], dtype=object)
+    )
+    shifter = DateShifter(['d'], salt='s', min_days=-30, max_days=30)
+    result = shifter.apply(df)
+
+    for idx, original, shifted in zip(df.index, pd.to_datetime(df['d'], errors='coerce'), result['d']):
+        hash_int = int(hashlib.sha256(f"s:{idx}".encode('utf-8')).hexdigest()[:8], 16)
+        offset = -30 + hash_int % 61
+        if pd.isna(original):
+            assert pd.isna(shifted)
+        else:
+            assert shifted == original + pd.Timedelta(days=offset), f"Wrong offset for {idx}"
+
+    kept = DateShifter(['d'], salt='s', min_days=-30, max_days=30, preserve_year=True).apply(df)
+    assert (kept['d'].dropna().dt.year == 2024).all()
+
+test_hash_kernels()
+test_pseudonymizer_str_forms()
+test_date_shifter_offsets()
+
+
+# =============================================================
+# Name Matcher Tests
+# =============================================================
+
+print_section("Text Scrubber Name Matchers")
+
+@test("Name matchers respect Latin and Arabic word boundaries")
+def test_name_matcher_boundaries():
+    from shared.masking.name_matcher import RegexNameMatcher, AhoCorasickNameMatcher
+
+    names = ['Ahmed', 'محمد', 'الشمري']
+    text = "Ahmed met Ahmedi and محمد الشمري, not محمدي"
+    expected = "# met Ahmedi and # #, not محمدي"
+
+    for matcher in (RegexNameMatcher(names), AhoCorasickNameMatcher(names)):
+        assert matcher.sub('#', text) == expected, f"{type(matcher).__name__}: {matcher.sub('#', text)}"
+
+@test("Aho-Corasick matcher is case-insensitive like the regex backend")
+def test_name_matcher_case():
+    from shared.masking.name_matcher import RegexNameMatcher, AhoCorasickNameMatcher
+
+    names = ['Ibrahim', 'fatima']
+    text = "İbrahim ibrahim IBRAHIM FATIMA Fatima"
+
+    ac = AhoCorasickNameMatcher(names).sub('#', text)
+    assert ac == "# # # # #", f"Got: {ac}"
+    assert ac == RegexNameMatcher(names).sub('#', text)
+
+@test("Aho-Corasick matcher resolves overlaps leftmost-longest")
+def test_name_matcher_overlap():
+    from shared.masking.name_matcher import AhoCorasickNameMatcher
+
+    matcher = AhoCorasickNameMatcher(['Ahmed', 'Ahmed Al-Saud', 'Al-Saud'])
+    assert matcher.find("Dr Ahmed Al-Saud") == [(3, 16)]
+    assert matcher.sub('#', "Ahmed and Al-Saud") == "# and #"
+
+    # The regex backend orders its alternation longest-first, independent of set order
+    from shared.masking.name_matcher import RegexNameMatcher
+    for names in (['Ahmed', 'Ahmed Al-Saud', 'Al-Saud'], ['Al-Saud', 'Ahmed Al-Saud', 'Ahmed']):
+        assert RegexNameMatcher(names).sub('#', "Dr Ahmed Al-Saud") == "Dr #"
+
+@test("build_name_matcher picks backend by threshold and rejects unknown backends")
+def test_build_name_matcher():
+    from shared.masking.name_matcher import (
+        build_name_matcher, RegexNameMatcher, AhoCorasickNameMatcher, AUTO_AHO_CORASICK_THRESHOLD
+    )
+
+    small = [f"name{i}" for i in range(AUTO_AHO_CORASICK_THRESHOLD)]
+    large = [f"name{i}" for i in range(AUTO_AHO_CORASICK_THRESHOLD + 1)]
+
+    assert isinstance(build_name_matcher(small), RegexNameMatcher)
+    assert isinstance(build_name_matcher(large), AhoCorasickNameMatcher)
+    assert isinstance(build_name_matcher(small, "aho_corasick"), AhoCorasickNameMatcher)
+    assert build_name_matcher([]) is None
+
+    try:
+        build_name_matcher(small, "trie")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Unknown backend did not raise ValueError")
+
+@test("TextScrubber redacts names with the Aho-Corasick backend")
+def test_text_scrubber_aho_corasick():
+    from shared.masking.text_scrubber import TextScrubber
+
+    df = load_test_data()
+    names = TextScrubber.extract_names_from_column(df, 'name')
+    notes = pd.DataFrame({'notes': [f"Seen {n}, call +966501234567" for n in df['name']]})
+
+    regex = TextScrubber(['notes'], names_to_scrub=names, name_matcher='regex').apply(notes)
+    ac = TextScrubber(['notes'], names_to_scrub=names, name_matcher='aho_corasick').apply(notes)
+
+    # Both backends redact full names as one span (leftmost-longest)
+    for value in ac['notes']:
+        assert value == "Seen [REDACTED], call [REDACTED]", f"Not scrubbed: {value}"
+    assert regex['notes'].equals(ac['notes']), "Regex and Aho-Corasick backends disagree"
+
+test_name_matcher_boundaries()
+test_name_matcher_case()
+test_name_matcher_overlap()
+test_build_name_matcher()
+test_text_scrubber_aho_corasick()
+
+@test("TextScrubber process pool matches in-process scrubbing")
+def test_text_scrubber_parallel():
+    from shared.masking.text_scrubber import TextScrubber
+
+    df = load_test_data()
+    names = TextScrubber.extract_names_from_column(df, 'name')
+    notes = pd.DataFrame({
+        'notes': [f"{n} reachable at {p} / {e}" for n, p, e in zip(df['name'], df['phone'], df['email'])] + [None, 42],
+        'other': ['Ahmed'] * (len(df) + 2),
+    })
+
+    serial = TextScrubber(['notes'], names_to_scrub=names).apply(notes)
+
+    # Pool workers start from a fork server and re-import __main__, which would
+    # re-run this file; so run the pool in a child interpreter, from a worker
+    # thread as the progress-streaming endpoints do
+    import pickle
+    import subprocess
+    import tempfile
+    script = (
+        "import pickle, sys, threading\n"
+        "from shared.masking.text_scrubber import TextScrubber\n"
+        "names, notes = pickle.load(open(sys.argv[1], 'rb'))\n"
+        "out = {}\n"
+        "def run():\n"
+        "    out['df'] = TextScrubber(['notes'], names_to_scrub=names, workers=2,\n"
+        "                             parallel_min_rows=1, chunk_size=3).apply(notes)\n"
+        "t = threading.Thread(target=run); t.start(); t.join()\n"
+        "pickle.dump(out['df'], open(sys.argv[1], 'wb'))\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'frames.pkl')
+        with open(path, 'wb') as f:
+            pickle.dump((names, notes), f)
+        subprocess.run([sys.executable, '-c', script, path], cwd=BASE_DIR, check=True, timeout=120)
+        with open(path, 'rb') as f:
+            parallel = pickle.load(f)
+
+    assert serial['notes'].tolist() == parallel['notes'].tolist()
+    assert (parallel.index == notes.index).all()
+    assert (parallel['other'] == 'Ahmed').all()
+
+test_text_scrubber_parallel()
+
 
 # =============================================================
 # Full Masking Pipeline Test
@@ -202,10 +489,10 @@ print_section("Full Masking Pipeline")
 
 @test("Complete masking pipeline transforms data correctly")
 def test_full_masking_pipeline():
-    from engine.suppressor import Suppressor
-    from engine.date_shifter import DateShifter
-    from engine.generalizer import Generalizer
-    from engine.pseudonymizer import Pseudonymizer
+    from shared.masking.suppressor import Suppressor
+    from shared.masking.date_shifter import DateShifter
+    from shared.masking.generalizer import Generalizer
+    from shared.masking.pseudonymizer import Pseudonymizer
 
     df = load_test_data()
     print(f"\n    Original data: {len(df)} rows, {len(df.columns)} columns")
@@ -245,6 +532,190 @@ def test_full_masking_pipeline():
 
 masked_df = test_full_masking_pipeline()
 
+@test("Chunked masking matches whole-frame masking")
+def test_chunked_masking():
+    from shared.masking.suppressor import Suppressor
+    from shared.masking.date_shifter import DateShifter
+    from shared.masking.generalizer import Generalizer
+    from shared.masking.pseudonymizer import Pseudonymizer
+
+    csv_path = os.path.join(BASE_DIR, 'test_data', 'sample_healthcare.csv')
+
+    def mask(df, column_types=None):
+        df = Suppressor(['national_id', 'name', 'phone', 'email']).apply(df)
+        df = DateShifter(['admission_date'], salt='chunk_salt').apply(df)
+        generalizer = Generalizer(quasi_identifiers=['age', 'city', 'gender', 'admission_date'])
+        if column_types is not None:
+            if not column_types:
+                column_types.update(generalizer.get_column_types(df))
+            generalizer.column_types = column_types
+        df = generalizer.apply(df)
+        return Pseudonymizer(['patient_id'], salt='chunk_salt').apply(df)
+
+    whole = mask(pd.read_csv(csv_path)).to_csv(index=False)
+
+    column_types = {}
+    parts = [
+        mask(chunk, column_types).to_csv(index=False, header=(i == 0))
+        for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=7))
+    ]
+    assert ''.join(parts) == whole, "Chunked output differs from whole-frame output"
+
+test_chunked_masking()
+
+@test("Engines honour the inplace ownership contract")
+def test_engine_inplace():
+    from shared.masking.suppressor import Suppressor
+    from shared.masking.date_shifter import DateShifter
+    from shared.masking.generalizer import Generalizer
+    from shared.masking.pseudonymizer import Pseudonymizer
+    from shared.masking.text_scrubber import TextScrubber
+
+    df = load_test_data()
+    df['notes'] = 'Call ' + df['phone'].astype(str)
+    engines = [
+        TextScrubber(['notes']),
+        Suppressor(['national_id', 'name', 'phone', 'email']),
+        DateShifter(['admission_date'], salt='inplace_salt'),
+        Generalizer(quasi_identifiers=['age', 'city', 'gender']),
+        Pseudonymizer(['patient_id'], salt='inplace_salt'),
+    ]
+
+    for engine in engines:
+        original = df.copy()
+        copied = engine.apply(df)
+        assert copied is not df, f"{type(engine).__name__} returned its input"
+        assert df.equals(original), f"{type(engine).__name__} modified its input"
+
+        owned = engine.apply(df, inplace=True)
+        assert owned is df, f"{type(engine).__name__} copied with inplace=True"
+        assert owned.equals(copied), f"{type(engine).__name__} inplace output differs"
+
+test_engine_inplace()
+
+@test("Masking plan compiles, round-trips and matches the engine chain")
+def test_masking_plan():
+    from shared.models import Classification, MaskingPlan
+    from shared.masking.plan import compile_plan, MaskingPlanExecutor, PLAN_STAGES
+    from shared.masking.suppressor import Suppressor
+    from shared.masking.date_shifter import DateShifter
+    from shared.masking.generalizer import Generalizer
+    from shared.masking.pseudonymizer import Pseudonymizer
+
+    classification = Classification(
+        sensitive_attributes=['diagnosis'],
+        recommended_techniques={
+            'national_id': 'SUPPRESS', 'name': 'SUPPRESS', 'phone': 'SUPPRESS', 'email': 'SUPPRESS',
+            'admission_date': 'DATE_SHIFT', 'age': 'GENERALIZE', 'city': 'GENERALIZE',
+            'patient_id': 'PSEUDONYMIZE', 'treatment': 'KEEP'
+        },
+        reasoning={'age': 'quasi-identifier'}
+    )
+    plan = compile_plan(classification)
+
+    stages = [op.technique for op in plan.operations if op.technique != 'KEEP']
+    assert stages == sorted(stages, key=PLAN_STAGES.index), "Operations not in stage order"
+    assert plan.columns('GENERALIZE') == ['age', 'city']
+    assert plan.columns('KEEP') == ['diagnosis']
+    assert MaskingPlan.model_validate_json(plan.model_dump_json()) == plan, "Plan does not round-trip"
+
+    # Reasoning does not change the plan key
+    reworded = classification.model_copy(update={'reasoning': {'age': 'changed'}})
+    assert reworded.fingerprint() == plan.classification_hash
+
+    executor = MaskingPlanExecutor(plan, salt='plan_salt', max_workers=4)
+    df, techniques = executor.execute(load_test_data())
+
+    expected = Suppressor(['national_id', 'name', 'phone', 'email']).apply(load_test_data())
+    expected = DateShifter(['admission_date'], salt='plan_salt').apply(expected)
+    expected = Generalizer(quasi_identifiers=['age', 'city']).apply(expected)
+    expected = Pseudonymizer(['patient_id'], salt='plan_salt').apply(expected)
+
+    assert df.equals(expected), "Plan executor output differs from the engine chain"
+    assert techniques['age'] == 'GENERALIZED' and techniques['name'] == 'SUPPRESSED'
+    assert techniques['diagnosis'] == 'TEXT_SCRUBBED'
+    assert set(executor.stage_timings) == set(PLAN_STAGES)
+
+test_masking_plan()
+
+@test("Plan executor scrubs text columns that start all-missing across chunks")
+def test_masking_plan_text_chunks():
+    import tempfile
+    from shared.models import Classification
+    from shared.tabular import iter_table_chunks
+    from shared.masking.plan import compile_plan, MaskingPlanExecutor
+
+    notes = [None] * 7 + ['Call 0512345678 Ahmed', 'stable', None, 'email a@b.com', 'ok']
+    df = pd.DataFrame({'patient_id': range(len(notes)), 'notes': notes, 'score': [1.5] * len(notes)})
+    plan = compile_plan(Classification(sensitive_attributes=['notes', 'score']))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.csv')
+        df.to_csv(path, index=False)
+
+        executor = MaskingPlanExecutor(plan, salt='chunk_salt')
+        masked, techniques = [], {}
+        # Chunks smaller than the leading missing run: the first parses as float64
+        for chunk in iter_table_chunks(path, 5):
+            out, applied = executor.execute(chunk)
+            masked.extend(out['notes'].tolist())
+            techniques.update(applied)
+
+    assert '0512345678' not in str(masked) and 'a@b.com' not in str(masked), masked
+    assert masked[8] == 'stable'
+    assert techniques['notes'] == 'TEXT_SCRUBBED' and techniques['score'] == 'KEPT'
+
+test_masking_plan_text_chunks()
+
+@test("Table files round-trip as CSV, Parquet and Arrow with column projection")
+def test_tabular_formats():
+    import tempfile
+    from shared.tabular import TableWriter, iter_table_chunks, read_table, write_table
+    from shared.masking.generalizer import Generalizer
+
+    df = Generalizer(quasi_identifiers=['age', 'city']).apply(load_test_data())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ('.csv', '.parquet', '.arrow'):
+            path = os.path.join(tmp, f'masked{ext}')
+            writer = TableWriter(path)
+            for start in range(0, len(df), 7):
+                writer.write(df.iloc[start:start + 7])
+            writer.close()
+
+            back = read_table(path)
+            assert back.astype(str).equals(df.astype(str)), f"{ext} chunked write does not round-trip"
+
+            projected = read_table(path, columns=['age', 'diagnosis', 'not_a_column'])
+            assert list(projected.columns) == ['age', 'diagnosis'], f"{ext} projection: {list(projected.columns)}"
+
+            chunks = list(iter_table_chunks(path, 6, columns=['age']))
+            index = [i for chunk in chunks for i in chunk.index]
+            assert index == list(range(len(df))), f"{ext} chunk index does not continue"
+
+        # Parquet keeps the generalized columns categorical
+        path = os.path.join(tmp, 'single.parquet')
+        write_table(df, path)
+        assert isinstance(read_table(path)['age'].dtype, pd.CategoricalDtype)
+
+        # A column all-missing (float64) in the first chunk and text later widens the schema
+        chunks = [
+            pd.DataFrame({'notes': [np.nan, np.nan], 'count': [1, 2]}),
+            pd.DataFrame({'notes': ['[REDACTED] called', None], 'count': [2.5, np.nan]}, index=[2, 3]),
+        ]
+        for ext in ('.parquet', '.arrow'):
+            path = os.path.join(tmp, f'widened{ext}')
+            writer = TableWriter(path)
+            for chunk in chunks:
+                writer.write(chunk)
+            writer.close()
+            back = read_table(path)
+            assert back['notes'].tolist() == [None, None, '[REDACTED] called', None], f"{ext}: {back['notes'].tolist()}"
+            assert back['count'].tolist()[:3] == [1.0, 2.0, 2.5], f"{ext}: {back['count'].tolist()}"
+            assert os.listdir(tmp).count(f'widened{ext}.widen') == 0
+
+test_tabular_formats()
+
 
 # =============================================================
 # Validation Metrics Tests
@@ -319,6 +790,365 @@ k_result = test_k_anonymity()
 l_result = test_l_diversity()
 t_result = test_t_closeness()
 
+@test("Projected categorical loading gives the same metrics as a full read")
+def test_projected_categorical_load():
+    import tempfile
+    from shared.tabular import PYARROW_AVAILABLE, read_table
+    from metrics.k_anonymity import calculate_k_anonymity
+    from metrics.l_diversity import calculate_l_diversity
+    from metrics.t_closeness import calculate_t_closeness
+
+    qis = ['age', 'city', 'gender']
+    sas = ['diagnosis']
+    df = load_test_data()
+    df.loc[[2, 5], 'city'] = np.nan
+
+    def metrics(frame):
+        return (
+            calculate_k_anonymity(frame, qis)['k_value'],
+            calculate_l_diversity(frame, qis, sas)['l_value'],
+            calculate_t_closeness(frame, qis, sas)['t_value'],
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'masked.csv')
+        df.to_csv(path, index=False)
+        expected = metrics(pd.read_csv(path))
+
+        engines = ['c', 'pyarrow'] if PYARROW_AVAILABLE else ['c']
+        for engine in engines:
+            loaded = read_table(path, qis + sas, {col: 'category' for col in qis + sas}, engine=engine)
+            assert sorted(loaded.columns) == sorted(qis + sas)
+            assert all(isinstance(dtype, pd.CategoricalDtype) for dtype in loaded.dtypes)
+            assert metrics(loaded) == expected, f"{engine}: {metrics(loaded)} != {expected}"
+
+test_projected_categorical_load()
+
+@test("Fused metrics and violating classes match per-group results")
+def test_fused_metrics():
+    from metrics import EquivalenceClasses, calculate_privacy_metrics
+    from metrics.t_closeness import earth_movers_distance, get_high_distance_classes
+
+    rng = np.random.default_rng(7)
+    n = 500
+    df = pd.DataFrame({
+        'age': rng.choice(['20-29', '30-39', '40-49', None], n),
+        'zip': rng.integers(0, 4, n).astype(float),
+        'gender': pd.Categorical(rng.choice(['M', 'F'], n), categories=['M', 'F', 'X']),
+        'diagnosis': rng.choice(['A', 'B', 'C', None], n, p=[0.4, 0.3, 0.2, 0.1]),
+    })
+    df.loc[rng.random(n) < 0.05, 'zip'] = np.nan
+    qis = ['age', 'zip', 'gender']
+    sas = ['diagnosis']
+
+    grouped = df.groupby(qis, dropna=False, observed=True)
+    sizes = grouped.size()
+    diversity = grouped['diagnosis'].nunique()
+    global_dist = df['diagnosis'].value_counts(normalize=True)
+    emds = []
+    for _, group in grouped:
+        local_dist = group['diagnosis'].value_counts(normalize=True)
+        p = np.array([global_dist.get(v, 0) for v in global_dist.index])
+        q = np.array([local_dist.get(v, 0) for v in global_dist.index])
+        emds.append(earth_movers_distance(p, q))
+
+    classes = EquivalenceClasses(df, qis)
+    assert classes.n_classes == len(sizes)
+    assert sorted(classes.sizes.tolist()) == sorted(sizes.tolist())
+
+    results = calculate_privacy_metrics(df, qis, sas)
+    k, l, t = results['k_anonymity'], results['l_diversity'], results['t_closeness']
+    assert k['k_value'] == sizes.min()
+    assert k['class_distribution'] == sizes.value_counts().to_dict()
+    assert l['l_value'] == diversity.min()
+    assert l['diversity_distribution'] == diversity.value_counts().to_dict()
+    assert t['t_value'] == round(max(emds), 4)
+    assert t['mean_distance'] == round(np.mean(emds), 4)
+
+    # Violating classes come from the same contingency matrix
+    violations = get_high_distance_classes(df, qis, sas, 0.3, classes)
+    expected = sorted((round(e, 4), int(size)) for e, size in zip(emds, sizes) if e > 0.3)
+    assert sorted((v['emd'], v['record_count']) for v in violations) == expected
+    assert all(set(v['quasi_identifier_values']) == set(qis) for v in violations)
+
+    # No quasi-identifiers: the whole dataset is one class
+    assert calculate_privacy_metrics(df, [], sas)['k_anonymity']['k_value'] == n
+
+test_fused_metrics()
+
+@test("Ordinal t-closeness matches cumulative-distribution EMD")
+def test_ordinal_t_closeness():
+    from metrics import EquivalenceClasses, calculate_t_closeness
+    from metrics.t_closeness import attribute_distances, ordered_earth_movers_distance
+
+    rng = np.random.default_rng(11)
+    n = 400
+    df = pd.DataFrame({
+        'age': rng.choice(['20-29', '30-39', '40-49'], n),
+        'city': rng.choice(['Riyadh', 'Jeddah', None], n),
+        'balance': rng.gamma(2.0, 500.0, n).round(2),
+    })
+    df.loc[rng.random(n) < 0.05, 'balance'] = np.nan
+    qis = ['age', 'city']
+    classes = EquivalenceClasses(df, qis)
+
+    # Dense reference over the sorted distinct values
+    values = np.sort(df['balance'].dropna().unique())
+    p = df['balance'].value_counts(normalize=True).reindex(values).to_numpy()
+    expected = []
+    for class_id in range(classes.n_classes):
+        local = df['balance'][classes.class_ids == class_id]
+        q = local.value_counts(normalize=True).reindex(values, fill_value=0).to_numpy()
+        expected.append(ordered_earth_movers_distance(p, q))
+    distances = attribute_distances(classes, 'balance', 'ordinal')
+    assert np.allclose(distances, expected)
+
+    # Ordered distance is far smaller than categorical on distinct floats
+    categorical = attribute_distances(classes, 'balance', 'categorical')
+    assert distances.max() < categorical.max()
+
+    # Values read back as string categories give the same result
+    as_categories = df.astype({'balance': str}).replace({'balance': {'nan': None}}).astype({'balance': 'category'})
+    assert np.allclose(attribute_distances(EquivalenceClasses(as_categories, qis), 'balance', 'ordinal'), distances)
+
+    # Quantile bins bound the histogram width
+    binned = classes.ordered_histogram('balance', bins=10)
+    assert binned.n_values <= 10
+
+    result = calculate_t_closeness(df, qis, ['balance'], distance={'balance': 'ordinal'}, bins=10)
+    assert 0 <= result['t_value'] <= 1
+
+test_ordinal_t_closeness()
+
+@test("Violating classes are ranked and masked from class codes")
+def test_class_violations():
+    from metrics import EquivalenceClasses, ClassViolations
+    from metrics.k_anonymity import get_violating_records
+    from metrics.l_diversity import get_low_diversity_classes
+    from metrics.t_closeness import get_high_distance_classes
+
+    df = load_test_data()
+    df.loc[[1, 4], 'city'] = np.nan
+    qis = ['gender', 'city']
+    sas = ['diagnosis']
+    classes = EquivalenceClasses(df, qis)
+    violations = ClassViolations(classes, sas, k_threshold=3, l_threshold=2, t_threshold=0.3)
+
+    # Same classes as the per-metric finders
+    small = classes.sizes < 3
+    assert len(get_low_diversity_classes(df, qis, sas, 2, classes)) == violations.l_failed.sum()
+    assert len(get_high_distance_classes(df, qis, sas, 0.3, classes)) == violations.t_failed.sum()
+    assert (violations.k_failed == small).all()
+    assert len(get_violating_records(df, qis, 3, classes)) == classes.sizes[small].sum()
+
+    # Record mask and counts agree, including classes with a missing QI value
+    mask = violations.record_mask()
+    assert mask.sum() == violations.record_count
+    sizes = df.groupby(qis, dropna=False, observed=True)[qis[0]].transform('size')
+    assert (mask[sizes.to_numpy() < 3]).all()
+
+    # Pages are ordered by severity and cover every failing class once
+    pages = [violations.worst(2, offset) for offset in range(0, violations.class_count, 2)]
+    ranked = np.concatenate(pages) if pages else np.array([], dtype=int)
+    assert sorted(ranked.tolist()) == np.flatnonzero(violations.failed).tolist()
+    assert (np.diff(violations.severity[ranked]) <= 0).all()
+
+    described = violations.describe(ranked[:3])
+    for item in described:
+        assert item['failed_metrics'] and 0 < item['severity'] <= 1
+        assert set(item['quasi_identifier_values']) == set(qis)
+
+test_class_violations()
+
+@test("Approximate validation streams chunks with exact k and bounded l/t")
+def test_approximate_metrics():
+    from metrics import calculate_privacy_metrics
+    from metrics.approximate import estimate_privacy_metrics
+
+    rng = np.random.default_rng(5)
+    n = 20000
+    df = pd.DataFrame({
+        'age': rng.integers(18, 60, n).astype(str),
+        'city': rng.choice(['Riyadh', 'Jeddah', 'Dammam', None], n),
+        'diagnosis': rng.choice(['A', 'B', 'C', 'D'], n),
+    })
+    qis = ['age', 'city']
+    sas = ['diagnosis']
+    exact = calculate_privacy_metrics(df, qis, sas)
+
+    def chunks():
+        # Categories differ per chunk, as when a CSV is read in pieces
+        for start in range(0, n, 3000):
+            yield df.iloc[start:start + 3000].astype('category')
+
+    # Every class sampled: identical to the exact computation
+    full = estimate_privacy_metrics(chunks(), qis, sas, sample_classes=10 ** 6)
+    assert full['approximation']['tail_fraction'] == 0.0
+    for name in ('k_anonymity', 'l_diversity', 't_closeness'):
+        expected = {key: value for key, value in exact[name].items() if key != 'mean_distance'}
+        got = {key: value for key, value in full[name].items() if key in expected}
+        assert got == expected, f"{name}: {got} != {expected}"
+
+    # Sampled classes: k stays exact, l and t bracket the exact values
+    sampled = estimate_privacy_metrics(chunks(), qis, sas, sample_classes=30)
+    approx = sampled['approximation']
+    assert approx['sampled_classes'] == 30 and approx['total_classes'] == exact['k_anonymity']['equivalence_classes']
+    assert approx['total_rows'] == n and 0 < approx['tail_fraction'] < 1
+    assert sampled['k_anonymity']['k_value'] == exact['k_anonymity']['k_value']
+    low, high = sampled['l_diversity']['interval']
+    assert low <= exact['l_diversity']['l_value'] <= high
+    assert sampled['t_closeness']['interval'][1] == 1.0
+
+    # Classes hash by value: an int64 chunk and a float64 chunk with NaN share classes
+    mixed = [
+        pd.DataFrame({'age': [30, 40], 'diagnosis': ['A', 'B']}),
+        pd.DataFrame({'age': [40.0, 30.0, np.nan, np.nan], 'diagnosis': ['A', 'B', 'C', 'D']}),
+    ]
+    result = estimate_privacy_metrics(iter(mixed), ['age'], sas)
+    assert result['k_anonymity']['k_value'] == 2, result['k_anonymity']
+    assert result['approximation']['total_classes'] == 3
+
+test_approximate_metrics()
+
+
+@test("Class aggregates roll up to the metrics of coarser generalization levels")
+def test_class_aggregates_rollup():
+    import tempfile
+    from shared.masking.generalizer import Generalizer
+    from metrics import ClassAggregates, EquivalenceClasses, calculate_privacy_metrics
+    from shared.hierarchies import coarsen_columns, coarsen_labels
+
+    rng = np.random.default_rng(11)
+    n = 5000
+    df = pd.DataFrame({
+        'age': rng.integers(0, 95, n).astype(float),
+        'city': rng.choice(['Dammam', 'Riyadh', 'Jeddah', 'Abha', 'Unknown', None], n),
+        'zipcode': rng.choice(['12345', '1234', '98765'], n),
+        'admission_date': (pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, n), 'D')).strftime('%Y-%m-%d'),
+        'diagnosis': rng.choice(['A', 'B', 'C', None], n),
+        'income': rng.normal(5000, 1000, n).round(-1),
+    })
+    qis = ['age', 'city', 'zipcode', 'admission_date']
+    sas = ['diagnosis', 'income']
+    distance = {'income': 'ordinal'}
+    column_types = {'age': 'age', 'city': 'location', 'zipcode': 'zipcode', 'admission_date': 'date'}
+
+    def mask(levels):
+        return Generalizer(qis, levels['age_level'], levels['location_level'], levels['date_level'], dict(column_types)).apply(df)
+
+    fine = {'age_level': 0, 'location_level': 1, 'date_level': 0}
+    aggregates = ClassAggregates.from_classes(EquivalenceClasses(mask(fine), qis), sas, ['income'])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'job.npz')
+        aggregates.save(path, generalization_config=fine, column_types=column_types)
+        aggregates, metadata = ClassAggregates.load(path)
+
+    for coarse in ({'age_level': 1, 'location_level': 1, 'date_level': 2},
+                   {'age_level': 2, 'location_level': 2, 'date_level': 1},
+                   {'age_level': 3, 'location_level': 3, 'date_level': 3}):
+        labels = coarsen_columns(
+            {col: aggregates.df[col].to_numpy() for col in qis},
+            metadata['column_types'], metadata['generalization_config'], coarse
+        )
+        rolled = aggregates.rollup(labels)
+        for bins in (None, 4):
+            got = calculate_privacy_metrics(rolled.df, qis, sas, distance, bins, classes=rolled)
+            expected = calculate_privacy_metrics(mask(coarse), qis, sas, distance, bins)
+            assert got == expected, f"{coarse}, bins={bins}: {got} != {expected}"
+
+    # Coarser labels must each lie within one finer label's bucket
+    assert list(coarsen_labels('age', np.array(['60-64', None], dtype=object), 1, 3)) == ['Adult', None]
+    assert coarsen_labels('age', np.array(['15-19']), 1, 3) is None
+    assert coarsen_labels('date', np.array(['2024-W05']), 1, 2) is None
+    assert coarsen_labels('zipcode', np.array(['1*']), 1, 2) is None
+    assert coarsen_labels('location', np.array(['Eastern']), 2, 1) is None
+
+test_class_aggregates_rollup()
+
+
+@test("Lattice search finds the minimal passing generalization levels")
+def test_generalization_lattice():
+    from shared.masking.generalizer import Generalizer
+    from metrics import GeneralizationLattice, calculate_privacy_metrics
+
+    rng = np.random.default_rng(13)
+    n = 4000
+    df = pd.DataFrame({
+        'age': rng.integers(0, 95, n).astype(float),
+        'city': rng.choice(['Dammam', 'Riyadh', 'Jeddah', 'Abha', 'Tabuk'], n),
+        'zipcode': rng.integers(11000, 11600, n).astype(str),
+        'admission_date': (pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, n), 'D')).strftime('%Y-%m-%d'),
+        'diagnosis': rng.choice(['A', 'B', 'C', 'D'], n, p=[0.4, 0.3, 0.2, 0.1]),
+    })
+    qis = ['age', 'city', 'zipcode', 'admission_date']
+    column_types = {'age': 'age', 'city': 'location', 'zipcode': 'zipcode', 'admission_date': 'date'}
+
+    def passes(results):
+        return results['k_anonymity']['k_value'] >= 5 and results['t_closeness']['t_value'] <= 0.6
+
+    lattice = GeneralizationLattice(df, qis, ['diagnosis'], column_types)
+    frontier = lattice.search(passes)
+    assert frontier and len(lattice.evaluated) < len(lattice.nodes)
+
+    # Brute force: mask at every node and validate the records
+    passing = {}
+    for node in lattice.nodes:
+        config = lattice.config(node)
+        masked = Generalizer(qis, config['age_level'], config['location_level'], config['date_level'], dict(column_types)).apply(df)
+        results = calculate_privacy_metrics(masked, qis, ['diagnosis'])
+        if node in lattice.evaluated:
+            assert lattice.evaluated[node] == results, f"{config}: rolled-up metrics differ"
+        passing[node] = passes(results)
+
+    minimal = [
+        node for node in lattice.nodes
+        if passing[node] and not any(passing[other] for other in lattice.nodes if other != node and all(a <= b for a, b in zip(other, node)))
+    ]
+    assert frontier == minimal, f"{frontier} != {minimal}"
+
+test_generalization_lattice()
+
+
+@test("Mondrian partitioning keeps k and l per class with range labels")
+def test_mondrian():
+    from shared.masking.mondrian import Mondrian
+    from metrics import calculate_privacy_metrics
+
+    rng = np.random.default_rng(20)
+    n = 3000
+    df = pd.DataFrame({
+        'age': rng.integers(18, 90, n).astype(float),
+        'city': rng.choice(['Dammam', 'Riyadh', 'Jeddah', 'Mecca', 'Abha'], n),
+        'zipcode': rng.integers(11000, 11600, n).astype(str),
+        'admission_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, n), 'D'),
+        'diagnosis': rng.choice(['A', 'B', 'C', 'D'], n),
+    })
+    df.loc[::101, 'age'] = np.nan
+    qis = ['age', 'city', 'zipcode', 'admission_date']
+
+    for k, l in [(5, 1), (10, 3)]:
+        mondrian = Mondrian(qis, k=k, l=l, sensitive_attributes=['diagnosis'])
+        masked = mondrian.apply(df)
+        results = calculate_privacy_metrics(masked, qis, ['diagnosis'])
+        assert results['k_anonymity']['k_value'] >= k
+        assert results['l_diversity']['l_value'] >= l
+        assert results['k_anonymity']['equivalence_classes'] == len(np.unique(mondrian.partition(df)))
+
+    # Ranges cover the original values; a class of one city keeps the city
+    rows = masked['age'].notna() & (masked['age'] != '*')
+    bounds = masked.loc[rows, 'age'].astype(str).str.split('-', expand=True).reindex(columns=[0, 1])
+    bounds[1] = bounds[1].fillna(bounds[0])
+    assert ((bounds[0].astype(float) <= df.loc[rows, 'age']) & (df.loc[rows, 'age'] <= bounds[1].astype(float))).all()
+    assert masked['admission_date'].astype(str).str.match(r'^\d{4}-\d{2}-\d{2}(/\d{4}-\d{2}-\d{2})?$').all()
+    same_city = masked['city'].astype(str).isin(df['city'].unique())
+    assert (masked.loc[same_city, 'city'].astype(str) == df.loc[same_city, 'city']).all()
+    assert masked.index.equals(df.index) and df['age'].dtype == float
+
+    # Fewer than 2k rows cannot be split: one class
+    assert len(np.unique(Mondrian(qis, k=2000).partition(df))) == 1
+
+test_mondrian()
+
 
 # =============================================================
 # PDF Report Generation Test
@@ -382,10 +1212,10 @@ print_header("INTEGRATION TEST - Full Pipeline")
 
 @test("End-to-end pipeline works correctly")
 def test_end_to_end():
-    from engine.suppressor import Suppressor
-    from engine.date_shifter import DateShifter
-    from engine.generalizer import Generalizer
-    from engine.pseudonymizer import Pseudonymizer
+    from shared.masking.suppressor import Suppressor
+    from shared.masking.date_shifter import DateShifter
+    from shared.masking.generalizer import Generalizer
+    from shared.masking.pseudonymizer import Pseudonymizer
     from metrics.k_anonymity import calculate_k_anonymity
     from metrics.l_diversity import calculate_l_diversity
     from metrics.t_closeness import calculate_t_closeness
@@ -477,6 +1307,232 @@ def test_end_to_end():
 test_end_to_end()
 
 
+# =============================================================
+# Chat Pipeline Tests
+# =============================================================
+
+print_header("CHAT PIPELINE TESTS")
+
+sys.path.insert(0, os.path.join(BASE_DIR, 'chat-service'))
+
+@test("Pipeline queue honours priorities and per-tenant caps")
+def test_pipeline_queue():
+    import asyncio
+    from pipeline.queue import PipelineQueue, InMemoryJobStore
+    from shared.models import Session, SessionStatus, ValidationResult
+
+    class Sessions:
+        def __init__(self):
+            self.saved = {}
+
+        def get_session(self, session_id):
+            data = self.saved.get(session_id)
+            return Session.model_validate_json(data) if data else None
+
+        def update_session(self, session):
+            self.saved[session.id] = session.model_dump_json()
+
+    class Executor:
+        def __init__(self):
+            self.started = []
+            self.running = {}
+            self.peak = {}
+
+        async def execute(self, session, on_progress=None):
+            tenant = session.tenant_id
+            self.started.append(session.id)
+            await on_progress({"stage": "GENERALIZE", "message": "Generalizing quasi-identifiers..."})
+            self.running[tenant] = self.running.get(tenant, 0) + 1
+            self.peak[tenant] = max(self.peak.get(tenant, 0), self.running[tenant])
+            await asyncio.sleep(0.01)
+            self.running[tenant] -= 1
+            if session.id == "a2":
+                return {"error": "masking service unavailable"}
+            return {"validation_result": ValidationResult(passed=True, metrics={}, failed_metrics=[])}
+
+    async def run():
+        sessions, executor, events = Sessions(), Executor(), []
+
+        async def notify(session_id, message):
+            events.append((session_id, message["type"]))
+
+        queue = PipelineQueue(
+            executor, sessions, store=InMemoryJobStore(), notify=notify,
+            workers=3, tenant_limit=1, poll_interval=0.01
+        )
+        jobs = {}
+        for session_id, tenant, priority in [("a1", "a", 0), ("a2", "a", 0), ("a3", "a", 0), ("b1", "b", 5)]:
+            session = Session(id=session_id, tenant_id=tenant, status=SessionStatus.MASKING)
+            sessions.update_session(session)
+            jobs[session_id] = queue.submit(session, priority=priority)
+
+        assert queue.position(jobs["b1"].id) == 0
+        assert queue.position(jobs["a3"].id) == 3
+
+        await queue.start()
+        finished = [await queue.wait(job.id, timeout=5) for job in jobs.values()]
+        await queue.stop()
+        return sessions, executor, events, finished
+
+    sessions, executor, events, finished = asyncio.run(run())
+
+    # Higher priority first, tenant a never runs two pipelines at once
+    assert executor.started == ["b1", "a1", "a2", "a3"]
+    assert executor.peak == {"a": 1, "b": 1}
+
+    status = {job.session_id: job.status for job in finished}
+    assert status == {"a1": "completed", "a2": "failed", "a3": "completed", "b1": "completed"}
+    assert sessions.get_session("a1").status == SessionStatus.COMPLETED
+    assert sessions.get_session("a2").status == SessionStatus.FAILED
+    assert "masking service unavailable" in sessions.get_session("a2").messages[-1].content
+
+    # Each run pushes its progress (relayed from the executor) and outcome to the session's connections
+    assert [event for session_id, event in events if session_id == "b1"] == [
+        "pipeline_progress", "pipeline_progress", "message", "session", "done"
+    ]
+    assert finished[0].progress["stage"] == "GENERALIZE"
+
+test_pipeline_queue()
+
+@test("Pipeline queue workers survive job store errors")
+def test_pipeline_queue_store_errors():
+    import asyncio
+    from pipeline.queue import PipelineQueue, InMemoryJobStore
+    from shared.models import Session, SessionStatus, ValidationResult
+
+    class FlakyStore(InMemoryJobStore):
+        """Fails the first claim and the first release, like a dropped Redis connection"""
+        def __init__(self):
+            super().__init__()
+            self.failed = set()
+
+        def _fail_once(self, operation):
+            if operation not in self.failed:
+                self.failed.add(operation)
+                raise ConnectionError(f"{operation}: connection reset")
+
+        def claim(self, tenant_limit):
+            self._fail_once("claim")
+            return super().claim(tenant_limit)
+
+        def release(self, job):
+            self._fail_once("release")
+            super().release(job)
+
+    class Sessions:
+        def __init__(self):
+            self.saved = {}
+
+        def get_session(self, session_id):
+            data = self.saved.get(session_id)
+            return Session.model_validate_json(data) if data else None
+
+        def update_session(self, session):
+            self.saved[session.id] = session.model_dump_json()
+
+    class Executor:
+        async def execute(self, session, on_progress=None):
+            return {"validation_result": ValidationResult(passed=True, metrics={}, failed_metrics=[])}
+
+    async def run():
+        store, sessions = FlakyStore(), Sessions()
+        queue = PipelineQueue(Executor(), sessions, store=store, workers=1, tenant_limit=1, poll_interval=0.01)
+        jobs = []
+        for session_id in ("s1", "s2"):
+            session = Session(id=session_id, status=SessionStatus.MASKING)
+            sessions.update_session(session)
+            jobs.append(queue.submit(session))
+
+        await queue.start()
+        finished = [await queue.wait(job.id, timeout=5) for job in jobs]
+        await queue.stop()
+        return store, finished
+
+    store, finished = asyncio.run(run())
+    assert store.failed == {"claim", "release"}
+    # The one worker kept going, and the retried release freed the tenant slot for s2
+    assert [job.status for job in finished] == ["completed", "completed"]
+
+test_pipeline_queue_store_errors()
+
+@test("Stage checkpoints restore stage results keyed by their inputs")
+def test_stage_checkpoints():
+    import tempfile
+    from pipeline.checkpoints import StageCheckpoints
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoints = StageCheckpoints(os.path.join(tmp, 'checkpoints'), secret=b'service secret')
+        masked, report = os.path.join(tmp, 'masked.parquet'), os.path.join(tmp, 'report.pdf')
+        for path, content in [(masked, b'masked'), (report, b'report')]:
+            with open(path, 'wb') as f:
+                f.write(content)
+
+        # The salt is kept per job, so re-runs produce the same keys
+        salt = checkpoints.salt('job')
+        assert checkpoints.salt('job') == salt
+        masking_key = checkpoints.key('masking', checkpoints.file_hash(masked), 'fingerprint', checkpoints.salt_id(salt))
+        assert masking_key == checkpoints.key(
+            'masking', checkpoints.file_hash(masked), 'fingerprint', checkpoints.salt_id(salt)
+        )
+        assert checkpoints.key('validation', masking_key, {'k': 5}) != checkpoints.key('validation', masking_key, {'k': 10})
+
+        # Moved files live in the store, copied files are restored to their path
+        saved = checkpoints.save(masking_key, {'output_path': masked, 'rows_processed': 1}, move=['output_path'])
+        assert not os.path.exists(masked) and saved['output_path'].startswith(checkpoints.root)
+        assert checkpoints.load(masking_key) == saved
+        checkpoints.save('report-x', {'report_path': report}, copy=['report_path'])
+        os.remove(report)
+        assert checkpoints.load('report-x') == {'report_path': report} and os.path.exists(report)
+
+        # A checkpoint whose files are gone is a miss
+        os.remove(saved['output_path'])
+        assert checkpoints.load(masking_key) is None
+        assert checkpoints.load('validation-missing') is None
+
+        # Neither the salt nor anything it can be checked against without the secret is stored
+        stored = ''.join(open(entry.path).read() for entry in os.scandir(checkpoints.root) if entry.name.endswith('.json'))
+        assert salt not in stored
+        assert StageCheckpoints(checkpoints.root, secret=b'service secret').salt('job') == salt
+        assert StageCheckpoints(checkpoints.root, secret=b'other secret').salt('job') != salt
+
+        checkpoints.forget('job')
+        assert checkpoints.salt('job') != salt
+
+test_stage_checkpoints()
+
+@test("Service progress streams as NDJSON and relays as pipeline_progress")
+def test_progress_stream():
+    import json
+    import asyncio
+    from shared.progress import ndjson_progress
+    from pipeline.executor import _progress_payload
+
+    def work(progress):
+        progress.update("READ", force=True)
+        progress.update("GENERALIZE", rows_processed=250, stage_timings={"GENERALIZE": 1.5})
+        return {"rows_processed": 1000}
+
+    def failing(progress):
+        raise ValueError("bad input")
+
+    async def collect(work):
+        return [json.loads(line) async for line in ndjson_progress(work, "masking", total_rows=1000)]
+
+    events = asyncio.run(collect(work))
+    assert [event["event"] for event in events] == ["progress", "progress", "result"]
+    assert events[1]["stage"] == "GENERALIZE" and events[1]["stage_timings"]["GENERALIZE"] == 1.5
+    assert events[1]["eta_seconds"] is not None
+    assert events[-1]["result"] == {"rows_processed": 1000}
+
+    error = asyncio.run(collect(failing))[-1]
+    assert error == {"event": "error", "status_code": 500, "detail": "bad input"}
+
+    payload = _progress_payload({**events[1], "eta_seconds": 12.4})
+    assert payload["message"] == "Generalizing quasi-identifiers - 250/1,000 rows - about 12s left..."
+
+test_progress_stream()
+
+
 # =============================================================
 # Summary
 # =============================================================
@@ -3,19 +3,38 @@ Validation Service API Routes
 """
 
 import os
+import time
 import pandas as pd
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, List, Any
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Any, Optional
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from shared.models import PrivacyThresholds, MetricResult, RemediationSuggestion
-
-from metrics.k_anonymity import calculate_k_anonymity
-from metrics.l_diversity import calculate_l_diversity
-from metrics.t_closeness import calculate_t_closeness
+from shared.models import (
+    PrivacyThresholds, MetricResult, RemediationSuggestion, LoadStats, SensitiveDistance,
+    ApproximationStats, ClassViolation, ViolationsRequest, ViolationsResponse,
+    GeneralizationConfig, RevalidationRequest, RollupStats,
+    OptimizeRequest, OptimizeResponse, GeneralizationCandidate,
+    MaskingResponse, MaskAndValidateRequest, MaskAndValidateResponse
+)
+from shared.hierarchies import coarsen_columns, detect_column_type
+from shared.progress import NDJSON_MEDIA_TYPE, ProgressTracker, ndjson_progress, wants_progress
+from shared.tabular import (
+    FORMAT_EXTENSIONS, PYARROW_AVAILABLE, TableWriter, check_format, count_rows, detect_format, iter_table_chunks,
+    read_table, write_table
+)
+from shared.masking.plan import compile_plan, MaskingPlanExecutor
+from shared.masking.text_scrubber import TextScrubber
+
+from metrics.classes import EquivalenceClasses
+from metrics.aggregates import ClassAggregates
+from metrics.approximate import estimate_privacy_metrics
+from metrics.fused import calculate_privacy_metrics
+from metrics.lattice import GeneralizationLattice
+from metrics.violations import ClassViolations
 from report.generator import generate_pdf_report
 
 
@@ -24,6 +43,25 @@ router = APIRouter()
 # Storage paths
 STORAGE_PATH = os.getenv("STORAGE_PATH", "/storage")
 REPORTS_PATH = os.path.join(STORAGE_PATH, "reports")
+VIOLATIONS_PATH = os.path.join(STORAGE_PATH, "violations")
+AGGREGATES_PATH = os.path.join(STORAGE_PATH, "aggregates")
+STAGING_PATH = os.path.join(STORAGE_PATH, "staging")
+
+# Rows per chunk when copying violating records out of the input file
+VIOLATION_DUMP_CHUNK_SIZE = int(os.getenv("VIOLATION_DUMP_CHUNK_SIZE", "100000"))
+
+# CSV parser for validation inputs: pyarrow (multi-threaded) when installed
+VALIDATION_CSV_ENGINE = os.getenv("VALIDATION_CSV_ENGINE", "pyarrow" if PYARROW_AVAILABLE else "c")
+
+# Approximate mode: rows per streamed chunk and default number of sampled classes
+VALIDATION_CHUNK_SIZE = int(os.getenv("VALIDATION_CHUNK_SIZE", "500000"))
+VALIDATION_SAMPLE_CLASSES = int(os.getenv("VALIDATION_SAMPLE_CLASSES", "20000"))
+
+# /mask-and-validate runs the masking plan here; same settings as the masking service
+TEXT_SCRUB_WORKERS = int(os.getenv("TEXT_SCRUB_WORKERS", str(min(4, os.cpu_count() or 1))))
+TEXT_SCRUB_MIN_ROWS = int(os.getenv("TEXT_SCRUB_MIN_ROWS", "20000"))
+MASK_COLUMN_WORKERS = int(os.getenv("MASK_COLUMN_WORKERS", str(min(4, os.cpu_count() or 1))))
+MASK_OUTPUT_FORMAT = os.getenv("MASK_OUTPUT_FORMAT", "csv")
 
 
 class ValidationRequest(BaseModel):
@@ -33,6 +71,13 @@ class ValidationRequest(BaseModel):
     quasi_identifiers: List[str]
     sensitive_attributes: List[str]
     thresholds: PrivacyThresholds
+    t_closeness_distance: Dict[str, SensitiveDistance] = Field(default_factory=dict)
+    t_closeness_bins: Optional[int] = Field(default=None, ge=2)
+    approximate: bool = False
+    sample_classes: Optional[int] = Field(default=None, ge=1)
+    confidence: float = Field(default=0.95, gt=0, lt=1)
+    generalization_config: Optional[GeneralizationConfig] = None
+    column_types: Dict[str, str] = Field(default_factory=dict)
 
 
 class ValidationResponse(BaseModel):
@@ -41,6 +86,9 @@ class ValidationResponse(BaseModel):
     metrics: Dict[str, MetricResult]
     failed_metrics: List[str]
     remediation_suggestions: List[RemediationSuggestion]
+    load_stats: Optional[LoadStats] = None
+    approximation: Optional[ApproximationStats] = None
+    rollup: Optional[RollupStats] = None
 
 
 class ReportRequest(BaseModel):
@@ -101,45 +149,130 @@ def calculate_risk_score(
     return round(risk_score, 2)
 
 
-@router.post("/validate", response_model=ValidationResponse)
-async def validate_data(request: ValidationRequest) -> ValidationResponse:
+def _load_metric_columns(
+    path: str,
+    quasi_identifiers: List[str],
+    sensitive_attributes: List[str],
+    ordinal_attributes: Optional[List[str]] = None
+) -> pd.DataFrame:
     """
-    Validate anonymized data against privacy thresholds.
+    Load only the columns k/l/t use, as categoricals.
 
-    Calculates k-anonymity, l-diversity, t-closeness, and composite risk score.
+    Metrics only group and count values, so categorical codes are enough
+    and avoid re-inferring dtypes. Ordinal sensitive attributes keep their
+    parsed numeric dtype instead, since they are compared by value.
+    CSV files use VALIDATION_CSV_ENGINE.
+    """
+    columns = list(dict.fromkeys(quasi_identifiers + sensitive_attributes))
+    if not columns:
+        return read_table(path, engine=VALIDATION_CSV_ENGINE)
+    numeric = set(ordinal_attributes or []) - set(quasi_identifiers)
+    return read_table(
+        path,
+        columns=columns,
+        dtype={col: "category" for col in columns if col not in numeric},
+        engine=VALIDATION_CSV_ENGINE
+    )
 
-    Args:
-        request: ValidationRequest with file path, QIs, SAs, and thresholds
 
-    Returns:
-        ValidationResponse with metrics and pass/fail status
-    """
-    # Validate input file exists
-    if not os.path.exists(request.input_path):
-        raise HTTPException(status_code=404, detail=f"Input file not found: {request.input_path}")
+def _estimate_metrics(
+    request: ValidationRequest,
+    ordinal_attributes: List[str],
+    distance: Dict[str, str],
+    progress: Optional[ProgressTracker] = None
+) -> Dict:
+    """Estimate k/l/t in one streaming pass over the metric columns"""
+    columns = list(dict.fromkeys(request.quasi_identifiers + request.sensitive_attributes))
+    numeric = set(ordinal_attributes) - set(request.quasi_identifiers)
+    chunks = iter_table_chunks(
+        request.input_path,
+        VALIDATION_CHUNK_SIZE,
+        columns=columns or None,
+        dtype={col: "category" for col in columns if col not in numeric}
+    )
+    if progress:
+        progress.total_rows = count_rows(request.input_path)
+        chunks = _report_chunks(chunks, progress, "ESTIMATE")
+    return estimate_privacy_metrics(
+        chunks,
+        request.quasi_identifiers,
+        request.sensitive_attributes,
+        sample_classes=request.sample_classes or VALIDATION_SAMPLE_CLASSES,
+        confidence=request.confidence,
+        distance=distance,
+        bins=request.t_closeness_bins
+    )
 
-    # Read CSV
-    try:
-        df = pd.read_csv(request.input_path)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read CSV: {str(e)}")
 
-    thresholds = request.thresholds
+def _report_chunks(chunks, progress: ProgressTracker, stage: str):
+    """Pass chunks through, reporting the rows read so far"""
+    rows = 0
+    progress.update(stage=stage)
+    for chunk in chunks:
+        yield chunk
+        rows += len(chunk)
+        progress.update(rows_processed=rows)
 
-    # Calculate k-anonymity
-    k_result = calculate_k_anonymity(df, request.quasi_identifiers)
+
+def _aggregates_path(job_id: str) -> str:
+    return os.path.join(AGGREGATES_PATH, f"{job_id}.npz")
+
+
+def _save_aggregates(request: ValidationRequest, classes: EquivalenceClasses, ordinal_attributes: List[str]) -> None:
+    """Store the job's class sizes and histograms so /revalidate can roll them up"""
+    if not classes.quasi_identifiers:
+        return
+    try:
+        os.makedirs(AGGREGATES_PATH, exist_ok=True)
+        ClassAggregates.from_classes(classes, request.sensitive_attributes, ordinal_attributes).save(
+            _aggregates_path(request.job_id),
+            generalization_config=request.generalization_config.model_dump(),
+            column_types=request.column_types
+        )
+    except OSError as e:
+        # Revalidation is an optimization; validation itself succeeded
+        print(f"Warning: Failed to store class aggregates for {request.job_id}: {e}")
+
+
+def _exact_metrics(request: ValidationRequest, df: pd.DataFrame, ordinal_attributes: List[str], distance: Dict[str, str]) -> Dict:
+    """k/l/t of a loaded frame, storing the class aggregates when the request allows /revalidate"""
+    # Encode equivalence classes once and derive all metrics from them
+    classes = EquivalenceClasses(df, request.quasi_identifiers)
+    results = calculate_privacy_metrics(
+        df,
+        request.quasi_identifiers,
+        request.sensitive_attributes,
+        distance=distance,
+        bins=request.t_closeness_bins,
+        classes=classes
+    )
+    if request.generalization_config is not None and request.column_types:
+        _save_aggregates(request, classes, ordinal_attributes)
+    return results
+
+
+def _build_response(
+    results: Dict,
+    thresholds: PrivacyThresholds,
+    load_stats: Optional[LoadStats] = None,
+    approximation: Optional[ApproximationStats] = None,
+    rollup: Optional[RollupStats] = None
+) -> ValidationResponse:
+    """Check k/l/t results against the thresholds and add risk score and suggestions"""
+    # k-anonymity
+    k_result = results["k_anonymity"]
     k_value = k_result['k_value']
     k_threshold = thresholds.k_anonymity.minimum
     k_passed = k_value >= k_threshold
 
-    # Calculate l-diversity
-    l_result = calculate_l_diversity(df, request.quasi_identifiers, request.sensitive_attributes)
+    # l-diversity
+    l_result = results["l_diversity"]
     l_value = l_result['l_value']
     l_threshold = thresholds.l_diversity.minimum
     l_passed = l_value >= l_threshold if l_value != float('inf') else True
 
-    # Calculate t-closeness
-    t_result = calculate_t_closeness(df, request.quasi_identifiers, request.sensitive_attributes)
+    # t-closeness
+    t_result = results["t_closeness"]
     t_value = t_result['t_value']
     t_threshold = thresholds.t_closeness.minimum
     t_passed = t_value <= t_threshold
@@ -157,6 +290,23 @@ async def validate_data(request: ValidationRequest) -> ValidationResponse:
         "risk_score": MetricResult(value=risk_value, threshold=risk_threshold, passed=risk_passed),
     }
 
+    if approximation is not None:
+        # Bounds per metric; risk is bounded by its best and worst inputs
+        l_low, l_high = l_result["interval"] if l_value != float('inf') else (100, 100)
+        t_low, t_high = t_result["interval"]
+        intervals = {
+            "k_anonymity": k_result["interval"],
+            "l_diversity": l_result["interval"] if l_value != float('inf') else None,
+            "t_closeness": t_result["interval"],
+            "risk_score": (
+                calculate_risk_score(k_value, l_high, t_low, thresholds),
+                calculate_risk_score(k_value, l_low, t_high, thresholds)
+            ),
+        }
+        for name, metric in metrics.items():
+            metric.approximate = True
+            metric.interval = intervals[name]
+
     # Determine failed metrics
     failed_metrics = []
     if not k_passed:
@@ -202,7 +352,410 @@ async def validate_data(request: ValidationRequest) -> ValidationResponse:
         passed=passed,
         metrics=metrics,
         failed_metrics=failed_metrics,
-        remediation_suggestions=remediation_suggestions
+        remediation_suggestions=remediation_suggestions,
+        load_stats=load_stats,
+        approximation=approximation,
+        rollup=rollup
+    )
+
+
+@router.post("/validate", response_model=ValidationResponse)
+async def validate_data(request: ValidationRequest, accept: Optional[str] = Header(default=None)):
+    """
+    Validate anonymized data against privacy thresholds.
+
+    Calculates k-anonymity, l-diversity, t-closeness, and composite risk score.
+    With approximate=True the file is streamed instead of loaded: k is
+    exact, l and t are estimated from a sample of classes and every
+    metric carries an interval. Use the exact mode for final sign-off.
+
+    When the request carries the generalization_config and column_types
+    the file was masked with, exact validations also store the job's
+    class aggregates for /revalidate.
+
+    With "Accept: application/x-ndjson" the response streams progress
+    events and ends with the ValidationResponse (see shared.progress).
+
+    Args:
+        request: ValidationRequest with file path, QIs, SAs, and thresholds
+        accept: Accept header
+
+    Returns:
+        ValidationResponse with metrics and pass/fail status
+    """
+    if wants_progress(accept):
+        return StreamingResponse(
+            ndjson_progress(lambda progress: _validate(request, progress), "validation"),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    return _validate(request)
+
+
+def _validate(request: ValidationRequest, progress: Optional[ProgressTracker] = None) -> ValidationResponse:
+    """Validate request's input file (see validate_data), reporting to progress if given"""
+    # Validate input file exists
+    if not os.path.exists(request.input_path):
+        raise HTTPException(status_code=404, detail=f"Input file not found: {request.input_path}")
+
+    ordinal = [col for col, mode in request.t_closeness_distance.items() if mode == SensitiveDistance.ORDINAL]
+    distance = {col: mode.value for col, mode in request.t_closeness_distance.items()}
+
+    load_stats = None
+    approximation = None
+    if request.approximate:
+        # Stream the file once; k is exact, l and t come from sampled classes
+        start = time.perf_counter()
+        try:
+            results = _estimate_metrics(request, ordinal, distance, progress)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to read input: {str(e)}")
+        approximation = ApproximationStats(
+            seconds=round(time.perf_counter() - start, 4),
+            **results["approximation"]
+        )
+    else:
+        # Read input and time the load
+        input_format = detect_format(request.input_path)
+        if progress:
+            progress.update(stage="READ")
+        start = time.perf_counter()
+        try:
+            df = _load_metric_columns(request.input_path, request.quasi_identifiers, request.sensitive_attributes, ordinal)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to read input: {str(e)}")
+        load_stats = LoadStats(
+            seconds=round(time.perf_counter() - start, 4),
+            memory_bytes=int(df.memory_usage(deep=True).sum()),
+            rows=len(df),
+            columns_loaded=list(df.columns),
+            engine=VALIDATION_CSV_ENGINE if input_format == "csv" else input_format
+        )
+
+        if progress:
+            progress.total_rows = len(df)
+            progress.update(stage="METRICS", rows_processed=len(df))
+        results = _exact_metrics(request, df, ordinal, distance)
+
+    return _build_response(results, request.thresholds, load_stats=load_stats, approximation=approximation)
+
+
+@router.post("/mask-and-validate", response_model=MaskAndValidateResponse)
+async def mask_and_validate(request: MaskAndValidateRequest, accept: Optional[str] = Header(default=None)):
+    """
+    Mask a file and validate the masked data without re-reading it.
+
+    Runs the same masking plan as the masking service's /mask, then
+    computes the metrics of /validate on the masked frame in memory. The
+    masked file is written once, as the artifact, and never parsed back,
+    so a full parse and dtype inference leave the critical path. Class
+    aggregates are stored for /revalidate as with /validate.
+
+    The whole input is loaded: use /mask (which streams large files) and
+    /validate for tables that do not fit in memory.
+
+    With "Accept: application/x-ndjson" the response streams progress
+    events (stage, seconds per masking engine, ETA of the masking) and
+    ends with the MaskAndValidateResponse (see shared.progress).
+
+    Args:
+        request: MaskAndValidateRequest with file path, classification and thresholds
+        accept: Accept header
+
+    Returns:
+        MaskAndValidateResponse with the masking and validation results
+    """
+    if wants_progress(accept):
+        return StreamingResponse(
+            ndjson_progress(lambda progress: _mask_and_validate(request, progress), "validation"),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    return _mask_and_validate(request)
+
+
+def _mask_and_validate(request: MaskAndValidateRequest, progress: Optional[ProgressTracker] = None) -> MaskAndValidateResponse:
+    """Mask and validate request's input file (see mask_and_validate), reporting to progress if given"""
+    if not os.path.exists(request.input_path):
+        raise HTTPException(status_code=404, detail=f"Input file not found: {request.input_path}")
+
+    try:
+        output_format = check_format(request.output_format or MASK_OUTPUT_FORMAT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    os.makedirs(STAGING_PATH, exist_ok=True)
+    output_path = os.path.join(STAGING_PATH, f"{request.job_id}_masked{FORMAT_EXTENSIONS[output_format]}")
+
+    input_format = detect_format(request.input_path)
+    if progress:
+        progress.update(stage="READ")
+    start = time.perf_counter()
+    try:
+        df = read_table(request.input_path)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read input: {str(e)}")
+    load_seconds = time.perf_counter() - start
+    rows_processed = len(df)
+
+    # Mask: names are extracted from suppressed columns before they are dropped
+    plan = compile_plan(request.classification)
+    names_to_scrub = set()
+    for col in plan.columns("SUPPRESS"):
+        if col in df.columns:
+            names_to_scrub.update(TextScrubber.extract_names_from_column(df, col))
+    on_stage = None
+    if progress:
+        progress.total_rows = rows_processed
+
+        def on_stage(stage: str, done: int, total: int) -> None:
+            progress.update(stage=stage, fraction=done / total, stage_timings=executor.stage_timings)
+
+    executor = MaskingPlanExecutor(
+        plan,
+        salt=request.salt,
+        names_to_scrub=names_to_scrub,
+        max_workers=MASK_COLUMN_WORKERS,
+        text_scrub_workers=TEXT_SCRUB_WORKERS,
+        text_scrub_min_rows=TEXT_SCRUB_MIN_ROWS,
+        on_stage=on_stage
+    )
+    df, techniques_applied = executor.execute(df)
+    if progress:
+        progress.update(stage="METRICS", rows_processed=rows_processed)
+
+    # Validate the masked frame as /validate would validate the written file
+    classification = request.classification
+    validation_request = ValidationRequest(
+        job_id=request.job_id,
+        input_path=output_path,
+        quasi_identifiers=classification.quasi_identifiers,
+        sensitive_attributes=classification.sensitive_attributes,
+        thresholds=request.thresholds,
+        t_closeness_distance=request.t_closeness_distance,
+        t_closeness_bins=request.t_closeness_bins,
+        generalization_config=classification.generalization_config,
+        column_types=executor.generalizer.column_types
+    )
+    ordinal = [col for col, mode in request.t_closeness_distance.items() if mode == SensitiveDistance.ORDINAL]
+    distance = {col: mode.value for col, mode in request.t_closeness_distance.items()}
+    results = _exact_metrics(validation_request, df, ordinal, distance)
+    load_stats = LoadStats(
+        seconds=round(load_seconds, 4),
+        memory_bytes=int(df.memory_usage(deep=True).sum()),
+        rows=rows_processed,
+        columns_loaded=list(df.columns),
+        engine=input_format
+    )
+    validation = _build_response(results, request.thresholds, load_stats=load_stats)
+
+    if progress:
+        progress.update(stage="WRITE")
+    try:
+        write_table(df, output_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to write output: {str(e)}")
+
+    return MaskAndValidateResponse(
+        masking=MaskingResponse(
+            output_path=output_path,
+            techniques_applied=techniques_applied,
+            rows_processed=rows_processed,
+            columns_masked=len(techniques_applied),
+            stage_timings=executor.stage_timings,
+            column_types=executor.generalizer.column_types
+        ),
+        validation=validation.model_dump()
+    )
+
+
+@router.post("/revalidate", response_model=ValidationResponse)
+async def revalidate_data(request: RevalidationRequest) -> ValidationResponse:
+    """
+    Re-derive the metrics of a validated job at coarser generalization levels.
+
+    The job's stored equivalence classes are relabelled with the coarser
+    hierarchy levels and merged; sizes and sensitive attribute histograms
+    are summed, so no records are read. Results equal masking the data
+    again at the requested levels and validating it.
+
+    Args:
+        request: RevalidationRequest with job id, target levels and thresholds
+
+    Returns:
+        ValidationResponse with metrics and pass/fail status
+
+    Raises:
+        404 if the job has no stored classes (validate it with its
+        generalization_config first); 409 if the requested levels cannot be
+        derived from the stored ones (finer levels, weeks to months, age
+        ranges straddling a category boundary, ...) and the job must be
+        masked again
+    """
+    path = _aggregates_path(request.job_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"No stored equivalence classes for job {request.job_id}")
+
+    start = time.perf_counter()
+    aggregates, metadata = ClassAggregates.load(path)
+    labels = coarsen_columns(
+        {col: aggregates.df[col].to_numpy() for col in aggregates.quasi_identifiers},
+        metadata["column_types"],
+        metadata["generalization_config"],
+        request.generalization_config.model_dump()
+    )
+    if labels is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Generalization levels cannot be derived from the validated levels {metadata['generalization_config']}; mask the data again"
+        )
+    rolled = aggregates.rollup(labels)
+
+    try:
+        results = calculate_privacy_metrics(
+            rolled.df,
+            rolled.quasi_identifiers,
+            rolled.sensitive_attributes,
+            distance={col: mode.value for col, mode in request.t_closeness_distance.items()},
+            bins=request.t_closeness_bins,
+            classes=rolled
+        )
+    except ValueError as e:
+        # e.g. an ordinal distance for an attribute validated as categorical
+        raise HTTPException(status_code=409, detail=str(e))
+
+    rollup = RollupStats(
+        seconds=round(time.perf_counter() - start, 4),
+        source_classes=aggregates.n_classes,
+        classes=rolled.n_classes
+    )
+    return _build_response(results, request.thresholds, rollup=rollup)
+
+
+@router.post("/optimize", response_model=OptimizeResponse)
+async def optimize_generalization(request: OptimizeRequest) -> OptimizeResponse:
+    """
+    Find the least generalized levels that pass every threshold, in one call.
+
+    Searches the lattice of GeneralizationConfig levels over the raw
+    quasi-identifiers with monotonicity pruning; each node's metrics are
+    rolled up from class aggregates, so the file is read once. Metrics
+    match masking at those levels and validating, except where date
+    quasi-identifiers are also date-shifted before generalization.
+
+    Args:
+        request: OptimizeRequest with the raw file path, QIs, SAs and thresholds
+
+    Returns:
+        OptimizeResponse with the frontier of minimal passing levels, least
+        information loss first (empty if even the most general levels fail)
+    """
+    if not os.path.exists(request.input_path):
+        raise HTTPException(status_code=404, detail=f"Input file not found: {request.input_path}")
+
+    ordinal = [col for col, mode in request.t_closeness_distance.items() if mode == SensitiveDistance.ORDINAL]
+    columns = list(dict.fromkeys(request.quasi_identifiers + request.sensitive_attributes))
+    start = time.perf_counter()
+    try:
+        # Raw dtypes, as the masking service reads them, so detection matches
+        df = read_table(request.input_path, columns=columns, engine=VALIDATION_CSV_ENGINE)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read input: {str(e)}")
+
+    quasi_identifiers = [col for col in request.quasi_identifiers if col in df.columns]
+    if not quasi_identifiers:
+        raise HTTPException(status_code=400, detail="No quasi-identifiers to generalize")
+    column_types = {col: request.column_types.get(col) or detect_column_type(col, df[col]) for col in quasi_identifiers}
+
+    lattice = GeneralizationLattice(df, quasi_identifiers, request.sensitive_attributes, column_types, ordinal)
+    frontier = lattice.search(
+        lambda results: _build_response(results, request.thresholds).passed,
+        distance={col: mode.value for col, mode in request.t_closeness_distance.items()},
+        bins=request.t_closeness_bins
+    )
+
+    candidates = []
+    for node in frontier:
+        candidates.append(GeneralizationCandidate(
+            generalization_config=GeneralizationConfig(age_level=0, location_level=0, date_level=0, **lattice.config(node)),
+            metrics=_build_response(lattice.evaluated[node], request.thresholds).metrics,
+            **lattice.information_loss(node)
+        ))
+    candidates.sort(key=lambda candidate: (candidate.precision_loss, candidate.discernibility))
+
+    return OptimizeResponse(
+        frontier=candidates,
+        recommended=candidates[0].generalization_config if candidates else None,
+        column_types=column_types,
+        nodes_total=len(lattice.nodes),
+        nodes_evaluated=len(lattice.evaluated),
+        seconds=round(time.perf_counter() - start, 4)
+    )
+
+
+def _dump_violating_records(input_path: str, record_mask, output_path: str) -> None:
+    """Copy the rows selected by record_mask (all columns) to output_path, chunk by chunk"""
+    writer = TableWriter(output_path)
+    try:
+        for chunk in iter_table_chunks(input_path, VIOLATION_DUMP_CHUNK_SIZE):
+            selected = chunk[record_mask[chunk.index.to_numpy()]]
+            if len(selected):
+                writer.write(selected)
+    finally:
+        writer.close()
+
+
+@router.post("/violations", response_model=ViolationsResponse)
+async def find_violations(request: ViolationsRequest) -> ViolationsResponse:
+    """
+    List the equivalence classes that fail the privacy thresholds, worst first.
+
+    Classes are ranked by severity (how far they miss k, l or t) and
+    returned a page at a time. With dump_records, every row in a failing
+    class is also written to a Parquet file.
+
+    Args:
+        request: ViolationsRequest with file path, columns, thresholds and paging
+
+    Returns:
+        ViolationsResponse with counts and the requested page of classes
+    """
+    if not os.path.exists(request.input_path):
+        raise HTTPException(status_code=404, detail=f"Input file not found: {request.input_path}")
+
+    ordinal = [col for col, mode in request.t_closeness_distance.items() if mode == SensitiveDistance.ORDINAL]
+    try:
+        df = _load_metric_columns(request.input_path, request.quasi_identifiers, request.sensitive_attributes, ordinal)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read input: {str(e)}")
+
+    thresholds = request.thresholds
+    violations = ClassViolations(
+        EquivalenceClasses(df, request.quasi_identifiers),
+        request.sensitive_attributes,
+        k_threshold=thresholds.k_anonymity.minimum,
+        l_threshold=thresholds.l_diversity.minimum,
+        t_threshold=thresholds.t_closeness.minimum,
+        distance={col: mode.value for col, mode in request.t_closeness_distance.items()},
+        bins=request.t_closeness_bins
+    )
+    page = violations.describe(violations.worst(request.limit, request.offset))
+
+    records_path = None
+    if request.dump_records and violations.record_count:
+        os.makedirs(VIOLATIONS_PATH, exist_ok=True)
+        records_path = os.path.join(VIOLATIONS_PATH, f"{request.job_id}_violations.parquet")
+        try:
+            _dump_violating_records(request.input_path, violations.record_mask(), records_path)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return ViolationsResponse(
+        total_classes=violations.classes.n_classes,
+        violating_classes=violations.class_count,
+        violating_records=violations.record_count,
+        offset=request.offset,
+        limit=request.limit,
+        classes=[ClassViolation(**item) for item in page],
+        records_path=records_path
     )
 
 
@@ -1,7 +1,21 @@
 """Privacy Metrics Module"""
 
+from .classes import EquivalenceClasses
+from .aggregates import ClassAggregates
 from .k_anonymity import calculate_k_anonymity
 from .l_diversity import calculate_l_diversity
 from .t_closeness import calculate_t_closeness
+from .fused import calculate_privacy_metrics
+from .violations import ClassViolations
+from .lattice import GeneralizationLattice
 
-__all__ = ["calculate_k_anonymity", "calculate_l_diversity", "calculate_t_closeness"]
+__all__ = [
+    "EquivalenceClasses",
+    "ClassAggregates",
+    "calculate_k_anonymity",
+    "calculate_l_diversity",
+    "calculate_t_closeness",
+    "calculate_privacy_metrics",
+    "ClassViolations",
+    "GeneralizationLattice",
+]
@@ -0,0 +1,267 @@
+"""
+Class Aggregates
+Equivalence classes reduced to the counts privacy metrics need, so they
+can be stored per job and rolled up to coarser generalizations
+
+k, l and t only depend on class sizes and per-class histograms of the
+sensitive attributes. When quasi-identifiers are generalized further,
+each new class is a union of existing classes, so its size and
+histograms are sums over those classes and no records are read again.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+from .classes import EquivalenceClasses, Histogram, _numeric_values
+
+
+def _merge_histogram(class_ids: np.ndarray, value_codes: np.ndarray, counts: np.ndarray, n_classes: int, n_values: int) -> Histogram:
+    """Sum counts of repeated (class, value) pairs into a sorted Histogram"""
+    pairs, inverse = np.unique(class_ids * max(n_values, 1) + value_codes, return_inverse=True)
+    return Histogram(
+        class_ids=pairs // max(n_values, 1),
+        value_codes=pairs % max(n_values, 1),
+        counts=np.bincount(inverse, weights=counts, minlength=len(pairs)).astype(np.int64),
+        n_classes=n_classes,
+        n_values=n_values
+    )
+
+
+def _quantile_edges(values: np.ndarray, counts: np.ndarray, bins: int) -> np.ndarray:
+    """
+    Inner quantile-bin edges of sorted values repeated counts times.
+
+    Equal to the edges _ordered_codes takes with np.quantile (linear
+    method) over the expanded values, without expanding them.
+    """
+    n = int(counts.sum())
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+    virtual = (n - 1) * quantiles
+    previous = np.floor(virtual)
+    gamma = virtual - previous
+    cumulative = np.cumsum(counts)
+    lower = values[np.searchsorted(cumulative, np.minimum(previous, n - 1), side='right')]
+    upper = values[np.searchsorted(cumulative, np.minimum(previous + 1, n - 1), side='right')]
+    diff = upper - lower
+    return np.unique(np.where(gamma >= 0.5, upper - diff * (1 - gamma), lower + diff * gamma))
+
+
+def _labels(values: pd.Series) -> np.ndarray:
+    """Column values as strings, None for missing"""
+    labels = values.astype(str).to_numpy(dtype=object)
+    labels[values.isna().to_numpy()] = None
+    return labels
+
+
+class ClassAggregates(EquivalenceClasses):
+    """
+    Equivalence classes with one row per class instead of one per record.
+
+    df holds each class's quasi-identifier labels (sensitive attribute
+    columns are present but empty), class_ids are 0..n_classes - 1 and
+    the sensitive attribute histograms are stored rather than counted,
+    so the metric functions accept it in place of EquivalenceClasses.
+
+    Attributes:
+        sensitive_attributes: Sensitive attributes with stored histograms
+        ordered_values: Sorted numeric values behind each ordered histogram
+    """
+
+    def __init__(
+        self,
+        labels: Dict[str, np.ndarray],
+        sizes: np.ndarray,
+        sensitive_attributes: List[str],
+        histograms: Dict[Any, Histogram],
+        ordered_values: Optional[Dict[str, np.ndarray]] = None
+    ):
+        """
+        Args:
+            labels: Quasi-identifier label per class, by column (None for missing)
+            sizes: Record count per class
+            sensitive_attributes: Sensitive attribute columns
+            histograms: Histogram per sensitive attribute, plus (column, None)
+                        ordered histograms for ordinal attributes
+            ordered_values: Sorted numeric values per ordinal attribute
+        """
+        self.quasi_identifiers = list(labels)
+        self.sensitive_attributes = list(sensitive_attributes)
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self.n_classes = len(self.sizes)
+        self.class_ids = np.arange(self.n_classes, dtype=np.int64)
+        self.df = pd.DataFrame({
+            **{col: np.asarray(values, dtype=object) for col, values in labels.items()},
+            **{col: np.full(self.n_classes, None, dtype=object) for col in self.sensitive_attributes}
+        })
+
+        self._histograms = dict(histograms)
+        self._first_rows: Optional[np.ndarray] = None
+        self.ordered_values = ordered_values or {}
+
+    @classmethod
+    def from_classes(
+        cls,
+        classes: EquivalenceClasses,
+        sensitive_attributes: List[str],
+        ordinal_attributes: Optional[List[str]] = None
+    ) -> "ClassAggregates":
+        """
+        Aggregate encoded classes.
+
+        Args:
+            classes: Equivalence classes of a dataframe
+            sensitive_attributes: Sensitive attribute columns (missing ones are ignored)
+            ordinal_attributes: Attributes to also keep ordered (numeric) histograms for
+
+        Returns:
+            ClassAggregates with the same classes, sizes and histograms
+        """
+        if not classes.quasi_identifiers:
+            raise ValueError("No quasi-identifiers to aggregate")
+
+        values = classes.class_values(np.arange(classes.n_classes))
+        labels = {col: _labels(values[col]) for col in classes.quasi_identifiers}
+
+        existing_sa = [col for col in sensitive_attributes if col in classes.df.columns]
+        histograms = {col: classes.histogram(col) for col in existing_sa}
+        ordered_values = {}
+        for col in ordinal_attributes or []:
+            if col in existing_sa:
+                histograms[(col, None)] = classes.ordered_histogram(col)
+                numeric = _numeric_values(classes.df[col])
+                ordered_values[col] = np.unique(numeric[~np.isnan(numeric)])
+
+        return cls(labels, classes.sizes, existing_sa, histograms, ordered_values)
+
+    def histogram(self, column: str) -> Histogram:
+        """Stored per-class value counts of a sensitive attribute"""
+        if column not in self._histograms:
+            raise ValueError(f"No class histogram stored for '{column}'")
+        return self._histograms[column]
+
+    def ordered_histogram(self, column: str, bins: Optional[int] = None) -> Histogram:
+        """
+        Stored ordered histogram, quantile-binned from the stored values if bins is set.
+
+        Bins are placed as if computed over the records, so results match
+        EquivalenceClasses.ordered_histogram on the data.
+        """
+        key = (column, bins)
+        if key in self._histograms:
+            return self._histograms[key]
+        if (column, None) not in self._histograms:
+            raise ValueError(f"No ordered class histogram stored for '{column}'")
+
+        exact = self._histograms[(column, None)]
+        values = self.ordered_values[column]
+        if not len(values):
+            return exact
+        edges = _quantile_edges(values, exact.global_counts(), bins)
+        bin_codes = np.searchsorted(edges, values, side='right')
+        self._histograms[key] = _merge_histogram(
+            exact.class_ids, bin_codes[exact.value_codes], exact.counts, self.n_classes, len(edges) + 1
+        )
+        return self._histograms[key]
+
+    def rollup(self, labels: Dict[str, np.ndarray]) -> "ClassAggregates":
+        """
+        Merge classes whose new quasi-identifier labels coincide.
+
+        Args:
+            labels: New label per class for the columns that change
+                    (other quasi-identifiers keep their labels)
+
+        Returns:
+            ClassAggregates of the merged classes
+        """
+        frame = pd.DataFrame({
+            col: labels[col] if col in labels else self.df[col].to_numpy()
+            for col in self.quasi_identifiers
+        })
+        merged = EquivalenceClasses(frame, self.quasi_identifiers)
+        parent = merged.class_ids
+
+        histograms = {
+            key: _merge_histogram(parent[h.class_ids], h.value_codes, h.counts, merged.n_classes, h.n_values)
+            for key, h in self._histograms.items()
+            if isinstance(key, str) or key[1] is None
+        }
+        values = merged.class_values(np.arange(merged.n_classes))
+
+        return ClassAggregates(
+            {col: values[col].to_numpy(dtype=object) for col in self.quasi_identifiers},
+            np.bincount(parent, weights=self.sizes, minlength=merged.n_classes),
+            self.sensitive_attributes,
+            histograms,
+            self.ordered_values
+        )
+
+    def save(self, path: str, **metadata) -> None:
+        """
+        Write the aggregates to a compressed .npz file.
+
+        Args:
+            path: Output path (ending in .npz)
+            **metadata: JSON-serializable values stored alongside (see load)
+        """
+        ordinal = list(self.ordered_values)
+        arrays = {"sizes": self.sizes}
+        for i, col in enumerate(self.quasi_identifiers):
+            labels = self.df[col].to_numpy(dtype=object)
+            missing = pd.isna(labels)
+            arrays[f"qi{i}"] = np.array(["" if m else label for label, m in zip(labels, missing)], dtype=str)
+            arrays[f"qi{i}_missing"] = missing
+        n_values = {}
+        for i, col in enumerate(self.sensitive_attributes):
+            h = self._histograms[col]
+            arrays[f"sa{i}"] = np.stack([h.class_ids, h.value_codes, h.counts])
+            n_values[col] = h.n_values
+            if col in ordinal:
+                h = self._histograms[(col, None)]
+                arrays[f"sa{i}_ordered"] = np.stack([h.class_ids, h.value_codes, h.counts])
+                arrays[f"sa{i}_values"] = self.ordered_values[col]
+
+        arrays["metadata"] = np.array(json.dumps({
+            "quasi_identifiers": self.quasi_identifiers,
+            "sensitive_attributes": self.sensitive_attributes,
+            "ordinal_attributes": ordinal,
+            "n_values": n_values,
+            **metadata
+        }))
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["ClassAggregates", Dict[str, Any]]:
+        """
+        Read aggregates written by save.
+
+        Returns:
+            Tuple of (aggregates, metadata passed to save)
+        """
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data["metadata"]))
+            sizes = data["sizes"]
+            n_classes = len(sizes)
+
+            labels = {}
+            for i, col in enumerate(metadata.pop("quasi_identifiers")):
+                values = data[f"qi{i}"].astype(object)
+                values[data[f"qi{i}_missing"]] = None
+                labels[col] = values
+
+            sensitive_attributes = metadata.pop("sensitive_attributes")
+            ordinal = metadata.pop("ordinal_attributes")
+            n_values = metadata.pop("n_values")
+            histograms = {}
+            ordered_values = {}
+            for i, col in enumerate(sensitive_attributes):
+                histograms[col] = Histogram(*data[f"sa{i}"], n_classes=n_classes, n_values=n_values[col])
+                if col in ordinal:
+                    ordered_values[col] = data[f"sa{i}_values"]
+                    histograms[(col, None)] = Histogram(
+                        *data[f"sa{i}_ordered"], n_classes=n_classes, n_values=len(ordered_values[col])
+                    )
+
+        return cls(labels, sizes, sensitive_attributes, histograms, ordered_values), metadata
@@ -0,0 +1,219 @@
+"""
+Approximate Privacy Metrics
+Estimates k-anonymity, l-diversity and t-closeness in one streaming pass
+over very large tables
+
+Every row's quasi-identifier tuple is hashed to 64 bits, by value rather
+than by dtype, since chunks of one column can parse differently (int64
+in one, float64 with NaN in the next). Class sizes are
+counted exactly from the hashes, so k is exact. l and t are computed
+exactly for a uniform random sample of classes: the classes with the
+smallest hashes (a bottom-k sketch), kept with all of their rows. Only
+the chunk being read, the per-class counts and the sampled rows are in
+memory at once.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from .classes import EquivalenceClasses
+from .k_anonymity import summarize_class_sizes
+from .l_diversity import calculate_l_diversity
+from .t_closeness import calculate_t_closeness
+
+
+# Hash of a missing value in any dtype
+_MISSING_HASH = np.uint64(0x9E3779B97F4A7C15)
+_HASH_PRIME = np.uint64(0x100000001B3)
+
+
+def _column_hashes(values: pd.Series) -> np.ndarray:
+    """
+    64-bit hash of each value that does not depend on the chunk's dtype.
+
+    Numbers (plain or as categories) hash by their float64 value, so 1 in
+    an int64 chunk matches 1.0 in a float64 chunk; other values hash by
+    str(). Missing values hash alike whatever the dtype.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Hash the categories once and look them up by code (-1, missing, picks the last entry)
+        categories = pd.Series(values.cat.categories)
+        codes = values.cat.codes.to_numpy()
+        category_hashes = np.append(_column_hashes(categories), _MISSING_HASH)
+        return category_hashes[codes]
+
+    numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+    keys = values.astype("float64") if numeric else values.astype(str)
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    hashes[values.isna().to_numpy()] = _MISSING_HASH
+    return hashes
+
+
+def _class_hashes(chunk: pd.DataFrame, quasi_identifiers: List[str]) -> np.ndarray:
+    """64-bit hash of each row's quasi-identifier tuple (by value, so stable across chunks)"""
+    hashes = np.zeros(len(chunk), dtype=np.uint64)
+    for col in quasi_identifiers:
+        # uint64 arithmetic wraps around
+        hashes = hashes * _HASH_PRIME ^ _column_hashes(chunk[col])
+    return hashes
+
+
+class _ClassCounter:
+    """Exact record count per class hash, merged lazily across chunks"""
+
+    def __init__(self):
+        self._hashes: List[np.ndarray] = []
+        self._counts: List[np.ndarray] = []
+        self._merged_size = 0
+        self._pending = 0
+
+    def add(self, hashes: np.ndarray) -> None:
+        unique, counts = np.unique(hashes, return_counts=True)
+        self._hashes.append(unique)
+        self._counts.append(counts)
+        self._pending += len(unique)
+        # Merge once the unmerged part outgrows the merged part (amortized)
+        if self._pending > max(self._merged_size, 1 << 16):
+            self._merge()
+
+    def _merge(self) -> None:
+        hashes = np.concatenate(self._hashes)
+        unique, inverse = np.unique(hashes, return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate(self._counts), minlength=len(unique))
+        self._hashes = [unique]
+        self._counts = [counts.astype(np.int64)]
+        self._merged_size = len(unique)
+        self._pending = 0
+
+    def sizes(self) -> np.ndarray:
+        if not self._hashes:
+            return np.zeros(0, dtype=np.int64)
+        self._merge()
+        return self._counts[0]
+
+
+class _ClassSample:
+    """All rows of the max_classes classes with the smallest hashes seen so far"""
+
+    def __init__(self, max_classes: int):
+        self.max_classes = max_classes
+        self.threshold = np.iinfo(np.uint64).max
+        self._frames: List[pd.DataFrame] = []
+        self._hashes: List[np.ndarray] = []
+
+    def add(self, chunk: pd.DataFrame, hashes: np.ndarray) -> None:
+        keep = hashes <= self.threshold
+        if not keep.any():
+            return
+        self._frames.append(chunk[keep])
+        self._hashes.append(hashes[keep])
+
+        hashes = np.concatenate(self._hashes)
+        distinct = np.unique(hashes)
+        if len(distinct) > self.max_classes:
+            self.threshold = distinct[self.max_classes - 1]
+            keep = hashes <= self.threshold
+            self._frames = [pd.concat(self._frames, ignore_index=True)[keep]]
+            self._hashes = [hashes[keep]]
+
+    def frame(self, columns: List[str]) -> pd.DataFrame:
+        if not self._frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(self._frames, ignore_index=True)
+
+
+def tail_fraction(sampled_classes: int, confidence: float) -> float:
+    """
+    Largest fraction of classes that can lie beyond the sample extreme.
+
+    If m classes are drawn uniformly and the worst of them has value v,
+    then with the given confidence at most this fraction of all classes
+    is worse than v: 1 - (1 - confidence) ** (1 / m).
+    """
+    if sampled_classes <= 0:
+        return 1.0
+    return float(1.0 - (1.0 - confidence) ** (1.0 / sampled_classes))
+
+
+def estimate_privacy_metrics(
+    chunks: Iterable[pd.DataFrame],
+    quasi_identifiers: List[str],
+    sensitive_attributes: List[str],
+    sample_classes: int = 10000,
+    confidence: float = 0.95,
+    distance: Optional[Dict[str, str]] = None,
+    bins: Optional[int] = None
+) -> Dict[str, Dict]:
+    """
+    Estimate k-anonymity, l-diversity and t-closeness from a stream of chunks.
+
+    Each metric dict has the keys of the exact functions plus "interval"
+    (lower, upper):
+        - k is exact, so its interval is a single point
+        - l is the minimum over the sampled classes; unsampled classes can
+          only lower it, so the interval is [min(l, 1), l]
+        - t is the maximum over the sampled classes; unsampled classes can
+          only raise it, so the interval is [t, 1]
+    When every class was sampled, l and t are exact too. The
+    "approximation" entry says how much was sampled and, at the given
+    confidence, the largest fraction of classes that can be worse than
+    the reported l or t.
+
+    Args:
+        chunks: Dataframe chunks of the table (same columns in each)
+        quasi_identifiers: List of quasi-identifier column names
+        sensitive_attributes: List of sensitive attribute column names
+        sample_classes: Number of classes to keep for l and t
+        confidence: Confidence level for the tail bound
+        distance: t-closeness distance mode per sensitive attribute
+        bins: Quantile bins for ordinal attributes
+
+    Returns:
+        Dict with "k_anonymity", "l_diversity", "t_closeness" and "approximation"
+    """
+    counter = _ClassCounter()
+    sample = _ClassSample(sample_classes)
+    columns: List[str] = []
+    total_rows = 0
+
+    for chunk in chunks:
+        if not columns:
+            columns = list(chunk.columns)
+        existing_qi = [col for col in quasi_identifiers if col in chunk.columns]
+        hashes = _class_hashes(chunk, existing_qi)
+        counter.add(hashes)
+        sample.add(chunk, hashes)
+        total_rows += len(chunk)
+
+    sizes = counter.sizes()
+    sampled = sample.frame(columns)
+    classes = EquivalenceClasses(sampled, quasi_identifiers)
+    exact = classes.n_classes >= len(sizes)
+
+    k_result = summarize_class_sizes(sizes)
+    k_result["interval"] = (k_result["k_value"], k_result["k_value"])
+
+    l_result = calculate_l_diversity(sampled, quasi_identifiers, sensitive_attributes, classes)
+    l_result["equivalence_classes"] = len(sizes)
+    l_value = l_result["l_value"]
+    l_result["interval"] = (l_value, l_value) if exact else (min(l_value, 1), l_value)
+
+    t_result = calculate_t_closeness(sampled, quasi_identifiers, sensitive_attributes, classes, distance, bins)
+    t_result["equivalence_classes"] = len(sizes)
+    t_value = t_result["t_value"]
+    t_result["interval"] = (t_value, t_value) if exact else (t_value, 1.0)
+
+    return {
+        "k_anonymity": k_result,
+        "l_diversity": l_result,
+        "t_closeness": t_result,
+        "approximation": {
+            "total_rows": total_rows,
+            "sampled_rows": len(sampled),
+            "total_classes": len(sizes),
+            "sampled_classes": classes.n_classes,
+            "confidence": confidence,
+            "tail_fraction": 0.0 if exact else round(tail_fraction(classes.n_classes, confidence), 6),
+        }
+    }
@@ -0,0 +1,235 @@
+"""
+Equivalence Classes
+Encodes the quasi-identifier tuple of every record into one integer class id
+
+All privacy metrics are computed from these ids with bincount and array
+ops, so the quasi-identifier columns are grouped once per dataset rather
+than once per metric and sensitive attribute.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+
+def _codes(values: pd.Series, keep_na: bool) -> Tuple[np.ndarray, int]:
+    """
+    Factorize a column into dense int64 codes.
+
+    Args:
+        values: Column values
+        keep_na: Give missing values their own code (groupby dropna=False);
+                 otherwise they are coded -1
+
+    Returns:
+        Tuple of (codes, number of distinct codes)
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    codes = codes.astype(np.int64, copy=False)
+    cardinality = len(uniques)
+    if keep_na and (codes < 0).any():
+        codes = np.where(codes < 0, cardinality, codes)
+        cardinality += 1
+    return codes, cardinality
+
+
+def _numeric_values(values: pd.Series) -> np.ndarray:
+    """
+    Values of a column as float64, non-numeric ones as NaN.
+
+    Categorical columns (which read_csv parses with string categories)
+    are converted through their categories rather than per record.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = pd.to_numeric(pd.Series(values.cat.categories), errors='coerce').to_numpy(dtype=float)
+        codes = values.cat.codes.to_numpy()
+        return np.where(codes >= 0, categories[codes], np.nan)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+
+def _ordered_codes(values: pd.Series, bins: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    Codes of a numeric column in ascending value order.
+
+    Args:
+        values: Column values (non-numeric and missing values are coded -1)
+        bins: Bucket the values into at most this many quantile bins;
+              None gives every distinct value its own code
+
+    Returns:
+        Tuple of (codes, number of codes)
+    """
+    numeric = _numeric_values(values)
+    valid = ~np.isnan(numeric)
+    codes = np.full(len(numeric), -1, dtype=np.int64)
+    if not valid.any():
+        return codes, 0
+
+    if bins:
+        edges = np.unique(np.quantile(numeric[valid], np.linspace(0, 1, bins + 1)[1:-1]))
+        codes[valid] = np.searchsorted(edges, numeric[valid], side='right')
+        return codes, len(edges) + 1
+
+    uniques, inverse = np.unique(numeric[valid], return_inverse=True)
+    codes[valid] = inverse
+    return codes, len(uniques)
+
+
+class EquivalenceClasses:
+    """
+    Equivalence classes of a dataframe over its quasi-identifiers.
+
+    Attributes:
+        quasi_identifiers: Quasi-identifier columns present in the dataframe
+        class_ids: int64 class id per record, in [0, n_classes)
+        n_classes: Number of equivalence classes
+        sizes: Record count per class
+    """
+
+    def __init__(self, df: pd.DataFrame, quasi_identifiers: List[str]):
+        """
+        Encode the equivalence classes of df.
+
+        Missing values form their own class value, like
+        groupby(dropna=False). With no quasi-identifiers every record is
+        in a single class.
+
+        Args:
+            df: Input dataframe
+            quasi_identifiers: Quasi-identifier column names (missing ones are ignored)
+        """
+        self.df = df
+        self.quasi_identifiers = [col for col in quasi_identifiers if col in df.columns]
+
+        class_ids = np.zeros(len(df), dtype=np.int64)
+        for col in self.quasi_identifiers:
+            codes, cardinality = _codes(df[col], keep_na=True)
+            # Mixed-radix combine, then re-densify so ids never overflow
+            class_ids, _ = _codes(pd.Series(class_ids * cardinality + codes), keep_na=True)
+
+        self.class_ids = class_ids
+        self.n_classes = int(class_ids.max()) + 1 if len(class_ids) else 0
+        self.sizes = np.bincount(class_ids, minlength=self.n_classes)
+
+        self._histograms: Dict[object, Histogram] = {}
+        self._first_rows: Optional[np.ndarray] = None
+
+    def histogram(self, column: str) -> "Histogram":
+        """
+        Sparse per-class value counts of a sensitive attribute (cached).
+
+        Missing values are not counted, as in value_counts() and nunique().
+
+        Args:
+            column: Sensitive attribute column
+
+        Returns:
+            Histogram with one entry per (class, value) pair that occurs
+        """
+        if column not in self._histograms:
+            self._histograms[column] = self._histogram(*_codes(self.df[column], keep_na=False))
+        return self._histograms[column]
+
+    def ordered_histogram(self, column: str, bins: Optional[int] = None) -> "Histogram":
+        """
+        Sparse per-class counts of a numeric attribute over its sorted values (cached).
+
+        Value codes follow ascending value order, so cumulative sums over
+        them are cumulative distributions. Non-numeric values count as
+        missing.
+
+        Args:
+            column: Numeric sensitive attribute column
+            bins: Quantile-bin the values into at most this many buckets
+
+        Returns:
+            Histogram whose value codes are ordered
+        """
+        key = (column, bins)
+        if key not in self._histograms:
+            self._histograms[key] = self._histogram(*_ordered_codes(self.df[column], bins))
+        return self._histograms[key]
+
+    def _histogram(self, codes: np.ndarray, n_values: int) -> "Histogram":
+        valid = codes >= 0
+        pairs, counts = np.unique(self.class_ids[valid] * n_values + codes[valid], return_counts=True)
+        return Histogram(
+            class_ids=pairs // max(n_values, 1),
+            value_codes=pairs % max(n_values, 1),
+            counts=counts,
+            n_classes=self.n_classes,
+            n_values=n_values
+        )
+
+    def distinct_counts(self, column: str) -> np.ndarray:
+        """Number of distinct non-missing values of column per class"""
+        return np.bincount(self.histogram(column).class_ids, minlength=self.n_classes)
+
+    def class_values(self, class_ids: np.ndarray) -> pd.DataFrame:
+        """
+        Quasi-identifier values of the given classes, for reporting.
+
+        Args:
+            class_ids: Class ids to look up
+
+        Returns:
+            Dataframe with one row per class id and one column per quasi-identifier
+        """
+        if self._first_rows is None:
+            _, self._first_rows = np.unique(self.class_ids, return_index=True)
+        return self.df[self.quasi_identifiers].iloc[self._first_rows[class_ids]]
+
+    def record_mask(self, class_mask: np.ndarray) -> np.ndarray:
+        """Boolean mask over records whose class is selected by class_mask"""
+        return class_mask[self.class_ids]
+
+
+class Histogram:
+    """
+    Class x value contingency counts in coordinate form.
+
+    Only (class, value) pairs that occur are stored, so memory grows with
+    the number of records, not with n_classes * n_values.
+
+    Attributes:
+        class_ids: Class id per entry (sorted)
+        value_codes: Value code per entry (sorted within each class)
+        counts: Record count per entry
+        n_classes: Number of classes
+        n_values: Number of distinct non-missing values
+    """
+
+    def __init__(self, class_ids: np.ndarray, value_codes: np.ndarray, counts: np.ndarray, n_classes: int, n_values: int):
+        self.class_ids = class_ids
+        self.value_codes = value_codes
+        self.counts = counts
+        self.n_classes = n_classes
+        self.n_values = n_values
+
+    def class_totals(self) -> np.ndarray:
+        """Non-missing records per class"""
+        return np.bincount(self.class_ids, weights=self.counts, minlength=self.n_classes)
+
+    def row_normalized(self) -> np.ndarray:
+        """Per-entry share of its class (each class row sums to 1)"""
+        return self.counts / self.class_totals()[self.class_ids]
+
+    def global_counts(self) -> np.ndarray:
+        """Records per value over the whole dataset"""
+        return np.bincount(self.value_codes, weights=self.counts, minlength=self.n_values)
+
+
+def value_counts_dict(values: np.ndarray) -> Dict[int, int]:
+    """{value: count} for an int array, most frequent first (like value_counts())"""
+    uniques, counts = np.unique(values, return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    return {int(uniques[i]): int(counts[i]) for i in order}
+
+
+def encode_classes(df: pd.DataFrame, quasi_identifiers: List[str], classes: Optional[EquivalenceClasses] = None) -> EquivalenceClasses:
+    """Reuse already-encoded classes for the same frame and QIs, or encode them"""
+    if classes is not None and classes.df is df and classes.quasi_identifiers == [
+        col for col in quasi_identifiers if col in df.columns
+    ]:
+        return classes
+    return EquivalenceClasses(df, quasi_identifiers)
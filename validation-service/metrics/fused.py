@@ -0,0 +1,49 @@
+"""
+Fused Privacy Metrics
+Computes k-anonymity, l-diversity and t-closeness from one encoding of
+the quasi-identifiers
+"""
+
+import pandas as pd
+from typing import List, Dict, Optional
+
+from .classes import EquivalenceClasses, encode_classes
+from .k_anonymity import calculate_k_anonymity
+from .l_diversity import calculate_l_diversity
+from .t_closeness import calculate_t_closeness
+
+
+def calculate_privacy_metrics(
+    df: pd.DataFrame,
+    quasi_identifiers: List[str],
+    sensitive_attributes: List[str],
+    distance: Optional[Dict[str, str]] = None,
+    bins: Optional[int] = None,
+    classes: Optional[EquivalenceClasses] = None
+) -> Dict[str, Dict]:
+    """
+    Calculate k-anonymity, l-diversity and t-closeness in one pass.
+
+    The quasi-identifier tuple is encoded into integer class ids once;
+    class sizes, per-class distinct counts and per-class histograms of
+    each sensitive attribute are then bincounts over those ids. Results
+    are identical to calling the three metric functions separately.
+
+    Args:
+        df: Input dataframe
+        quasi_identifiers: List of quasi-identifier column names
+        sensitive_attributes: List of sensitive attribute column names
+        distance: t-closeness distance mode per sensitive attribute
+                  ("categorical" or "ordinal"); unlisted ones are categorical
+        bins: Quantile bins for ordinal attributes (None keeps every value)
+        classes: Already-encoded equivalence classes of df (optional)
+
+    Returns:
+        Dict with "k_anonymity", "l_diversity" and "t_closeness" results
+    """
+    classes = encode_classes(df, quasi_identifiers, classes)
+    return {
+        "k_anonymity": calculate_k_anonymity(df, quasi_identifiers, classes),
+        "l_diversity": calculate_l_diversity(df, quasi_identifiers, sensitive_attributes, classes),
+        "t_closeness": calculate_t_closeness(df, quasi_identifiers, sensitive_attributes, classes, distance, bins),
+    }
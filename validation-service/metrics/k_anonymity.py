@@ -4,13 +4,17 @@ A dataset satisfies k-anonymity if every record is indistinguishable
 from at least k-1 other records with respect to quasi-identifiers.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from .classes import EquivalenceClasses, encode_classes, value_counts_dict
 
 
 def calculate_k_anonymity(
     df: pd.DataFrame,
-    quasi_identifiers: List[str]
+    quasi_identifiers: List[str],
+    classes: Optional[EquivalenceClasses] = None
 ) -> Dict:
     """
     Calculate k-anonymity for a dataset.
@@ -22,6 +26,7 @@ def calculate_k_anonymity(
     Args:
         df: Input dataframe
         quasi_identifiers: List of quasi-identifier column names
+        classes: Already-encoded equivalence classes of df (optional)
 
     Returns:
         Dict with:
@@ -46,9 +51,19 @@ def calculate_k_anonymity(
             "class_distribution": {len(df): 1}
         }
 
-    # Group by quasi-identifiers and count
-    class_sizes = df.groupby(existing_qi, dropna=False).size()
+    return summarize_class_sizes(encode_classes(df, existing_qi, classes).sizes)
+
+
+def summarize_class_sizes(class_sizes: np.ndarray) -> Dict:
+    """
+    k-anonymity statistics from the size of every equivalence class.
+
+    Args:
+        class_sizes: Record count per class
 
+    Returns:
+        Dict with the same keys as calculate_k_anonymity
+    """
     if len(class_sizes) == 0:
         return {
             "k_value": 0,
@@ -67,8 +82,7 @@ def calculate_k_anonymity(
     mean = float(class_sizes.mean())
 
     # Distribution of class sizes
-    distribution = class_sizes.value_counts().to_dict()
-    distribution = {int(k): int(v) for k, v in distribution.items()}
+    distribution = value_counts_dict(class_sizes)
 
     return {
         "k_value": k_value,
@@ -83,7 +97,8 @@ def calculate_k_anonymity(
 def get_violating_records(
     df: pd.DataFrame,
     quasi_identifiers: List[str],
-    k_threshold: int
+    k_threshold: int,
+    classes: Optional[EquivalenceClasses] = None
 ) -> pd.DataFrame:
     """
     Get records that violate k-anonymity threshold.
@@ -92,6 +107,7 @@ def get_violating_records(
         df: Input dataframe
         quasi_identifiers: List of quasi-identifier column names
         k_threshold: Minimum k value required
+        classes: Already-encoded equivalence classes of df (optional)
 
     Returns:
         DataFrame containing only records in violating equivalence classes
@@ -101,15 +117,12 @@ def get_violating_records(
     if not existing_qi:
         return pd.DataFrame()
 
-    # Get class sizes
-    class_sizes = df.groupby(existing_qi, dropna=False).size()
-
     # Find classes smaller than k
-    violating_classes = class_sizes[class_sizes < k_threshold].index
+    classes = encode_classes(df, existing_qi, classes)
+    violating = classes.sizes < k_threshold
 
-    if len(violating_classes) == 0:
+    if not violating.any():
         return pd.DataFrame()
 
     # Filter to violating records
-    mask = df.set_index(existing_qi).index.isin(violating_classes)
-    return df[mask]
+    return df[classes.record_mask(violating)]
@@ -4,14 +4,18 @@ A dataset satisfies l-diversity if every equivalence class has
 at least l distinct values for the sensitive attribute.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from .classes import EquivalenceClasses, encode_classes, value_counts_dict
 
 
 def calculate_l_diversity(
     df: pd.DataFrame,
     quasi_identifiers: List[str],
-    sensitive_attributes: List[str]
+    sensitive_attributes: List[str],
+    classes: Optional[EquivalenceClasses] = None
 ) -> Dict:
     """
     Calculate l-diversity for a dataset.
@@ -24,6 +28,7 @@ def calculate_l_diversity(
         df: Input dataframe
         quasi_identifiers: List of quasi-identifier column names
         sensitive_attributes: List of sensitive attribute column names
+        classes: Already-encoded equivalence classes of df (optional)
 
     Returns:
         Dict with:
@@ -58,34 +63,29 @@ def calculate_l_diversity(
             "diversity_distribution": {l_value: 1}
         }
 
+    classes = encode_classes(df, existing_qi, classes)
+
     # Calculate l-diversity per attribute
     per_attribute = {}
     all_diversities = []
 
     for sa in existing_sa:
         # Count distinct sensitive values per equivalence class
-        diversity_per_class = df.groupby(existing_qi, dropna=False)[sa].nunique()
+        diversity_per_class = classes.distinct_counts(sa)
         min_diversity = int(diversity_per_class.min()) if len(diversity_per_class) > 0 else 0
         per_attribute[sa] = min_diversity
-        all_diversities.extend(diversity_per_class.tolist())
+        all_diversities.append(diversity_per_class)
 
     # Overall l-value is minimum across all attributes
     l_value = min(per_attribute.values()) if per_attribute else 0
 
     # Calculate distribution
-    if all_diversities:
-        diversity_series = pd.Series(all_diversities)
-        distribution = diversity_series.value_counts().to_dict()
-        distribution = {int(k): int(v) for k, v in distribution.items()}
-    else:
-        distribution = {}
-
-    equivalence_classes = len(df.groupby(existing_qi, dropna=False)) if existing_qi else 1
+    distribution = value_counts_dict(np.concatenate(all_diversities))
 
     return {
         "l_value": l_value,
         "per_attribute": per_attribute,
-        "equivalence_classes": equivalence_classes,
+        "equivalence_classes": classes.n_classes,
         "diversity_distribution": distribution
     }
 
@@ -94,7 +94,8 @@ def get_low_diversity_classes(
     df: pd.DataFrame,
     quasi_identifiers: List[str],
     sensitive_attributes: List[str],
-    l_threshold: int
+    l_threshold: int,
+    classes: Optional[EquivalenceClasses] = None
 ) -> List[Dict]:
     """
     Find equivalence classes with diversity below threshold.
@@ -104,6 +105,7 @@ def get_low_diversity_classes(
         quasi_identifiers: List of quasi-identifier column names
         sensitive_attributes: List of sensitive attribute column names
         l_threshold: Minimum l value required
+        classes: Already-encoded equivalence classes of df (optional)
 
     Returns:
         List of dicts describing violating classes
@@ -114,18 +116,20 @@ def get_low_diversity_classes(
     if not existing_qi or not existing_sa:
         return []
 
+    classes = encode_classes(df, existing_qi, classes)
     violations = []
 
     for sa in existing_sa:
-        grouped = df.groupby(existing_qi, dropna=False)
-        for name, group in grouped:
-            diversity = group[sa].nunique()
-            if diversity < l_threshold:
-                violations.append({
-                    "quasi_identifier_values": dict(zip(existing_qi, name if isinstance(name, tuple) else [name])),
-                    "sensitive_attribute": sa,
-                    "diversity": diversity,
-                    "record_count": len(group)
-                })
+        diversity = classes.distinct_counts(sa)
+        violating = np.flatnonzero(diversity < l_threshold)
+        qi_values = classes.class_values(violating).to_dict('records')
+
+        for class_id, values in zip(violating, qi_values):
+            violations.append({
+                "quasi_identifier_values": values,
+                "sensitive_attribute": sa,
+                "diversity": int(diversity[class_id]),
+                "record_count": int(classes.sizes[class_id])
+            })
 
     return violations
@@ -0,0 +1,225 @@
+"""
+Generalization Lattice
+Searches GeneralizationConfig levels for the least generalized ones that
+pass the privacy thresholds
+
+Every combination of levels is a node of a lattice, ordered by
+generalization. Passing is monotone in it: generalizing further only
+merges equivalence classes, which never lowers k or l and never raises
+t (EMD is convex) or the risk score. So once a node passes, every more
+general node passes, and once a node fails, every less general node
+fails; those nodes are tagged instead of evaluated (Incognito/OLA).
+
+Nodes are evaluated from class aggregates, never from records. The raw
+quasi-identifier tuples are aggregated once; a node's classes are then
+rolled up from the smallest already-evaluated node below it whose labels
+map onto the node's labels, or from the raw classes.
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+
+from shared.hierarchies import GENERALIZERS, LEVEL_FIELDS, level_field
+
+from .aggregates import ClassAggregates
+from .classes import EquivalenceClasses
+from .fused import calculate_privacy_metrics
+
+# Hierarchy levels of every GeneralizationConfig field
+LEVELS = (0, 1, 2, 3)
+
+Node = Tuple[int, ...]
+
+
+def _relabel(labels: np.ndarray, table: Dict[object, object]) -> np.ndarray:
+    """Map labels through table, keeping missing labels missing"""
+    codes, uniques = pd.factorize(labels, use_na_sentinel=True)
+    mapped = np.array([table[label] for label in uniques] + [None], dtype=object)
+    return mapped[codes]
+
+
+class GeneralizationLattice:
+    """
+    Lattice of generalization levels over the quasi-identifiers of a dataframe.
+
+    Attributes:
+        fields: GeneralizationConfig level fields that affect some quasi-identifier
+        nodes: Every node (a level per field), least generalized first
+        base: Class aggregates of the raw quasi-identifier values
+        evaluated: Metric results per evaluated node
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        quasi_identifiers: List[str],
+        sensitive_attributes: List[str],
+        column_types: Dict[str, str],
+        ordinal_attributes: Optional[List[str]] = None
+    ):
+        """
+        Aggregate the raw equivalence classes of df.
+
+        Args:
+            df: Raw (not yet generalized) dataframe
+            quasi_identifiers: Quasi-identifier column names (missing ones are ignored)
+            sensitive_attributes: Sensitive attribute column names
+            column_types: Hierarchy type per quasi-identifier (unlisted ones are generic)
+            ordinal_attributes: Sensitive attributes compared by value for t-closeness
+        """
+        self.base = ClassAggregates.from_classes(
+            EquivalenceClasses(df, quasi_identifiers), sensitive_attributes, ordinal_attributes
+        )
+        self.quasi_identifiers = self.base.quasi_identifiers
+        self.sensitive_attributes = self.base.sensitive_attributes
+        self.column_types = {
+            col: column_types[col] if column_types.get(col) in GENERALIZERS else "generic"
+            for col in self.quasi_identifiers
+        }
+
+        self.column_fields = {col: level_field(col_type) for col, col_type in self.column_types.items()}
+        self.fields = [field for field in dict.fromkeys(LEVEL_FIELDS.values()) if field in self.column_fields.values()]
+        self.nodes: List[Node] = sorted(itertools.product(LEVELS, repeat=len(self.fields)), key=lambda node: (sum(node), node))
+
+        # Distinct raw labels per column and each base class's code into them
+        self._uniques: Dict[str, np.ndarray] = {}
+        self._codes: Dict[str, np.ndarray] = {}
+        for col in self.quasi_identifiers:
+            codes, uniques = pd.factorize(self.base.df[col], use_na_sentinel=True)
+            self._codes[col] = codes
+            self._uniques[col] = np.asarray(uniques, dtype=object)
+
+        self._tables: Dict[Tuple[str, int], np.ndarray] = {}
+        self._aggregates: Dict[Node, ClassAggregates] = {}
+        self.evaluated: Dict[Node, Dict] = {}
+
+    def config(self, node: Node) -> Dict[str, int]:
+        """Level per field of a node"""
+        return dict(zip(self.fields, node))
+
+    def level(self, node: Node, column: str) -> int:
+        return node[self.fields.index(self.column_fields[column])]
+
+    def _table(self, column: str, level: int) -> np.ndarray:
+        """Label of each distinct raw value of column at level (cached)"""
+        key = (column, level)
+        if key not in self._tables:
+            generalize = GENERALIZERS[self.column_types[column]]
+            self._tables[key] = np.array([generalize(value, level) for value in self._uniques[column]], dtype=object)
+        return self._tables[key]
+
+    def _mapping(self, column: str, from_level: int, to_level: int) -> Optional[Dict[object, object]]:
+        """Label map from one level to another, or None if a finer label spans several coarser ones"""
+        finer, coarser = self._table(column, from_level), self._table(column, to_level)
+        table = {}
+        for label, coarse in zip(finer, coarser):
+            if table.setdefault(label, coarse) != coarse:
+                return None
+        return table
+
+    def aggregates(self, node: Node) -> ClassAggregates:
+        """Class aggregates at node, rolled up from the cheapest source (cached)"""
+        if node in self._aggregates:
+            return self._aggregates[node]
+
+        # Smallest evaluated node below this one that maps onto it
+        labels = None
+        below = [other for other in self._aggregates if all(a <= b for a, b in zip(other, node))]
+        for other in sorted(below, key=lambda other: self._aggregates[other].n_classes):
+            source = self._aggregates[other]
+            labels = {}
+            for col in self.quasi_identifiers:
+                if self.level(other, col) == self.level(node, col):
+                    continue
+                table = self._mapping(col, self.level(other, col), self.level(node, col))
+                if table is None:
+                    labels = None
+                    break
+                labels[col] = _relabel(source.df[col].to_numpy(), table)
+            if labels is not None:
+                break
+
+        if labels is None:
+            source = self.base
+            labels = {
+                col: np.append(self._table(col, self.level(node, col)), None)[self._codes[col]]
+                for col in self.quasi_identifiers
+            }
+
+        self._aggregates[node] = source.rollup(labels)
+        return self._aggregates[node]
+
+    def evaluate(self, node: Node, distance: Optional[Dict[str, str]] = None, bins: Optional[int] = None) -> Dict:
+        """k-anonymity, l-diversity and t-closeness results at node (cached)"""
+        if node not in self.evaluated:
+            rolled = self.aggregates(node)
+            self.evaluated[node] = calculate_privacy_metrics(
+                rolled.df, rolled.quasi_identifiers, rolled.sensitive_attributes, distance, bins, classes=rolled
+            )
+        return self.evaluated[node]
+
+    def search(self, passes: Callable[[Dict], bool], distance: Optional[Dict[str, str]] = None, bins: Optional[int] = None) -> List[Node]:
+        """
+        Find the minimal passing nodes.
+
+        A passing node tags every node above it as passing and a failing
+        node every node below it as failing, so only undecided nodes are
+        evaluated. The most general node goes first (if it fails, nothing
+        passes), then the undecided node of median height, whose result
+        decides about half of the rest either way.
+
+        Args:
+            passes: Whether a node's metric results meet the thresholds
+            distance: t-closeness distance mode per sensitive attribute
+            bins: Quantile bins for ordinal attributes
+
+        Returns:
+            Passing nodes with no passing node directly below them (the
+            frontier), least generalized first
+        """
+        status: Dict[Node, bool] = {}
+
+        def tag(node: Node, passed: bool) -> None:
+            for other in self.nodes:
+                if passed and all(a >= b for a, b in zip(other, node)):
+                    status.setdefault(other, True)
+                elif not passed and all(a <= b for a, b in zip(other, node)):
+                    status.setdefault(other, False)
+
+        top = self.nodes[-1]
+        tag(top, passes(self.evaluate(top, distance, bins)))
+        if not status[top]:
+            return []
+
+        undecided = [node for node in self.nodes if node not in status]
+        while undecided:
+            # Median height of the undecided nodes, like a binary search along each chain
+            node = undecided[len(undecided) // 2]
+            tag(node, passes(self.evaluate(node, distance, bins)))
+            undecided = [node for node in undecided if node not in status]
+
+        def below(node: Node) -> List[Node]:
+            return [node[:i] + (level - 1,) + node[i + 1:] for i, level in enumerate(node) if level > 0]
+
+        return [node for node in self.nodes if status[node] and not any(status[other] for other in below(node))]
+
+    def information_loss(self, node: Node) -> Dict[str, float]:
+        """
+        Information loss of node's generalization.
+
+        Returns:
+            Dict with:
+                - precision_loss: Mean hierarchy height used per quasi-identifier, 0-1
+                  (1 - Sweeney's precision)
+                - discernibility: Sum of squared class sizes (LeFevre), lower is better
+                - equivalence_classes: Number of classes
+        """
+        sizes = self.aggregates(node).sizes
+        heights = [self.level(node, col) / LEVELS[-1] for col in self.quasi_identifiers]
+        return {
+            "precision_loss": round(float(np.mean(heights)), 4),
+            "discernibility": int((sizes.astype(np.int64) ** 2).sum()),
+            "equivalence_classes": len(sizes),
+        }
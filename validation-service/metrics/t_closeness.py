@@ -7,7 +7,12 @@ the global distribution.
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from .classes import EquivalenceClasses, Histogram, encode_classes
+
+# Ground distances between sensitive values: equal/unequal, or by sorted position
+DISTANCE_MODES = ("categorical", "ordinal")
 
 
 def earth_movers_distance(p: np.ndarray, q: np.ndarray) -> float:
@@ -26,10 +31,147 @@ def earth_movers_distance(p: np.ndarray, q: np.ndarray) -> float:
     return 0.5 * np.sum(np.abs(p - q))
 
 
+def ordered_earth_movers_distance(p: np.ndarray, q: np.ndarray) -> float:
+    """
+    Calculate EMD for distributions over m ordered values.
+
+    With ground distance |i - j| / (m - 1) between the i-th and j-th
+    smallest values, EMD is the normalized L1 distance between the
+    cumulative distributions.
+
+    Args:
+        p: First probability distribution, in ascending value order
+        q: Second probability distribution, in ascending value order
+
+    Returns:
+        EMD value between 0 and 1
+    """
+    if len(p) < 2:
+        return 0.0
+    return float(np.sum(np.abs(np.cumsum(p - q)[:-1])) / (len(p) - 1))
+
+
+def class_distances(histogram: Histogram) -> np.ndarray:
+    """
+    EMD between every class distribution and the global distribution.
+
+    Works on the sparse histogram: for each class the L1 distance is the
+    sum of global probabilities of values absent from the class, plus
+    |p - q| over the values present. A class with no non-missing values
+    is at distance 0.5 (half the global mass), as with an all-zero q.
+
+    Args:
+        histogram: Class x value counts of one sensitive attribute
+
+    Returns:
+        Array of EMD values, one per class
+    """
+    global_counts = histogram.global_counts()
+    total = global_counts.sum()
+    if total == 0:
+        return np.zeros(histogram.n_classes)
+    p = global_counts / total
+
+    q = histogram.row_normalized()
+    p_present = p[histogram.value_codes]
+    # Start from "all global mass is missing" and correct for present values
+    correction = np.bincount(
+        histogram.class_ids,
+        weights=np.abs(p_present - q) - p_present,
+        minlength=histogram.n_classes
+    )
+    return 0.5 * np.maximum(p.sum() + correction, 0.0)
+
+
+def ordered_class_distances(histogram: Histogram) -> np.ndarray:
+    """
+    Ordered EMD between every class distribution and the global one.
+
+    Within a class the cumulative distribution Q is a step function that
+    only changes at values the class contains, so the sum of |P - Q| over
+    each step is taken from prefix sums of the global cumulative P. P is
+    non-decreasing, so one searchsorted splits each step where P crosses
+    Q. Nothing is materialized per class x value. A class with no
+    non-missing values is compared as an all-zero distribution.
+
+    Args:
+        histogram: Class x value counts with value codes in ascending value order
+
+    Returns:
+        Array of EMD values, one per class
+    """
+    m = histogram.n_values
+    global_counts = histogram.global_counts()
+    total = global_counts.sum()
+    if m < 2 or total == 0:
+        return np.zeros(histogram.n_classes)
+
+    # P[i] = global mass up to value i; C[i] = P[0] + ... + P[i - 1]
+    P = np.cumsum(global_counts / total)
+    C = np.concatenate(([0.0], np.cumsum(P)))
+    last = m - 1
+
+    def step_sums(a: np.ndarray, b: np.ndarray, level: np.ndarray) -> np.ndarray:
+        # sum of |P[i] - level| for a <= i < b
+        split = np.clip(np.searchsorted(P, level), a, b)
+        return level * (split - a) - (C[split] - C[a]) + (C[b] - C[split]) - level * (b - split)
+
+    class_ids = histogram.class_ids
+    values = np.minimum(histogram.value_codes, last)
+    q = histogram.row_normalized()
+    cumulative_q = np.cumsum(q)
+    first = np.searchsorted(class_ids, class_ids)
+    Q = cumulative_q - (cumulative_q - q)[first]
+
+    # Each entry holds Q until the class's next value (or the end)
+    is_last = np.append(class_ids[1:] != class_ids[:-1], True)
+    next_values = np.where(is_last, last, np.append(values[1:], last))
+    distances = np.bincount(class_ids, weights=step_sums(values, next_values, Q), minlength=histogram.n_classes)
+
+    # Before a class's first value Q is 0
+    leading = np.full(histogram.n_classes, C[last])
+    starts = first == np.arange(len(class_ids))
+    leading[class_ids[starts]] = C[values[starts]]
+
+    return np.clip((distances + leading) / last, 0.0, 1.0)
+
+
+def attribute_distances(
+    classes: EquivalenceClasses,
+    column: str,
+    mode: str = "categorical",
+    bins: Optional[int] = None
+) -> np.ndarray:
+    """
+    Per-class EMD of one sensitive attribute.
+
+    Args:
+        classes: Encoded equivalence classes
+        column: Sensitive attribute column
+        mode: "categorical" (every pair of distinct values is at distance 1)
+              or "ordinal" (numeric values, distance by sorted position)
+        bins: For "ordinal", quantile-bin values into at most this many buckets
+
+    Returns:
+        Array of EMD values, one per class
+
+    Raises:
+        ValueError: If mode is unknown
+    """
+    if mode == "categorical":
+        return class_distances(classes.histogram(column))
+    if mode == "ordinal":
+        return ordered_class_distances(classes.ordered_histogram(column, bins))
+    raise ValueError(f"Unknown t-closeness distance mode: {mode} (expected one of {DISTANCE_MODES})")
+
+
 def calculate_t_closeness(
     df: pd.DataFrame,
     quasi_identifiers: List[str],
-    sensitive_attributes: List[str]
+    sensitive_attributes: List[str],
+    classes: Optional[EquivalenceClasses] = None,
+    distance: Optional[Dict[str, str]] = None,
+    bins: Optional[int] = None
 ) -> Dict:
     """
     Calculate t-closeness for a dataset.
@@ -42,6 +184,10 @@ def calculate_t_closeness(
         df: Input dataframe
         quasi_identifiers: List of quasi-identifier column names
         sensitive_attributes: List of sensitive attribute column names
+        classes: Already-encoded equivalence classes of df (optional)
+        distance: Distance mode per sensitive attribute ("categorical" or
+                  "ordinal"); attributes not listed are categorical
+        bins: Quantile bins for ordinal attributes (None keeps every value)
 
     Returns:
         Dict with:
@@ -73,47 +219,30 @@ def calculate_t_closeness(
             "class_distances": [0.0]
         }
 
+    classes = encode_classes(df, existing_qi, classes)
+
     per_attribute = {}
     all_distances = []
 
     for sa in existing_sa:
-        # Calculate global distribution
-        global_dist = df[sa].value_counts(normalize=True)
-        all_values = global_dist.index.tolist()
-
         # Calculate EMD for each equivalence class
-        max_emd = 0.0
-        class_emds = []
-
-        grouped = df.groupby(existing_qi, dropna=False)
-
-        for name, group in grouped:
-            # Local distribution
-            local_dist = group[sa].value_counts(normalize=True)
-
-            # Align distributions (ensure same categories)
-            p = np.array([global_dist.get(v, 0) for v in all_values])
-            q = np.array([local_dist.get(v, 0) for v in all_values])
-
-            # Calculate EMD
-            emd = earth_movers_distance(p, q)
-            class_emds.append(emd)
-            max_emd = max(max_emd, emd)
+        class_emds = attribute_distances(classes, sa, (distance or {}).get(sa, "categorical"), bins)
+        max_emd = float(class_emds.max()) if len(class_emds) else 0.0
 
         per_attribute[sa] = round(max_emd, 4)
-        all_distances.extend(class_emds)
+        all_distances.append(class_emds)
 
     # Overall t-value is maximum across all attributes
     t_value = max(per_attribute.values()) if per_attribute else 0.0
 
-    equivalence_classes = len(df.groupby(existing_qi, dropna=False)) if existing_qi else 1
+    all_distances = np.concatenate(all_distances)
 
     return {
         "t_value": round(t_value, 4),
         "per_attribute": per_attribute,
-        "equivalence_classes": equivalence_classes,
-        "mean_distance": round(np.mean(all_distances), 4) if all_distances else 0.0,
-        "max_distance": round(max(all_distances), 4) if all_distances else 0.0
+        "equivalence_classes": classes.n_classes,
+        "mean_distance": round(float(all_distances.mean()), 4) if len(all_distances) else 0.0,
+        "max_distance": round(float(all_distances.max()), 4) if len(all_distances) else 0.0
     }
 
 
@@ -121,7 +250,10 @@ def get_high_distance_classes(
     df: pd.DataFrame,
     quasi_identifiers: List[str],
     sensitive_attributes: List[str],
-    t_threshold: float
+    t_threshold: float,
+    classes: Optional[EquivalenceClasses] = None,
+    distance: Optional[Dict[str, str]] = None,
+    bins: Optional[int] = None
 ) -> List[Dict]:
     """
     Find equivalence classes with EMD above threshold.
@@ -131,6 +263,9 @@ def get_high_distance_classes(
         quasi_identifiers: List of quasi-identifier column names
         sensitive_attributes: List of sensitive attribute column names
         t_threshold: Maximum t value allowed
+        classes: Already-encoded equivalence classes of df (optional)
+        distance: Distance mode per sensitive attribute (see calculate_t_closeness)
+        bins: Quantile bins for ordinal attributes
 
     Returns:
         List of dicts describing violating classes
@@ -141,29 +276,20 @@ def get_high_distance_classes(
     if not existing_qi or not existing_sa:
         return []
 
+    classes = encode_classes(df, existing_qi, classes)
     violations = []
 
     for sa in existing_sa:
-        # Global distribution
-        global_dist = df[sa].value_counts(normalize=True)
-        all_values = global_dist.index.tolist()
-
-        grouped = df.groupby(existing_qi, dropna=False)
-
-        for name, group in grouped:
-            local_dist = group[sa].value_counts(normalize=True)
-
-            p = np.array([global_dist.get(v, 0) for v in all_values])
-            q = np.array([local_dist.get(v, 0) for v in all_values])
-
-            emd = earth_movers_distance(p, q)
-
-            if emd > t_threshold:
-                violations.append({
-                    "quasi_identifier_values": dict(zip(existing_qi, name if isinstance(name, tuple) else [name])),
-                    "sensitive_attribute": sa,
-                    "emd": round(emd, 4),
-                    "record_count": len(group)
-                })
+        emds = attribute_distances(classes, sa, (distance or {}).get(sa, "categorical"), bins)
+        violating = np.flatnonzero(emds > t_threshold)
+        qi_values = classes.class_values(violating).to_dict('records')
+
+        for class_id, values in zip(violating, qi_values):
+            violations.append({
+                "quasi_identifier_values": values,
+                "sensitive_attribute": sa,
+                "emd": round(float(emds[class_id]), 4),
+                "record_count": int(classes.sizes[class_id])
+            })
 
     return violations
@@ -0,0 +1,157 @@
+"""
+Privacy Violations
+Finds equivalence classes that fail k-anonymity, l-diversity or
+t-closeness, ranked by how far they miss the thresholds
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional
+
+from .classes import EquivalenceClasses
+from .t_closeness import attribute_distances
+
+
+class ClassViolations:
+    """
+    Per-class violation flags for one set of thresholds.
+
+    Everything is held as arrays indexed by class id; dicts are only
+    built for the classes passed to describe().
+
+    Attributes:
+        k_failed: Class smaller than the k threshold
+        l_failed: Fewest distinct sensitive values below the l threshold
+        t_failed: Largest EMD above the t threshold
+        failed: Any of the above
+        severity: Worst normalized shortfall over the three metrics, in (0, 1]
+                  for failing classes and 0 otherwise
+    """
+
+    def __init__(
+        self,
+        classes: EquivalenceClasses,
+        sensitive_attributes: List[str],
+        k_threshold: int,
+        l_threshold: int,
+        t_threshold: float,
+        distance: Optional[Dict[str, str]] = None,
+        bins: Optional[int] = None
+    ):
+        """
+        Evaluate every class against the thresholds.
+
+        Args:
+            classes: Encoded equivalence classes
+            sensitive_attributes: Sensitive attribute columns (missing ones are ignored)
+            k_threshold: Minimum class size
+            l_threshold: Minimum distinct sensitive values per class
+            t_threshold: Maximum EMD from the global distribution
+            distance: t-closeness distance mode per sensitive attribute
+            bins: Quantile bins for ordinal attributes
+        """
+        self.classes = classes
+        self.sensitive_attributes = [col for col in sensitive_attributes if col in classes.df.columns]
+        n = classes.n_classes
+        sizes = classes.sizes
+        modes = distance or {}
+
+        # Lowest diversity and highest distance over the sensitive attributes
+        self.diversity = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+        self.diversity_attribute = np.full(n, -1, dtype=np.int64)
+        self.distance = np.zeros(n)
+        self.distance_attribute = np.full(n, -1, dtype=np.int64)
+        for index, sa in enumerate(self.sensitive_attributes):
+            diversity = classes.distinct_counts(sa)
+            lower = diversity < self.diversity
+            self.diversity[lower] = diversity[lower]
+            self.diversity_attribute[lower] = index
+
+            emd = attribute_distances(classes, sa, modes.get(sa, "categorical"), bins)
+            higher = emd > self.distance
+            self.distance[higher] = emd[higher]
+            self.distance_attribute[higher] = index
+
+        has_sa = len(self.sensitive_attributes) > 0
+        self.k_failed = sizes < k_threshold
+        self.l_failed = (self.diversity < l_threshold) if has_sa else np.zeros(n, dtype=bool)
+        self.t_failed = self.distance > t_threshold
+        self.failed = self.k_failed | self.l_failed | self.t_failed
+
+        severity = np.where(self.k_failed, (k_threshold - sizes) / max(k_threshold, 1), 0.0)
+        if has_sa:
+            l_gap = (l_threshold - self.diversity) / max(l_threshold, 1)
+            severity = np.maximum(severity, np.where(self.l_failed, l_gap, 0.0))
+        t_gap = (self.distance - t_threshold) / max(1.0 - t_threshold, 1e-9)
+        self.severity = np.clip(np.maximum(severity, np.where(self.t_failed, t_gap, 0.0)), 0.0, 1.0)
+
+    @property
+    def class_count(self) -> int:
+        """Number of failing classes"""
+        return int(self.failed.sum())
+
+    @property
+    def record_count(self) -> int:
+        """Number of records in failing classes"""
+        return int(self.classes.sizes[self.failed].sum())
+
+    def record_mask(self) -> np.ndarray:
+        """Boolean mask over records in failing classes"""
+        return self.classes.record_mask(self.failed)
+
+    def worst(self, limit: int, offset: int = 0) -> np.ndarray:
+        """
+        Failing class ids, most severe first.
+
+        Ties are broken by smaller class size, then class id.
+
+        Args:
+            limit: Page size
+            offset: Number of classes to skip
+
+        Returns:
+            Class ids for the page
+        """
+        failing = np.flatnonzero(self.failed)
+        order = np.lexsort((failing, self.classes.sizes[failing], -self.severity[failing]))
+        return failing[order[offset:offset + limit]]
+
+    def describe(self, class_ids: np.ndarray) -> List[Dict]:
+        """
+        Describe the given classes for reporting.
+
+        Args:
+            class_ids: Class ids, e.g. from worst()
+
+        Returns:
+            One dict per class with its quasi-identifier values, size,
+            diversity, distance, failed metrics and severity
+        """
+        values = self.classes.class_values(class_ids).astype(object)
+        values = values.where(values.notna(), None).to_dict('records')
+        has_sa = len(self.sensitive_attributes) > 0
+
+        described = []
+        for class_id, qi_values in zip(class_ids, values):
+            failed = [
+                metric for metric, flags in (
+                    ("k_anonymity", self.k_failed),
+                    ("l_diversity", self.l_failed),
+                    ("t_closeness", self.t_failed),
+                ) if flags[class_id]
+            ]
+            described.append({
+                "class_id": int(class_id),
+                "quasi_identifier_values": qi_values,
+                "record_count": int(self.classes.sizes[class_id]),
+                "diversity": int(self.diversity[class_id]) if has_sa else None,
+                "diversity_attribute": self._attribute(self.diversity_attribute[class_id]),
+                "distance": round(float(self.distance[class_id]), 4),
+                "distance_attribute": self._attribute(self.distance_attribute[class_id]),
+                "failed_metrics": failed,
+                "severity": round(float(self.severity[class_id]), 4),
+            })
+        return described
+
+    def _attribute(self, index: int) -> Optional[str]:
+        return self.sensitive_attributes[index] if index >= 0 else None